@@ -1 +1 @@
-from .defaults import load_config
\ No newline at end of file
+from .defaults import load_config, get_config_section
\ No newline at end of file
@@ -38,3 +38,27 @@ def load_config(config_file="config.json"):
     except KeyError as e:
         logging.critical(f"Config file '{config_file}' is missing required keys: {str(e)}")
         raise
+
+def get_config_section(section, config_file="config.json"):
+    """
+    Load a single optional section of the configuration file.
+
+    Unlike load_config, this never raises: a missing or malformed file, or a
+    missing section, simply yields an empty dict so callers can fall back to
+    their built-in defaults.
+
+    Args:
+        section (str): Top-level key to read from the config file.
+        config_file (str): Path to the configuration file.
+
+    Returns:
+        dict: The section's values, or an empty dict.
+    """
+    try:
+        with open(config_file, "r") as f:
+            config = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+    value = config.get(section, {}) if isinstance(config, dict) else {}
+    return value if isinstance(value, dict) else {}
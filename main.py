@@ -1,104 +1,74 @@
-import time
 import logging
-import random
-import tweepy
+import argparse
+import functools
+from datetime import datetime, timedelta
 
 from src.utils.logging_setup import setup_logging
-from src.utils.timing import human_delay
+from src.utils.diagnostics import Diagnostics
 from src.state import BotState
 from src.api.client import initialize_twitter_client
-from src.api.endpoints import search_for_mentions, process_mention, check_rate_limits
-from src.rate_limiting.backoff import handle_rate_limit_response
+from src.api.watchlist import Watchlist
+from src.api.backfill import run_backfill
+from src.bot import hound_the_cult, stream_the_cult
+from src.cluster import spawn_workers
+from src.supervisor import Supervisor
+from config import get_config_section
 
-def hound_the_cult():
+def backfill(since_hours=None):
     """
-    Main bot function that processes mentions and quotes tweets.
+    Recover mentions missed during downtime, then return.
+    
+    Args:
+        since_hours (float, optional): Start this many hours ago instead of
+            at the last check time.
     """
     bot_state = BotState()
-    client = initialize_twitter_client()
-    
-    logging.info("🎯 Bot activated with secure user preferences, state validation, and gradual rate limiting!")
-    
-    check_interval = 0
-    
-    while True:
-        try:
-            # Randomized main loop timing
-            human_delay(60, 300)  # 1-5 min between cycles
-            
-            # Check API limits
-            if bot_state.reads_today >= 95:
-                logging.warning("⚠️ Approaching monthly read limit. Sleeping 24h.")
-                human_delay(86400 - 300, 86400 + 300)  # 24h ±5m
-                continue
-                
-            if bot_state.posts_today >= 490:
-                logging.warning("⚠️ Approaching monthly post limit. Sleeping 24h.")
-                human_delay(86400 - 300, 86400 + 300)
-                continue
-                
-            # Periodically check actual rate limits from Twitter API
-            check_interval += 1
-            if check_interval >= 10:  # Check every 10 cycles
-                check_rate_limits(client, bot_state)
-                check_interval = 0
-                
-            # Process mentions
-            mentions = search_for_mentions(client, bot_state)
-            if mentions:
-                logging.info(f"🎯 Found {len(mentions)} new mentions!")
-                for mention in mentions:
-                    process_mention(mention, client, bot_state)
-                bot_state.update_check_time()
-            
-            # Variable sleep with jitter - more natural behavior
-            base_sleep = random.randint(3600, 14400)  # 1-4h
-            human_delay(base_sleep - 600, base_sleep + 600)  # ±10m
-            
-        except tweepy.errors.TooManyRequests as e:
-            logging.warning(f"⚠️ Rate limited! Cooling off...")
-            handle_rate_limit_response(429, getattr(e, 'response', {}).headers if hasattr(e, 'response') else None, 
-                                      bot_state, "search")
-            human_delay(900, 3600)  # Additional 15-60m cooldown
-        except tweepy.errors.Forbidden as e:
-            if "suspended" in str(e).lower():
-                logging.critical("💀 ACCOUNT SUSPENDED!")
-                break
-            human_delay(3600, 7200)
-        except tweepy.errors.TweepyException as e:
-            logging.error(f"💥 Tweepy error: {e}. Restarting in 5-10m...")
-            human_delay(300, 600)
-        except Exception as e:
-            logging.error(f"💥 Unexpected error: {e}. Restarting in 5-10m...")
-            human_delay(300, 600)
+    try:
+        client = initialize_twitter_client()
+        since = datetime.now() - timedelta(hours=since_hours) if since_hours else None
+        total = run_backfill(client, bot_state, Watchlist.from_config(), since)
+        logging.info(f"⏪ Backfill done: {total} mentions recovered")
+    finally:
+        bot_state.close()
 
 def main():
     """
     Entry point for the application.
-    Sets up logging and handles restarts with exponential backoff.
+    Sets up logging and runs the bot under the Supervisor.
     """
+    parser = argparse.ArgumentParser(description="HoundTheCult Twitter bot")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Run N worker processes with one elected leader searching (default: 1)")
+    parser.add_argument("--backfill", action="store_true",
+                        help="Recover mentions missed since the last check, then exit")
+    parser.add_argument("--since", type=float, metavar="HOURS",
+                        help="With --backfill, start HOURS ago instead of at the last check")
+    parser.add_argument("--stream", action="store_true",
+                        help="Take mentions from a filtered stream instead of polling search")
+    args = parser.parse_args()
+    
     setup_logging()
     
-    retry_count = 0
-    max_retries = 10
+    if args.backfill:
+        backfill(args.since)
+        return
     
-    while retry_count < max_retries:  # Permanent restart loop with retry limit
-        try:
-            hound_the_cult()
-            # If we exit normally, just restart
-            logging.info("Bot exited normally. Restarting in 60s...")
-            time.sleep(60)
-        except KeyboardInterrupt:
-            logging.info("👋 Bot stopped by user.")
-            break
-        except Exception as e:
-            retry_count += 1
-            backoff = min(300 * retry_count, 3600)  # Exponential backoff, max 1h
-            logging.critical(f"💀 Fatal error: {e}. Retry {retry_count}/{max_retries} in {backoff//60}m...")
-            time.sleep(backoff)
+    if args.workers > 1:
+        spawn_workers(args.workers)
+        return
     
-    if retry_count >= max_retries:
-        logging.critical("☠️ Too many fatal errors. Bot shutting down. Manual restart required.")
+    # Restarts in-process, keeping the client and warm state across failures;
+    # SIGUSR1/SIGUSR2 trigger profiling and diagnostics dumps while it runs
+    diagnostics = Diagnostics.from_config(lambda: supervisor.components.get("state"))
+    if args.stream or get_config_section("stream").get("enabled", False):
+        supervisor = Supervisor(functools.partial(stream_the_cult, diagnostics=diagnostics))
+    else:
+        supervisor = Supervisor(functools.partial(hound_the_cult, diagnostics=diagnostics))
+    diagnostics.install()
+    try:
+        supervisor.run()
+    except KeyboardInterrupt:
+        logging.info("👋 Bot stopped by user.")
 
 if __name__ == "__main__":
     main()
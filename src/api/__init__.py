@@ -2,11 +2,17 @@
 
 from .client import initialize_twitter_client
 from .endpoints import search_for_mentions, process_mention, check_rate_limits
+from .models import Mention, TweetRef
+from .deadline import Deadline, DeadlineExceeded
 
 # Expose main API functions at the package level
 __all__ = [
     'initialize_twitter_client',
     'search_for_mentions',
     'process_mention',
-    'check_rate_limits'
+    'check_rate_limits',
+    'Mention',
+    'TweetRef',
+    'Deadline',
+    'DeadlineExceeded'
 ]
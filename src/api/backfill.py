@@ -0,0 +1,284 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import tweepy
+
+from config import get_config_section
+from src.api.coalescing import is_command
+from src.api.deadline import Deadline, DeadlineExceeded
+from src.api.endpoints import extract_mentions, SEARCH_EXPANSIONS, SEARCH_TWEET_FIELDS
+
+logger = logging.getLogger(__name__)
+
+RECENT_SEARCH_WINDOW = timedelta(days=7) - timedelta(minutes=5)   # Oldest searchable, with margin
+END_TIME_LAG = timedelta(seconds=30)    # end_time must be a little in the past
+SLICES = 8                  # Time slices the downtime is split into
+WORKERS = 4                 # Slices fetched concurrently
+MAX_REQUESTS = 12           # Search reads a backfill may spend
+PAGE_SIZE = 100             # Results per search page (the API maximum)
+ORDERS = ("chronological", "priority")
+
+def _utc(value):
+    """Convert a datetime, naive meaning local time, to aware UTC."""
+    return value.astimezone(timezone.utc)
+
+def _api_time(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def time_slices(start, end, count):
+    """
+    Split an interval into equal consecutive slices.
+
+    Args:
+        start (datetime): Interval start.
+        end (datetime): Interval end.
+        count (int): Number of slices.
+
+    Returns:
+        list: (start, end) pairs, oldest first.
+    """
+    count = max(1, count)
+    step = (end - start) / count
+    bounds = [start + step * i for i in range(count)] + [end]
+    return list(zip(bounds, bounds[1:]))
+
+class Backfill:
+    """
+    Recovers mentions missed during downtime.
+
+    The interval since the last check (at most the 7 days recent search
+    covers) is split into time slices that are searched concurrently, one
+    task per slice and packed watch-list query, paging through every result.
+    Pages are drawn from a read budget fixed up front: what every search
+    quota layer has left, capped by the backfill's own request limit.
+    Results are deduplicated against each other, prefiltered like a regular
+    search, routed to their watch targets, and streamed out slice by slice,
+    oldest first, as soon as every earlier slice is done. In priority order
+    everything is collected first and commands, then the newest mentions,
+    come first.
+    """
+    def __init__(self, client, bot_state, watchlist, slices=SLICES, workers=WORKERS,
+                 max_requests=MAX_REQUESTS, order="chronological"):
+        """
+        Args:
+            client (tweepy.Client): Authenticated Twitter API client.
+            bot_state: Bot state manager object.
+            watchlist (Watchlist): Targets to search for.
+            slices (int): Time slices to split the interval into.
+            workers (int): Searches in flight at once.
+            max_requests (int): Search reads to spend at most.
+            order (str): "chronological" or "priority".
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Unknown backfill order: {order}")
+        self.client = client
+        self.bot_state = bot_state
+        self.watchlist = watchlist
+        self.slices = slices
+        self.workers = workers
+        self.max_requests = max_requests
+        self.order = order
+        self.spent = 0
+        self.budget = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, client, bot_state, watchlist, options=None):
+        """
+        Create a backfill from the "backfill" config section.
+
+        Args:
+            client (tweepy.Client): Authenticated Twitter API client.
+            bot_state: Bot state manager object.
+            watchlist (Watchlist): Targets to search for.
+            options (dict, optional): Overrides the config section.
+
+        Returns:
+            Backfill: The configured backfill.
+        """
+        if options is None:
+            options = get_config_section("backfill")
+        return cls(
+            client, bot_state, watchlist,
+            slices=options.get("slices", SLICES),
+            workers=options.get("workers", WORKERS),
+            max_requests=options.get("max_requests", MAX_REQUESTS),
+            order=options.get("order", "chronological")
+        )
+
+    def _budget(self):
+        """Get the search reads every quota layer and the request cap allow now."""
+        # Read-only: a half-open breaker's probe is taken by the request that uses it
+        if not self.bot_state.scheduler.is_available("search") or self.bot_state.breakers.is_open("search"):
+            return 0
+        layers = self.bot_state.quota.status().get("search", [])
+        remaining = min((layer["limit"] - layer["used"] for layer in layers), default=self.max_requests)
+        return max(0, min(self.max_requests, remaining))
+
+    def _reserve(self):
+        """Take one read from the budget and the breaker; False if either refuses."""
+        with self._lock:
+            if self.spent >= self.budget or not self.bot_state.breakers.allow("search"):
+                return False
+            self.spent += 1
+            return True
+
+    def _fetch(self, query, start, end):
+        """
+        Page through one query over one time slice.
+
+        Runs on a worker thread and leaves bot state alone; the calls made
+        are recorded by the consuming thread.
+
+        Returns:
+            tuple: (responses, calls made, error or None)
+        """
+        pages = []
+        calls = 0
+        token = None
+        try:
+            while self._reserve():
+                calls += 1
+                with Deadline.for_operation("search"):
+                    response = self.client.search_recent_tweets(
+                        query=query,
+                        max_results=PAGE_SIZE,
+                        expansions=SEARCH_EXPANSIONS,
+                        tweet_fields=SEARCH_TWEET_FIELDS,
+                        start_time=_api_time(start),
+                        end_time=_api_time(end),
+                        next_token=token,
+                        user_auth=True
+                    )
+                pages.append(response)
+                token = (response.meta or {}).get("next_token")
+                if not token:
+                    break
+        except Exception as e:
+            return pages, calls, e
+        return pages, calls, None
+
+    def _collect(self, futures, seen):
+        """Turn one slice's finished searches into routed mentions."""
+        found = OrderedDict()
+        for future, batch in futures:
+            pages, calls, error = future.result()
+            for _ in range(calls):
+                # Failed calls may still have counted at Twitter
+                self.bot_state.quota.record("search")
+            if calls:
+                self.bot_state.save_state()
+            # Every task that called gives its outcome back to the breaker,
+            # under the lock the workers take probes with
+            with self._lock:
+                if error is not None:
+                    self._record_error(error)
+                elif pages:
+                    self.bot_state.breakers.record_success("search")
+            for response in pages:
+                mentions = self.bot_state.prefilter.apply(
+                    [m for m in extract_mentions(response, self.bot_state) if m.id not in seen],
+                    self.bot_state
+                )
+                seen.update(m.id for m in mentions)
+                for target, routed in self.watchlist.route(mentions, batch).items():
+                    found.setdefault(target, []).extend(routed)
+        return found
+
+    def _record_error(self, error):
+        logger.error("Backfill search failed: %s", error)
+        if isinstance(error, DeadlineExceeded):
+            self.bot_state.breakers.record_timeout("search")
+        elif not isinstance(error, tweepy.errors.HTTPException) or isinstance(error, tweepy.errors.TwitterServerError):
+            self.bot_state.breakers.record_failure("search")
+        else:
+            self.bot_state.breakers.record_success("search")  # Refused, but the API is up
+            if isinstance(error, tweepy.errors.TooManyRequests):
+                self.bot_state.scheduler.block("search", 15 * 60)
+
+    def _sorted(self, found, key, reverse=False):
+        """Order each target's mentions, keeping targets in watch-list order."""
+        return OrderedDict(
+            (target, sorted(found[target], key=key, reverse=reverse))
+            for target in self.watchlist.targets if found.get(target)
+        )
+
+    def batches(self, since, until=None):
+        """
+        Search the interval and yield results as they become ready.
+
+        Args:
+            since (datetime): Start of the downtime; naive means local time.
+            until (datetime, optional): End of the interval. Defaults to now.
+
+        Yields:
+            OrderedDict: WatchTarget -> mentions, ready for Watchlist.dispatch.
+        """
+        now = datetime.now(timezone.utc)
+        end = min(_utc(until) if until else now, now - END_TIME_LAG)
+        start = max(_utc(since), now - RECENT_SEARCH_WINDOW)
+        if start >= end:
+            logger.info("Nothing to backfill")
+            return
+
+        self.budget = self._budget()
+        if not self.budget:
+            logger.warning("⚠️ No search reads available for a backfill")
+            return
+        slices = time_slices(start, end, min(self.slices, self.budget))
+        logger.info("⏪ Backfilling %s to %s in %d slices (%d reads at most)",
+                    _api_time(start), _api_time(end), len(slices), self.budget)
+        seen = set()
+        collected = OrderedDict()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill") as pool:
+            pending = [
+                [(pool.submit(self._fetch, query, slice_start, slice_end), batch) for query, batch in self.watchlist.queries]
+                for slice_start, slice_end in slices
+            ]
+            for futures in pending:  # Oldest slice first; waits only for that slice
+                found = self._collect(futures, seen)
+                if self.order == "chronological":
+                    if found:
+                        yield self._sorted(found, key=lambda m: m.id)
+                else:
+                    for target, mentions in found.items():
+                        collected.setdefault(target, []).extend(mentions)
+
+        if self.order == "priority" and collected:
+            # Commands first so opt-outs apply before quoting, then newest first
+            yield self._sorted(collected, key=lambda m: (is_command(m), m.id), reverse=True)
+        logger.info("⏪ Backfill spent %d search reads", self.spent)
+
+def run_backfill(client, bot_state, watchlist, since=None, options=None):
+    """
+    Backfill missed mentions and process them.
+
+    Args:
+        client (tweepy.Client): Authenticated Twitter API client.
+        bot_state: Bot state manager object.
+        watchlist (Watchlist): Targets to search for.
+        since (datetime, optional): Start of the downtime. Defaults to the
+            last check time.
+        options (dict, optional): Overrides the "backfill" config section.
+
+    Returns:
+        int: Mentions found.
+    """
+    if since is None:
+        since = datetime.fromisoformat(bot_state.last_check_time)
+    backfill = Backfill.from_config(client, bot_state, watchlist, options)
+    # The backfill stops END_TIME_LAG short of its start; the next search picks up from there
+    checked_at = datetime.now() - END_TIME_LAG
+    total = 0
+    for found in backfill.batches(since):
+        count = sum(len(mentions) for mentions in found.values())
+        total += count
+        logger.info("⏪ Processing %d backfilled mentions", count)
+        with bot_state.cycle():
+            bot_state.history.record("mentions", count)
+            watchlist.dispatch(found, client, bot_state)
+    bot_state.update_check_time(checked_at)
+    return total
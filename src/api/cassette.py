@@ -0,0 +1,390 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import defaultdict, deque
+
+import tweepy
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+# Client methods whose traffic is captured
+RECORDED_METHODS = ("search_recent_tweets", "get_tweet", "create_tweet", "get_me")
+
+# Response headers never written to a cassette
+SKIPPED_HEADERS = {"set-cookie", "authorization"}
+
+# Arguments derived from the clock, which differ on every run; strict replay
+# only checks that they are passed
+TIME_ARGUMENTS = ("start_time", "end_time")
+
+# Status code to tweepy error class, for replaying failures
+ERROR_CLASSES = {
+    400: "BadRequest",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "NotFound",
+    429: "TooManyRequests"
+}
+
+class CaseInsensitiveHeaders(dict):
+    """Header mapping that matches keys regardless of case, like requests does."""
+    def __init__(self, headers=None):
+        super().__init__((k.lower(), v) for k, v in (headers or {}).items())
+
+    def __contains__(self, key):
+        return super().__contains__(key.lower())
+
+    def __getitem__(self, key):
+        return super().__getitem__(key.lower())
+
+    def get(self, key, default=None):
+        return super().get(key.lower(), default)
+
+class ReplayHTTPResponse:
+    """Minimal stand-in for requests.Response carried by replayed errors."""
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.reason = body.get("title", "") if isinstance(body, dict) else ""
+        self.headers = CaseInsensitiveHeaders(headers)
+        self._body = body or {}
+        self.text = json.dumps(self._body)
+
+    def json(self):
+        return self._body
+
+def _dump_model(value):
+    """Convert a tweepy model (or list/dict of them) into plain JSON data."""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [_dump_model(v) for v in value]
+    if hasattr(value, "data") and not isinstance(value, dict):
+        return {"model": type(value).__name__, "data": value.data}
+    return {"model": "dict", "data": value}
+
+def _load_model(value):
+    """Rebuild tweepy models from data written by _dump_model."""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [_load_model(v) for v in value]
+    model = getattr(tweepy, value["model"], None) if value["model"] != "dict" else None
+    return model(value["data"]) if model else value["data"]
+
+def _dump_response(response):
+    """Serialize a tweepy Response namedtuple."""
+    if response is None or not hasattr(response, "_fields"):
+        return None
+    includes = getattr(response, "includes", None) or {}
+    return {
+        "data": _dump_model(response.data),
+        "includes": {key: _dump_model(items) for key, items in includes.items()},
+        "errors": getattr(response, "errors", None) or [],
+        "meta": getattr(response, "meta", None) or {}
+    }
+
+def _load_response(payload):
+    """Rebuild a tweepy Response namedtuple."""
+    if payload is None:
+        return None
+    return tweepy.Response(
+        data=_load_model(payload.get("data")),
+        includes={key: _load_model(items) for key, items in payload.get("includes", {}).items()},
+        errors=payload.get("errors", []),
+        meta=payload.get("meta", {})
+    )
+
+def _http_details(http_response):
+    """Extract status code and headers from a requests-style response."""
+    if http_response is None:
+        return None, {}
+    status = getattr(http_response, "status_code", None)
+    headers = {
+        k: v for k, v in dict(getattr(http_response, "headers", {}) or {}).items()
+        if k.lower() not in SKIPPED_HEADERS
+    }
+    return status, headers
+
+def _error_body(error):
+    """Get the JSON body of a failed API response, if there is one."""
+    http_response = getattr(error, "response", None)
+    try:
+        return http_response.json()
+    except Exception:
+        return None
+
+class CassetteWriter:
+    """
+    Appends recorded API calls to a JSONL cassette file.
+    """
+    def __init__(self, path):
+        """
+        Open a cassette for writing.
+
+        Args:
+            path (str): Cassette file path. Existing recordings are appended to.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._file = open(path, "a", encoding="utf-8")
+        self._write({"type": "header", "version": CASSETTE_VERSION, "started_at": self._started})
+
+    def _write(self, entry):
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def record(self, method, kwargs, latency, status, headers, response=None, error=None):
+        """
+        Append one API call.
+
+        Args:
+            method (str): Client method name.
+            kwargs (dict): Arguments the method was called with.
+            latency (float): Wall-clock call duration in seconds.
+            status (int or None): HTTP status code, when known.
+            headers (dict): Response headers.
+            response: The tweepy Response returned, if the call succeeded.
+            error (Exception, optional): The exception raised, if it failed.
+        """
+        entry = {
+            "type": "call",
+            "t": round(time.time() - self._started, 3),
+            "method": method,
+            "kwargs": kwargs,
+            "latency": round(latency, 4),
+            "status": status,
+            "headers": headers
+        }
+        if error is not None:
+            entry["error"] = {
+                "class": type(error).__name__,
+                "message": str(error),
+                "body": _error_body(error)
+            }
+        else:
+            entry["response"] = _dump_response(response)
+        self._write(entry)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class RecordingClient:
+    """
+    Wraps a tweepy.Client and records its hot-path traffic to a cassette.
+
+    Every other attribute is passed straight through to the wrapped client.
+    """
+    def __init__(self, client, path):
+        """
+        Args:
+            client (tweepy.Client): The client to record.
+            path (str): Cassette file path.
+        """
+        self._client = client
+        self._writer = CassetteWriter(path)
+        self._last_http = threading.local()
+
+        # Capture status and headers from the underlying requests session
+        session = getattr(client, "session", None)
+        if session is not None:
+            original_request = session.request
+
+            def request(*args, **kwargs):
+                http_response = original_request(*args, **kwargs)
+                self._last_http.response = http_response
+                return http_response
+
+            session.request = request
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in RECORDED_METHODS:
+            return attr
+
+        def recorded(*args, **kwargs):
+            # Positional arguments (e.g. get_tweet's id) are kept under "_args"
+            call = dict(kwargs, _args=list(args)) if args else kwargs
+            self._last_http.response = None
+            start = time.perf_counter()
+            try:
+                response = attr(*args, **kwargs)
+            except Exception as e:
+                latency = time.perf_counter() - start
+                status, headers = _http_details(getattr(e, "response", None) or self._last_http.response)
+                self._writer.record(name, call, latency, status, headers, error=e)
+                raise
+            latency = time.perf_counter() - start
+            status, headers = _http_details(self._last_http.response)
+            self._writer.record(name, call, latency, status, headers, response=response)
+            return response
+
+        return recorded
+
+    def close(self):
+        self._writer.close()
+
+def load_cassette(path):
+    """
+    Read all recorded calls from a cassette.
+
+    Args:
+        path (str): Cassette file path.
+
+    Returns:
+        list: Call entries in recorded order.
+    """
+    calls = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if entry.get("type") == "call":
+                calls.append(entry)
+    return calls
+
+def _comparable(kwargs):
+    """Normalize call arguments for a strict comparison, as a cassette stores them."""
+    kwargs = json.loads(json.dumps(kwargs, default=str))
+    for name in TIME_ARGUMENTS:
+        if kwargs.get(name) is not None:
+            kwargs[name] = "<time>"
+    return kwargs
+
+class ReplayClient:
+    """
+    Fake client that serves responses from a cassette instead of the API.
+
+    Calls to each method are answered in recorded order. Each answer comes
+    no sooner than its recorded offset from the start of the recording and
+    no faster than its recorded latency, both divided by speed, so replayed
+    traffic keeps the recorded pacing; a speed of 0 skips waiting entirely.
+    """
+    def __init__(self, path, speed=1.0, strict=False, loop=False):
+        """
+        Args:
+            path (str): Cassette file path.
+            speed (float): Replay speed multiplier; 0 disables pacing.
+            strict (bool): Raise if call arguments differ from the recording.
+            loop (bool): Start over when a method's recordings run out.
+        """
+        self.speed = speed
+        self.strict = strict
+        self.loop = loop
+        self.last_headers = {}
+        self._calls = load_cassette(path)
+        self._queues = defaultdict(deque)
+        self._reset_queues()
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        logger.info("Loaded cassette %s with %d calls", path, len(self._calls))
+
+    def _reset_queues(self, method=None):
+        for entry in self._calls:
+            if method is None or entry["method"] == method:
+                self._queues[entry["method"]].append(entry)
+
+    def _next_entry(self, method):
+        with self._lock:
+            queue = self._queues[method]
+            if not queue and self.loop:
+                self._reset_queues(method)
+            if not queue:
+                raise tweepy.errors.TweepyException(f"Cassette exhausted for {method}")
+            return queue.popleft()
+
+    def _replay(self, method, args, kwargs):
+        entry = self._next_entry(method)
+
+        if self.strict:
+            recorded = _comparable(entry.get("kwargs", {}))
+            expected = _comparable(dict(kwargs, _args=list(args)) if args else kwargs)
+            if expected != recorded:
+                raise AssertionError(f"{method} called with {expected}, recorded {recorded}")
+
+        if self.speed:
+            # Recorded offsets are taken as each call returned
+            due = self._started + entry.get("t", 0) / self.speed
+            wait = max(due - time.monotonic(), entry.get("latency", 0) / self.speed)
+            if wait > 0:
+                time.sleep(wait)
+
+        self.last_headers = CaseInsensitiveHeaders(entry.get("headers"))
+        error = entry.get("error")
+        if error is None:
+            return _load_response(entry.get("response"))
+
+        status = entry.get("status")
+        if status is None:
+            # Transport-level failure, no HTTP response was received
+            if error["class"] == "ConnectionError":
+                raise ConnectionError(error["message"])
+            raise tweepy.errors.TweepyException(error["message"])
+
+        body = error.get("body") or {"title": error["message"]}
+        http_response = ReplayHTTPResponse(status, entry.get("headers"), body)
+        class_name = ERROR_CLASSES.get(status, "TwitterServerError" if status >= 500 else "HTTPException")
+        raise getattr(tweepy.errors, class_name)(http_response, response_json=body)
+
+    def search_recent_tweets(self, *args, **kwargs):
+        return self._replay("search_recent_tweets", args, kwargs)
+
+    def get_tweet(self, *args, **kwargs):
+        return self._replay("get_tweet", args, kwargs)
+
+    def create_tweet(self, *args, **kwargs):
+        return self._replay("create_tweet", args, kwargs)
+
+    def get_me(self, *args, **kwargs):
+        return self._replay("get_me", args, kwargs)
+
+def summarize_cassette(path):
+    """
+    Summarize the traffic in a cassette.
+
+    Args:
+        path (str): Cassette file path.
+
+    Returns:
+        dict: Per-method call count, status code counts and latency percentiles.
+    """
+    by_method = defaultdict(list)
+    for entry in load_cassette(path):
+        by_method[entry["method"]].append(entry)
+
+    summary = {}
+    for method, entries in by_method.items():
+        latencies = sorted(e.get("latency", 0) for e in entries)
+        statuses = defaultdict(int)
+        for e in entries:
+            statuses[str(e.get("status"))] += 1
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        summary[method] = {
+            "calls": len(entries),
+            "statuses": dict(statuses),
+            "latency_p50": pct(0.5),
+            "latency_p95": pct(0.95),
+            "latency_max": latencies[-1]
+        }
+    return summary
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        print("Usage: python -m src.api.cassette <cassette.jsonl>")
+        sys.exit(1)
+    print(json.dumps(summarize_cassette(sys.argv[1]), indent=2))
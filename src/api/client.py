@@ -1,9 +1,64 @@
 import tweepy
 import random
 import logging
-import time
 
 from config import load_config
+from src.api.cassette import RecordingClient, ReplayClient
+from src.api.transport import DirectClient, POOL_SIZE
+from src.api.deadline import Deadline, timeout_adapter
+
+def _build_client(twitter_api, cassette, transport=None):
+    """
+    Create the API client, optionally recording or replaying a cassette.
+    
+    Args:
+        twitter_api (dict): API credentials from the config file.
+        cassette (dict): Cassette settings: "mode" ("record" or "replay"),
+            "path", and for replay "speed" and "strict".
+        transport (dict, optional): Transport settings: "mode" ("tweepy" or
+            "direct") and "pool_size". Recording always uses tweepy.
+    
+    Returns:
+        tweepy.Client or a client with the same interface.
+    """
+    mode = cassette.get("mode")
+    path = cassette.get("path", "data/cassettes/traffic.jsonl")
+    
+    if mode == "replay":
+        logging.info(f"📼 Replaying API traffic from {path}")
+        return ReplayClient(path, speed=cassette.get("speed", 1.0), strict=cassette.get("strict", False))
+    
+    transport = transport or {}
+    if transport.get("mode") == "direct" and mode != "record":
+        try:
+            client = DirectClient(
+                bearer_token=twitter_api["BEARER_TOKEN"],
+                consumer_key=twitter_api["API_KEY"],
+                consumer_secret=twitter_api["API_SECRET"],
+                access_token=twitter_api["ACCESS_TOKEN"],
+                access_token_secret=twitter_api["ACCESS_SECRET"],
+                pool_size=transport.get("pool_size", POOL_SIZE)
+            )
+            logging.info("⚡ Using direct HTTP transport")
+            return client
+        except Exception as e:
+            logging.warning(f"Direct transport unavailable ({e}). Falling back to tweepy")
+    
+    client = tweepy.Client(
+        bearer_token=twitter_api["BEARER_TOKEN"],
+        consumer_key=twitter_api["API_KEY"],
+        consumer_secret=twitter_api["API_SECRET"],
+        access_token=twitter_api["ACCESS_TOKEN"],
+        access_token_secret=twitter_api["ACCESS_SECRET"],
+        wait_on_rate_limit=False  # We'll handle rate limits ourselves
+    )
+    # Connect/read timeouts, capped by the active Deadline
+    client.session.mount("https://", timeout_adapter())
+    
+    if mode == "record":
+        logging.info(f"📼 Recording API traffic to {path}")
+        return RecordingClient(client, path)
+    return client
 
 def initialize_twitter_client():
     """
@@ -15,6 +70,7 @@ def initialize_twitter_client():
     Raises:
         tweepy.errors.Unauthorized: If authentication fails.
         tweepy.errors.Forbidden: If account is suspended.
+        DeadlineExceeded: If retries run past the startup deadline.
         Exception: If client initialization fails after max retries.
     """
     config = load_config()
@@ -23,51 +79,55 @@ def initialize_twitter_client():
     retry_count = 0
     max_retries = 5
     
-    while retry_count < max_retries:
-        try:
-            client = tweepy.Client(
-                bearer_token=twitter_api["BEARER_TOKEN"],
-                consumer_key=twitter_api["API_KEY"],
-                consumer_secret=twitter_api["API_SECRET"],
-                access_token=twitter_api["ACCESS_TOKEN"],
-                access_token_secret=twitter_api["ACCESS_SECRET"],
-                wait_on_rate_limit=False  # We'll handle rate limits ourselves
-            )
-            
-            # Test connection by checking account
-            me = client.get_me()
-            if me and hasattr(me, "data") and me.data:
-                logging.info(f"✅ Twitter API connection successful - authenticated as @{me.data.username}")
-                return client
-            else:
-                raise tweepy.errors.TweepyException("Failed account verification")
+    # Built once: retries only repeat the verification call, so a recording
+    # keeps one cassette writer and header
+    client = _build_client(twitter_api, config.get("cassette", {}), config.get("transport", {}))
+    try:
+        # One deadline covers every attempt and the waits between them
+        with Deadline.for_operation("startup") as deadline:
+            while retry_count < max_retries:
+                deadline.check()
+                try:
+                    # Test connection by checking account
+                    me = client.get_me()
+                    if me and hasattr(me, "data") and me.data:
+                        logging.info(f"✅ Twitter API connection successful - authenticated as @{me.data.username}")
+                        return client
+                    else:
+                        raise tweepy.errors.TweepyException("Failed account verification")
                 
-        except tweepy.errors.Unauthorized:
-            logging.critical("❌ Twitter API authentication failed. Check API keys.")
-            # Don't retry auth failures - keys are likely invalid
-            raise
-        except tweepy.errors.Forbidden:
-            logging.critical("⛔ Your Twitter account may be suspended or tokens revoked.")
-            # Don't retry forbidden errors - account issues
-            raise
-        except tweepy.errors.TooManyRequests as e:
-            retry_count += 1
-            wait_time = 60 * retry_count
+                except tweepy.errors.Unauthorized:
+                    logging.critical("❌ Twitter API authentication failed. Check API keys.")
+                    # Don't retry auth failures - keys are likely invalid
+                    raise
+                except tweepy.errors.Forbidden:
+                    logging.critical("⛔ Your Twitter account may be suspended or tokens revoked.")
+                    # Don't retry forbidden errors - account issues
+                    raise
+                except tweepy.errors.TooManyRequests as e:
+                    retry_count += 1
+                    wait_time = 60 * retry_count
             
-            # Check for Retry-After header
-            if hasattr(e, 'response') and e.response and 'Retry-After' in e.response.headers:
-                try:
-                    wait_time = int(e.response.headers['Retry-After']) + random.randint(1, 5)
-                except (ValueError, TypeError):
-                    pass
+                    # Check for Retry-After header
+                    if hasattr(e, 'response') and e.response and 'Retry-After' in e.response.headers:
+                        try:
+                            wait_time = int(e.response.headers['Retry-After']) + random.randint(1, 5)
+                        except (ValueError, TypeError):
+                            pass
                     
-            logging.warning(f"⚠️ Rate limited during initialization. Retry {retry_count}/{max_retries} in {wait_time}s")
-            time.sleep(wait_time)
-        except Exception as e:
-            retry_count += 1
-            wait_time = 30 * retry_count
-            logging.error(f"❌ Failed to initialize Twitter client: {e}. Retry {retry_count}/{max_retries} in {wait_time}s")
-            time.sleep(wait_time)
+                    logging.warning(f"⚠️ Rate limited during initialization. Retry {retry_count}/{max_retries} in {wait_time}s")
+                    deadline.sleep(wait_time)
+                except Exception as e:
+                    retry_count += 1
+                    wait_time = 30 * retry_count
+                    logging.error(f"❌ Failed to initialize Twitter client: {e}. Retry {retry_count}/{max_retries} in {wait_time}s")
+                    deadline.sleep(wait_time)
     
-    # If we've exhausted all retries
-    raise Exception("Failed to initialize Twitter client after multiple attempts")
+            # If we've exhausted all retries
+            raise Exception("Failed to initialize Twitter client after multiple attempts")
+    except BaseException:
+        # Nobody else will close it: release the cassette file or connection pool
+        close = getattr(client, "close", None)
+        if close is not None:
+            close()
+        raise
@@ -0,0 +1,97 @@
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+def is_command(mention):
+    """Check whether a mention is an opt-in/out command rather than a quote request."""
+    return mention.command is not None
+
+def coalesce_mentions(mentions, bot_state):
+    """
+    Collapse mentions that target the same tweet into a single request.
+
+    Mentions are grouped by referenced tweet. Each group keeps one leader,
+    the earliest mention from an author who hasn't opted out, so the tweet
+    is hydrated and quoted at most once. The rest become the leader's
+    followers: process_mention defers them with the leader, handles them
+    once the tweet is quoted, and otherwise lets them take its place. Groups
+    whose tweet was already quoted within the coalescing window are dropped
+    entirely. Commands and mentions without a target pass through untouched.
+
+    Args:
+        mentions (list): Mentions from search_for_mentions, in arrival order.
+        bot_state: Bot state manager object.
+
+    Returns:
+        list: Mentions to process, in their original order.
+    """
+    groups = OrderedDict()
+    passthrough = []
+
+    for mention in mentions:
+        target = mention.referenced_tweet_id
+        if target is None or is_command(mention):
+            passthrough.append(mention)
+        else:
+            groups.setdefault(str(target), []).append(mention)
+
+    leaders = []
+    coalesced = 0
+    for target, group in groups.items():
+        if bot_state.quoted_targets.recently_quoted(target):
+            for mention in group:
+                bot_state.mark_handled(mention.id)
+            coalesced += len(group)
+            continue
+
+        # Prefer an author who can actually get a quote
+        leader = next(
+            (m for m in group if not bot_state.is_opted_out(str(m.author_id))),
+            group[0]
+        )
+        leader.followers = [m for m in group if m is not leader]
+        leaders.append(leader)
+        coalesced += len(leader.followers)
+
+    if coalesced:
+        logger.info("Coalesced %d mentions targeting %d tweets", coalesced, len(groups))
+
+    keep = {id(m) for m in passthrough + leaders}
+    return [m for m in mentions if id(m) in keep]
+
+def _promote_follower(mention):
+    """Make a mention's first follower lead the rest, or None without followers."""
+    followers, mention.followers = mention.followers, []
+    if not followers:
+        return None
+    successor = followers[0]
+    successor.followers = followers[1:]
+    return successor
+
+def fair_order(mentions, bot_state):
+    """
+    Order mentions fairly across authors and drop those over their cap.
+
+    Commands and mentions without a target need no post, so they are
+    exempt and go first. Dropped mentions are marked handled; a dropped
+    coalesced mention hands its followers to the first of them, which is
+    ordered in its place.
+
+    Args:
+        mentions (list): Mentions to process, e.g. from coalesce_mentions.
+        bot_state: Bot state manager object.
+
+    Returns:
+        list: Mentions to process, in service order.
+    """
+    admitted, dropped = bot_state.fair_share.order(
+        mentions,
+        exempt=lambda m: m.referenced_tweet_id is None or is_command(m),
+        successor=_promote_follower
+    )
+    for mention in dropped:
+        bot_state.mark_handled(mention.id)
+    if dropped:
+        logger.info("Dropped %d mentions from authors over their fair share", len(dropped))
+    return admitted
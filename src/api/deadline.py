@@ -0,0 +1,155 @@
+import time
+import logging
+import contextvars
+
+import requests
+import tweepy
+from requests.adapters import HTTPAdapter
+
+from config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 5         # Seconds to establish a connection
+READ_TIMEOUT = 30           # Seconds to wait for each read from the socket
+OPERATION_DEADLINE = 60     # Seconds for a whole API operation
+STARTUP_DEADLINE = 600      # Seconds for client initialization, retries included
+
+_current = contextvars.ContextVar("deadline", default=None)
+
+class DeadlineExceeded(tweepy.errors.TweepyException):
+    """
+    An API call timed out or its operation ran past its deadline.
+
+    Subclasses TweepyException so existing handlers still catch it. The
+    request may have reached Twitter before the connection was dropped.
+    """
+
+class Deadline:
+    """
+    Time limit for an operation, shared by every API call made inside it.
+
+    Used as a context manager; each HTTP request made in the block gets a
+    timeout no longer than what is left, and no request starts once the
+    deadline has passed. Nested deadlines never extend an enclosing one.
+    """
+    __slots__ = ("name", "expires_at", "clock", "_token")
+
+    def __init__(self, seconds, name="operation", clock=time.monotonic):
+        """
+        Args:
+            seconds (float): Time allowed from now.
+            name (str): Operation name for errors and logs.
+            clock (callable): Monotonic time source.
+        """
+        self.name = name
+        self.clock = clock
+        self.expires_at = clock() + seconds
+        self._token = None
+
+    @classmethod
+    def for_operation(cls, name, options=None):
+        """
+        Create a deadline for an API operation from the "timeouts" config section.
+
+        Args:
+            name (str): Operation name; "startup" uses the startup deadline.
+            options (dict, optional): Overrides the config section.
+
+        Returns:
+            Deadline: A deadline starting now.
+        """
+        if options is None:
+            options = get_config_section("timeouts")
+        if name == "startup":
+            return cls(options.get("startup", STARTUP_DEADLINE), name)
+        return cls(options.get("operation", OPERATION_DEADLINE), name)
+
+    def remaining(self):
+        """Get seconds left, never negative."""
+        return max(0.0, self.expires_at - self.clock())
+
+    def expired(self):
+        """Check whether the deadline has passed."""
+        return self.clock() >= self.expires_at
+
+    def check(self):
+        """
+        Raise if the deadline has passed.
+
+        Raises:
+            DeadlineExceeded: If no time is left.
+        """
+        if self.expired():
+            raise DeadlineExceeded(f"{self.name} deadline exceeded")
+
+    def sleep(self, seconds):
+        """Sleep, but not past the deadline."""
+        time.sleep(min(seconds, self.remaining()))
+
+    def __enter__(self):
+        outer = _current.get()
+        if outer is not None and outer.expires_at < self.expires_at:
+            self.expires_at = outer.expires_at
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        self._token = None
+        return False
+
+def current_deadline():
+    """Get the innermost active deadline, or None."""
+    return _current.get()
+
+class TimeoutAdapter(HTTPAdapter):
+    """
+    HTTP adapter that puts connect/read timeouts on every request.
+
+    Timeouts are capped by the active Deadline, so a hung connection is
+    dropped when either runs out. Timeouts surface as DeadlineExceeded rather
+    than requests exceptions, so callers handle them like other API errors.
+    The read timeout bounds each wait on the socket, not the whole response.
+    """
+    def __init__(self, connect=CONNECT_TIMEOUT, read=READ_TIMEOUT, **kwargs):
+        """
+        Args:
+            connect (float): Connect timeout in seconds.
+            read (float): Read timeout in seconds.
+            **kwargs: Passed to HTTPAdapter, e.g. pool_maxsize.
+        """
+        self.connect_timeout = connect
+        self.read_timeout = read
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        connect, read = self.connect_timeout, self.read_timeout
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check()
+            remaining = deadline.remaining()
+            connect, read = min(connect, remaining), min(read, remaining)
+        try:
+            return super().send(request, timeout=(connect, read), **kwargs)
+        except requests.exceptions.Timeout as e:
+            raise DeadlineExceeded(f"{request.method} {request.path_url.split('?')[0]} timed out: {e}") from e
+
+def timeout_adapter(options=None, **kwargs):
+    """
+    Create a TimeoutAdapter from the "timeouts" config section.
+
+    Args:
+        options (dict, optional): Overrides the config section.
+        **kwargs: Passed to HTTPAdapter.
+
+    Returns:
+        TimeoutAdapter: The configured adapter.
+    """
+    if options is None:
+        options = get_config_section("timeouts")
+    return TimeoutAdapter(
+        connect=options.get("connect", CONNECT_TIMEOUT),
+        read=options.get("read", READ_TIMEOUT),
+        **kwargs
+    )
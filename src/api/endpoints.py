@@ -6,9 +6,100 @@ from datetime import datetime, timedelta
 
 from src.utils.timing import human_delay
 from src.rate_limiting.backoff import handle_rate_limit_response
+from src.api.tweet_cache import NOT_FOUND
+from src.api.models import Mention, TweetRef, payload_of
+from src.api.deadline import Deadline, DeadlineExceeded
 from config import load_config
 
-def search_for_mentions(client, bot_state, username="HoundTheCult"):
+# Humanizing delay before posting a quote, in seconds
+POST_DELAY = (5, 45)
+
+# Search expansions and fields; included tweets save a lookup per mention
+SEARCH_EXPANSIONS = ["referenced_tweets.id", "referenced_tweets.id.author_id", "author_id"]
+SEARCH_TWEET_FIELDS = ["created_at", "author_id", "conversation_id"]
+
+def _is_health_failure(error):
+    """
+    Decide whether an API error says the endpoint itself is unhealthy.
+
+    Server errors and transport failures count against the circuit breaker;
+    client-side answers such as 404, 403 or 429 mean the API is up.
+    """
+    if isinstance(error, tweepy.errors.TwitterServerError):
+        return True
+    return not isinstance(error, tweepy.errors.HTTPException)
+
+def _sync_rate_headers(client, bot_state, endpoint):
+    """
+    Block an endpoint when the last response says its window is used up.
+    
+    Only clients that expose raw headers (the direct transport and cassette
+    replay) are tracked; for the tweepy client this is a no-op.
+    
+    Args:
+        client: API client, checked for last_headers.
+        bot_state: Bot state manager object.
+        endpoint (str): The endpoint just called.
+    """
+    headers = getattr(client, "last_headers", None)
+    if not headers or headers.get("x-rate-limit-remaining") != "0":
+        return
+    try:
+        wait_time = int(headers["x-rate-limit-reset"]) - time.time()
+    except (KeyError, ValueError, TypeError):
+        return
+    if wait_time > 0:
+        bot_state.scheduler.block(endpoint, wait_time + random.uniform(1, 5))
+
+def _defer_mention(mention, bot_state, endpoint, delay):
+    """
+    Put a mention back on the retry queue until its endpoint is available.
+    
+    Args:
+        mention (Mention): The mention.
+        bot_state: Bot state manager object.
+        endpoint (str): The unavailable endpoint ("lookup" or "post").
+        delay (float): Seconds until the endpoint may be used again.
+        
+    Returns:
+        bool: False if the mention was dropped after too many attempts.
+    """
+    if bot_state.retry_queue.push(mention, delay + random.uniform(1, 10), key=mention.id):
+        logging.info(f"⏳ {endpoint.capitalize()} unavailable. Deferring mention for {delay:.0f}s")
+        return True
+    return False
+
+def extract_mentions(response, bot_state):
+    """
+    Turn a search response into Mention objects.
+    
+    Included referenced tweets are attached to their mentions and cached, so
+    later mentions of the same tweet skip the lookup. Only the fields we use
+    are kept, so the response can be released.
+    
+    Args:
+        response: Search response from the API client.
+        bot_state: Bot state manager object.
+        
+    Returns:
+        list: Mention objects, in response order.
+    """
+    if not response.data:
+        return []
+    
+    included = {}
+    if response.includes and "tweets" in response.includes:
+        for tweet in response.includes["tweets"]:
+            payload = payload_of(tweet)
+            ref = TweetRef.from_payload(payload)
+            included[ref.id] = payload
+            bot_state.tweet_cache.put(ref.id, ref.to_dict())
+    
+    # found_at starts each mention's latency budget
+    found_at = time.time()
+    return [Mention.from_payload(payload_of(tweet), included, found_at) for tweet in response.data]
+
+def search_for_mentions(client, bot_state, username="HoundTheCult", query=None):
     """
     Search for mentions with realistic timing and gradual rate limiting.
     
@@ -16,10 +107,17 @@ def search_for_mentions(client, bot_state, username="HoundTheCult"):
         client (tweepy.Client): Authenticated Twitter API client.
         bot_state: Bot state manager object.
         username (str): Twitter username to search for mentions of.
+        query (str, optional): Full search query to run instead, e.g. a
+            packed watch-list query.
         
     Returns:
-        list: List of mentions found, or empty list if none or error.
+        list: Mention objects found, or empty list if none or error.
     """
+    # Skip this cycle while search is backing off; other endpoints keep working
+    if not bot_state.scheduler.is_available("search"):
+        logging.info(f"⏳ Search unavailable for {bot_state.scheduler.available_in('search'):.0f}s. Skipping search")
+        return []
+    
     human_delay(5, 15)  # Random delay before searching
     
     # Apply gradual backoff based on current usage
@@ -28,98 +126,133 @@ def search_for_mentions(client, bot_state, username="HoundTheCult"):
         logging.info(f"Applying gradual backoff delay of {backoff_delay:.1f}s for search (usage: {bot_state.get_search_usage_ratio():.2%})")
         time.sleep(backoff_delay)
     
-    # Check if we can make a search request within rate limits
-    if not bot_state.can_search():
-        wait_time = bot_state.get_search_window_reset() + random.randint(5, 20)
-        logging.warning(f"⚠️ Search rate limit reached. Waiting {wait_time:.1f}s")
-        time.sleep(wait_time)
+    # Check if a search fits within every quota layer
+    admission = bot_state.admit("search")
+    if not admission.allowed:
+        wait_time = admission.wait_seconds + random.randint(5, 20)
+        logging.warning(f"⚠️ Search quota reached ({admission.binding}). Retrying in {wait_time:.1f}s")
+        bot_state.scheduler.block("search", wait_time)
+        return []
+    
+    # Fail fast while the search endpoint is known to be down. Checked last:
+    # a half-open breaker hands out its one probe here, and only a recorded
+    # outcome gives it back
+    if not bot_state.breakers.allow("search"):
+        logging.warning(f"⛔ Search circuit open. Skipping search for {bot_state.breakers['search'].retry_in():.0f}s")
+        return []
     
-    query = f"@{username} -is:retweet"
+    if query is None:
+        query = f"@{username} -is:retweet"
     start_time = None
     
     if bot_state.last_check_time:
-        last_check = datetime.fromisoformat(bot_state.last_check_time)
-        if (datetime.now() - last_check).total_seconds() < 60:
-            start_time = (datetime.now() - timedelta(seconds=30)).strftime("%Y-%m-%dT%H:%M:%SZ")
-        else:
-            start_time = last_check.strftime("%Y-%m-%dT%H:%M:%SZ")
+        # start_time must be a little in the past; reaching further back is
+        # harmless, since handled mentions are filtered out
+        last_check = min(datetime.fromisoformat(bot_state.last_check_time), datetime.now() - timedelta(seconds=30))
+        start_time = last_check.strftime("%Y-%m-%dT%H:%M:%SZ")
     
     try:
-        response = client.search_recent_tweets(
-            query=query,
-            max_results=10,
-            expansions=["referenced_tweets.id", "referenced_tweets.id.author_id", "author_id"],
-            tweet_fields=["created_at", "author_id", "conversation_id"],
-            start_time=start_time,
-            user_auth=True
-        )
+        with Deadline.for_operation("search"):
+            response = client.search_recent_tweets(
+                query=query,
+                max_results=10,
+                expansions=SEARCH_EXPANSIONS,
+                tweet_fields=SEARCH_TWEET_FIELDS,
+                start_time=start_time,
+                user_auth=True
+            )
         
         # Record the search request in our rate limiter
         bot_state.record_search()
+        bot_state.breakers.record_success("search")
+        _sync_rate_headers(client, bot_state, "search")
         
         if not response.data:
             logging.info("😴 No new mentions found.")
             return []
         
-        mentions = []
-        referenced_tweets = {}
-        
-        # Build a dict of referenced tweets for quick lookup
-        if response.includes and "tweets" in response.includes:
-            referenced_tweets = {t.id: t for t in response.includes["tweets"]}
-        
-        for tweet in response.data:
-            mention_data = {
-                "id": tweet.id,
-                "text": tweet.text,
-                "author_id": tweet.author_id,
-                "created_at": tweet.created_at,
-                "referenced_tweet_id": None
-            }
-            
-            if hasattr(tweet, "referenced_tweets") and tweet.referenced_tweets:
-                for ref in tweet.referenced_tweets:
-                    if ref.type == "replied_to":
-                        mention_data["referenced_tweet_id"] = ref.id
-                        if ref.id in referenced_tweets:
-                            mention_data["referenced_tweet"] = referenced_tweets[ref.id]
-                        break
-            
-            mentions.append(mention_data)
-        
-        return mentions
+        # Drop handled, own and opted-out mentions before they cost anything
+        return bot_state.prefilter.apply(extract_mentions(response, bot_state), bot_state)
     
+    except DeadlineExceeded as e:
+        logging.warning(f"⌛ Search timed out: {e}")
+        bot_state.record_timeout("search")
+        return []
     except tweepy.errors.TooManyRequests as e:
+        bot_state.breakers.record_success("search")  # Throttled, but the API is up
         handle_rate_limit_response(429, getattr(e, 'response', {}).headers if hasattr(e, 'response') else None, bot_state, "search")
         return []
     except Exception as e:
         logging.error(f"Error searching mentions: {e}")
-        handle_rate_limit_response(None, None, bot_state, "search")
+        if _is_health_failure(e):
+            bot_state.breakers.record_failure("search")
+        else:
+            bot_state.breakers.record_success("search")
+        if not bot_state.breakers.is_open("search"):
+            handle_rate_limit_response(None, None, bot_state, "search")
         return []
 
 def process_mention(mention, client, bot_state):
     """
     Process a single mention with all safety checks.
     
+    A coalesced mention carries its followers: they are deferred with it,
+    handled once their tweet is quoted, and otherwise take its place one
+    after another.
+    
     Args:
-        mention (dict): Mention data.
+        mention (Mention): The mention.
         client (tweepy.Client): Authenticated Twitter API client.
         bot_state: Bot state manager object.
     """
+    while mention is not None:
+        deferred = False
+        try:
+            deferred = _process_mention(mention, client, bot_state)
+        finally:
+            if not deferred:
+                # Quoted, skipped or failed for good: its attempt count is done with
+                bot_state.retry_queue.forget(mention.id)
+        mention = None if deferred else _next_in_line(mention, bot_state)
+
+def _next_in_line(mention, bot_state):
+    """
+    Settle the followers of a mention that is done with.
+    
+    Returns:
+        Mention: The follower to process next, or None.
+    """
+    followers, mention.followers = mention.followers, []
+    if not followers:
+        return None
+    if bot_state.quoted_targets.recently_quoted(mention.referenced_tweet_id):
+        # One quote answers everyone who asked for it
+        for follower in followers:
+            bot_state.mark_handled(follower.id)
+        return None
+    successor = followers[0]
+    successor.followers = followers[1:]
+    return successor
+
+def _process_mention(mention, client, bot_state):
+    """
+    Process a mention for process_mention.
+    
+    Returns:
+        bool: True if the mention was put back on the retry queue.
+    """
     config = load_config()
     SNARKY_COMMENTS = config.get("snarky_comments", [
         "Found one!",
         "Another gem from the cult..."
     ])
     
-    user_id = str(mention["author_id"])
+    user_id = str(mention.author_id)
+    bot_state.mark_handled(mention.id)
     
     # Handle opt-in/out commands
-    if "!optout" in mention.get("text", "").lower():
-        bot_state.update_user_prefs(user_id, "opt_out")
-        return
-    elif "!optin" in mention.get("text", "").lower():
-        bot_state.update_user_prefs(user_id, "opt_in")
+    if mention.command:
+        bot_state.update_user_prefs(user_id, mention.command)
         return
     
     # Skip opted-out users
@@ -128,52 +261,94 @@ def process_mention(mention, client, bot_state):
         return
     
     # Add randomness to skip some mentions (seems more human-like)
-    if random.random() < 0.1:  # 10% chance to skip
+    if random.random() < config.get("skip_chance", 0.1):  # 10% chance to skip by default
         logging.info("Randomly skipping this mention (human-like behavior)")
         return
     
     # Process regular mentions
-    if mention.get("referenced_tweet_id"):
+    if mention.referenced_tweet_id:
+        stage = "lookup"
+        budget = bot_state.latency.budget_for(mention)
         try:
-            original_tweet_id = mention["referenced_tweet_id"]
+            original_tweet_id = mention.referenced_tweet_id
             original_tweet = None
             
-            if "referenced_tweet" not in mention:
+            if mention.referenced_tweet is not None:
+                original_tweet = mention.referenced_tweet
+            else:
+                # Reuse tweets hydrated in earlier cycles, including known deletions
+                original_tweet = bot_state.tweet_cache.get(original_tweet_id)
+                if original_tweet is NOT_FOUND:
+                    logging.info("🚫 Referenced tweet deleted (cached)")
+                    return
+            
+            if original_tweet is None:
+                if not bot_state.scheduler.is_available("lookup"):
+                    return _defer_mention(mention, bot_state, "lookup", bot_state.scheduler.available_in("lookup"))
+                
                 # Apply gradual backoff for lookup based on current usage
                 backoff_delay = bot_state.get_gradual_backoff_delay("lookup")
                 if backoff_delay > 0:
                     logging.info(f"Applying gradual backoff delay of {backoff_delay:.1f}s for lookup (usage: {bot_state.get_lookup_usage_ratio():.2%})")
-                    time.sleep(backoff_delay)
+                    budget.sleep(backoff_delay, reserve=POST_DELAY[0])
                 
-                # Check if we're within rate limits for tweet lookup
-                if not bot_state.can_lookup_tweet():
-                    wait_time = bot_state.get_lookup_window_reset() + random.randint(5, 20)
-                    logging.warning(f"⚠️ Lookup rate limit reached. Waiting {wait_time:.1f}s")
-                    time.sleep(wait_time)
+                # Check if a lookup fits within every quota layer
+                admission = bot_state.admit("lookup")
+                if not admission.allowed:
+                    wait_time = admission.wait_seconds + random.randint(5, 20)
+                    logging.warning(f"⚠️ Lookup quota reached ({admission.binding}). Retrying in {wait_time:.1f}s")
+                    bot_state.scheduler.block("lookup", wait_time)
+                    return _defer_mention(mention, bot_state, "lookup", wait_time)
                 
-                original_tweet = client.get_tweet(
-                    original_tweet_id,
-                    expansions=["author_id"],
-                    tweet_fields=["created_at", "author_id", "text"]
-                )
+                # Fail fast while the lookup endpoint is known to be down; last,
+                # so a half-open probe is only taken for a call that is made
+                if not bot_state.breakers.allow("lookup"):
+                    logging.warning("⛔ Lookup circuit open. Skipping mention")
+                    return
+                
+                with Deadline.for_operation("lookup"):
+                    response = client.get_tweet(
+                        original_tweet_id,
+                        expansions=["author_id"],
+                        tweet_fields=["created_at", "author_id", "text"]
+                    )
                 
                 # Record the lookup request
                 bot_state.record_lookup()
-            else:
-                original_tweet = {"data": mention["referenced_tweet"]}
+                bot_state.breakers.record_success("lookup")
+                _sync_rate_headers(client, bot_state, "lookup")
+                
+                if response and response.data:
+                    original_tweet = TweetRef.from_payload(payload_of(response.data)).to_dict()
+                    bot_state.tweet_cache.put(original_tweet_id, original_tweet)
             
-            if original_tweet and hasattr(original_tweet, 'data') and original_tweet.data:
+            if original_tweet and bot_state.quoted_targets.recently_quoted(original_tweet_id):
+                logging.info("Target tweet was quoted recently. Skipping duplicate quote")
+            elif original_tweet:
+                stage = "post"
+                if not bot_state.scheduler.is_available("post"):
+                    return _defer_mention(mention, bot_state, "post", bot_state.scheduler.available_in("post"))
+                
                 # Apply gradual backoff for posting based on current usage
                 backoff_delay = bot_state.get_gradual_backoff_delay("post")
                 if backoff_delay > 0:
                     logging.info(f"Applying gradual backoff delay of {backoff_delay:.1f}s for posting (usage: {bot_state.get_post_usage_ratio():.2%})")
-                    time.sleep(backoff_delay)
+                    budget.sleep(backoff_delay, reserve=POST_DELAY[0])
+                
+                # Check if a post fits within every quota layer
+                admission = bot_state.admit("post")
+                if not admission.allowed:
+                    wait_time = admission.wait_seconds + random.randint(5, 20)
+                    logging.warning(f"⚠️ Post quota reached ({admission.binding}). Retrying in {wait_time:.1f}s")
+                    bot_state.scheduler.block("post", wait_time)
+                    return _defer_mention(mention, bot_state, "post", wait_time)
                 
-                # Check if we're within rate limits for posting
-                if not bot_state.can_post_tweet():
-                    wait_time = bot_state.get_post_window_reset() + random.randint(5, 20)
-                    logging.warning(f"⚠️ Post rate limit reached. Waiting {wait_time:.1f}s")
-                    time.sleep(wait_time)
+                if not bot_state.breakers.allow("post"):
+                    logging.warning("⛔ Post circuit open. Skipping mention")
+                    return
+                
+                # The post is going ahead: only now does it use up the author's share
+                bot_state.fair_share.charge(mention.author_id)
                 
                 # Occasionally add slight typos to snarky comments (more human-like)
                 snarky_comment = random.choice(SNARKY_COMMENTS)
@@ -181,31 +356,74 @@ def process_mention(mention, client, bot_state):
                     char_pos = random.randint(0, len(snarky_comment)-1)
                     snarky_comment = snarky_comment[:char_pos] + snarky_comment[char_pos+1:]
                 
-                human_delay(5, 45)  # Random delay before posting
+                budget.delay(*POST_DELAY)  # Random delay before posting, within the latency budget
                 
-                result = client.create_tweet(
-                    text=snarky_comment,
-                    quote_tweet_id=original_tweet_id
-                )
+                with Deadline.for_operation("post"):
+                    result = client.create_tweet(
+                        text=snarky_comment,
+                        quote_tweet_id=original_tweet_id
+                    )
                 
                 # Record the post request
                 bot_state.record_post()
-                logging.info(f"🔥 Quote tweeted: {snarky_comment}")
+                bot_state.breakers.record_success("post")
+                _sync_rate_headers(client, bot_state, "post")
+                bot_state.record_quote(original_tweet_id)
+                bot_state.latency.record(budget.elapsed())
+                logging.info(f"🔥 Quote tweeted: {snarky_comment} ({budget.elapsed():.1f}s, budget {budget.budget:.0f}s)")
                 
+        except DeadlineExceeded as e:
+            bot_state.record_timeout(stage)
+            if stage == "post":
+                # The quote may have gone out before the connection dropped;
+                # never risk posting it twice
+                bot_state.record_quote(mention.referenced_tweet_id)
+                logging.warning(f"⌛ Post timed out, treating the quote as sent: {e}")
+            else:
+                logging.warning(f"⌛ Lookup timed out: {e}")
+                return _defer_mention(mention, bot_state, stage, 60)
         except tweepy.errors.TooManyRequests as e:
-            handle_rate_limit_response(429, getattr(e, 'response', {}).headers if hasattr(e, 'response') else None, bot_state, "post")
+            bot_state.breakers.record_success(stage)  # Throttled, but the API is up
+            wait_time = handle_rate_limit_response(429, getattr(e, 'response', {}).headers if hasattr(e, 'response') else None, bot_state, stage)
+            return _defer_mention(mention, bot_state, stage, wait_time)
         except tweepy.errors.NotFound:
+            bot_state.breakers.record_success(stage)
+            if stage == "lookup":
+                bot_state.tweet_cache.put_missing(mention.referenced_tweet_id)
             logging.warning("🚫 Referenced tweet deleted")
         except tweepy.errors.Forbidden as e:
+            bot_state.breakers.record_success(stage)
             logging.warning(f"🚫 Forbidden action: {str(e)}")
             if "suspended" in str(e).lower():
                 raise  # Re-raise to handle suspension at a higher level
         except tweepy.errors.TweepyException as e:
             logging.error(f"Error processing tweet: {e}")
-            handle_rate_limit_response(None, None, bot_state, "post")
+            if _is_health_failure(e):
+                bot_state.breakers.record_failure(stage)
+            else:
+                bot_state.breakers.record_success(stage)
+            if not bot_state.breakers.is_open(stage):
+                handle_rate_limit_response(None, None, bot_state, stage)
         except Exception as e:
             logging.error(f"Unexpected error processing mention: {e}")
-            human_delay(10, 30)  # Brief pause before continuing to next mention
+            bot_state.breakers.record_failure(stage)
+            if not bot_state.breakers.is_open(stage):
+                human_delay(10, 30)  # Brief pause before continuing to next mention
+
+def process_due_retries(client, bot_state):
+    """
+    Process deferred mentions whose endpoint should be available again.
+    
+    Args:
+        client (tweepy.Client): Authenticated Twitter API client.
+        bot_state: Bot state manager object.
+    """
+    due = bot_state.retry_queue.pop_due()
+    if due:
+        logging.info(f"🔁 Retrying {len(due)} deferred mentions")
+        with bot_state.cycle():
+            for mention in due:
+                process_mention(mention, client, bot_state)
 
 def check_rate_limits(client, bot_state):
     """
@@ -0,0 +1,151 @@
+def payload_of(item):
+    """Get the raw v2 payload of a tweet, whether it is a tweepy model or already a dict."""
+    return item if isinstance(item, dict) else item.data
+
+def _to_id(value):
+    """Normalize a tweet/user id from the API (a string in v2 payloads) to int."""
+    return int(value) if value is not None else None
+
+class TweetRef:
+    """
+    The fields we use of a referenced (quoted-to-be) tweet.
+
+    Built straight from the raw v2 payload so the response objects it came
+    from can be released.
+    """
+    __slots__ = ("id", "text", "author_id", "created_at")
+
+    def __init__(self, id, text="", author_id=None, created_at=None):
+        self.id = id
+        self.text = text
+        self.author_id = author_id
+        self.created_at = created_at
+
+    @classmethod
+    def from_payload(cls, payload):
+        """
+        Args:
+            payload (dict): Raw tweet object, e.g. tweepy.Tweet.data.
+
+        Returns:
+            TweetRef: The extracted tweet.
+        """
+        return cls(
+            _to_id(payload["id"]),
+            payload.get("text", ""),
+            _to_id(payload.get("author_id")),
+            payload.get("created_at")
+        )
+
+    def to_dict(self):
+        """Serialize as a payload-shaped dict (also accepted by from_payload)."""
+        return {"id": self.id, "text": self.text, "author_id": self.author_id, "created_at": self.created_at}
+
+    def __repr__(self):
+        return f"TweetRef(id={self.id})"
+
+# Command keyword -> preference action
+COMMANDS = (("!optout", "opt_out"), ("!optin", "opt_in"))
+
+def parse_command(text_lower):
+    """Get the opt-in/out action a lowercased mention text asks for, or None."""
+    for keyword, action in COMMANDS:
+        if keyword in text_lower:
+            return action
+    return None
+
+class Mention:
+    """
+    A mention of the bot, reduced to the fields the pipeline uses.
+
+    Attributes:
+        id (int): Mention tweet id.
+        text (str): Mention text.
+        author_id (int): Author's user id.
+        created_at (str): Creation time as sent by the API (ISO 8601).
+        referenced_tweet_id (int): Tweet the mention replies to, if any.
+        referenced_tweet (TweetRef): That tweet, when the response included it.
+        found_at (float): When the bot found the mention, in epoch seconds.
+        text_lower (str): Lowercased text, computed once for matching.
+        command (str): "opt_out" or "opt_in" for a command mention, else None.
+        followers (list): Mentions of the same tweet coalesced into this one.
+    """
+    __slots__ = ("id", "text", "author_id", "created_at", "referenced_tweet_id",
+                 "referenced_tweet", "found_at", "text_lower", "command", "followers")
+
+    def __init__(self, id, text="", author_id=None, created_at=None,
+                 referenced_tweet_id=None, referenced_tweet=None, found_at=None):
+        self.id = id
+        self.text = text
+        self.author_id = author_id
+        self.created_at = created_at
+        self.referenced_tweet_id = referenced_tweet_id
+        self.referenced_tweet = referenced_tweet
+        self.found_at = found_at
+        self.text_lower = text.lower()
+        self.command = parse_command(self.text_lower)
+        self.followers = []
+
+    @classmethod
+    def from_payload(cls, payload, included=None, found_at=None):
+        """
+        Extract a mention from a raw v2 tweet payload.
+
+        Args:
+            payload (dict): Raw tweet object, e.g. tweepy.Tweet.data.
+            included (dict, optional): Raw included tweets keyed by int id,
+                used to attach the replied-to tweet without a lookup.
+            found_at (float, optional): When the mention was found.
+
+        Returns:
+            Mention: The extracted mention.
+        """
+        referenced_tweet_id = None
+        referenced_tweet = None
+        for ref in payload.get("referenced_tweets") or ():
+            if ref.get("type") == "replied_to":
+                referenced_tweet_id = _to_id(ref["id"])
+                if included and referenced_tweet_id in included:
+                    referenced_tweet = TweetRef.from_payload(included[referenced_tweet_id])
+                break
+        return cls(
+            _to_id(payload["id"]),
+            payload.get("text", ""),
+            _to_id(payload.get("author_id")),
+            payload.get("created_at"),
+            referenced_tweet_id,
+            referenced_tweet,
+            found_at
+        )
+
+    def to_dict(self):
+        """Serialize to JSON-safe data, e.g. for the worker spool."""
+        return {
+            "id": self.id,
+            "text": self.text,
+            "author_id": self.author_id,
+            "created_at": self.created_at,
+            "referenced_tweet_id": self.referenced_tweet_id,
+            "referenced_tweet": self.referenced_tweet.to_dict() if self.referenced_tweet else None,
+            "found_at": self.found_at,
+            "followers": [follower.to_dict() for follower in self.followers]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a mention written by to_dict."""
+        referenced = data.get("referenced_tweet")
+        mention = cls(
+            data["id"],
+            data.get("text", ""),
+            data.get("author_id"),
+            data.get("created_at"),
+            data.get("referenced_tweet_id"),
+            TweetRef.from_payload(referenced) if referenced else None,
+            data.get("found_at")
+        )
+        mention.followers = [cls.from_dict(follower) for follower in data.get("followers", [])]
+        return mention
+
+    def __repr__(self):
+        return f"Mention(id={self.id}, referenced_tweet_id={self.referenced_tweet_id})"
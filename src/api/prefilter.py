@@ -0,0 +1,165 @@
+import time
+import logging
+
+from config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+MAX_EXCLUSIONS = 10         # -from: operators added to a query at most
+MIN_EXCLUDE_COUNT = 3       # Filtered mentions before an author is excluded
+EXCLUSION_TTL = 6 * 60 * 60 # Seconds an author stays excluded
+MAX_TRACKED = 1000          # Opted-out authors counted in memory
+
+def self_user_id(access_token):
+    """Get the bot's user id from its OAuth 1.0a access token ("<id>-<secret>")."""
+    prefix = (access_token or "").partition("-")[0]
+    return int(prefix) if prefix.isdigit() else None
+
+class Prefilter:
+    """
+    Drops mentions that can never produce a post, straight after search.
+
+    One pass over a page removes already handled mentions, the bot's own
+    tweets, and mentions from opted-out authors, so none of them spends a
+    lookup, a backoff or latency budget. Commands always pass, so an
+    opted-out user can still opt back in. Each author's preference is
+    looked up once per page.
+
+    With `exclude_heavy` on, opted-out authors who keep mentioning the bot
+    are excluded in the search query itself with -from: operators. Their raw
+    ids are only held in memory, never stored, and each exclusion lapses
+    after `exclusion_ttl` so an excluded user's !optin is seen eventually.
+    """
+    def __init__(self, self_id=None, exclude_heavy=False, max_exclusions=MAX_EXCLUSIONS,
+                 min_count=MIN_EXCLUDE_COUNT, exclusion_ttl=EXCLUSION_TTL, clock=time.time):
+        """
+        Args:
+            self_id (int, optional): The bot's user id.
+            exclude_heavy (bool): Add -from: exclusions to search queries.
+            max_exclusions (int): Exclusions per query at most.
+            min_count (int): Filtered mentions before an author is excluded.
+            exclusion_ttl (float): Seconds an exclusion lasts.
+            clock (callable): Returns the current time in seconds.
+        """
+        self.self_id = self_id
+        self.exclude_heavy = exclude_heavy
+        self.max_exclusions = max_exclusions
+        self.min_count = min_count
+        self.exclusion_ttl = exclusion_ttl
+        self.clock = clock
+        self._counts = {}       # raw author id -> filtered mentions
+        self._excluded = {}     # raw author id -> excluded until
+
+    @classmethod
+    def from_config(cls, options=None):
+        """
+        Create a prefilter from the "prefilter" config section.
+
+        The bot's own id comes from the configured access token.
+
+        Args:
+            options (dict, optional): Overrides the config section.
+
+        Returns:
+            Prefilter: The configured prefilter.
+        """
+        if options is None:
+            options = get_config_section("prefilter")
+        return cls(
+            self_id=self_user_id(get_config_section("twitter_api").get("ACCESS_TOKEN")),
+            exclude_heavy=options.get("exclude_heavy", False),
+            max_exclusions=options.get("max_exclusions", MAX_EXCLUSIONS),
+            min_count=options.get("min_count", MIN_EXCLUDE_COUNT),
+            exclusion_ttl=options.get("exclusion_ttl", EXCLUSION_TTL)
+        )
+
+    def apply(self, mentions, bot_state):
+        """
+        Filter a page of mentions.
+
+        Dropped mentions are marked handled.
+
+        Args:
+            mentions (list): Mentions in page order.
+            bot_state: Bot state manager object.
+
+        Returns:
+            list: Mentions worth processing, in page order.
+        """
+        opted_out = {}
+        kept = []
+        dropped = 0
+        for mention in mentions:
+            if bot_state.is_handled(mention.id):
+                continue
+            author = mention.author_id
+            if mention.command == "opt_in":
+                self._counts.pop(author, None)
+                self._excluded.pop(author, None)
+            elif mention.command is None:
+                if author == self.self_id:
+                    drop = True
+                else:
+                    if author not in opted_out:
+                        opted_out[author] = bot_state.is_opted_out(str(author))
+                    drop = opted_out[author]
+                    if drop and self.exclude_heavy:
+                        self._count(author)
+                if drop:
+                    bot_state.mark_handled(mention.id)
+                    dropped += 1
+                    continue
+            kept.append(mention)
+        if dropped:
+            logger.info("Prefiltered %d mentions that can't be quoted", dropped)
+        return kept
+
+    def _count(self, author):
+        """Count a filtered mention towards excluding its author."""
+        self._counts[author] = self._counts.get(author, 0) + 1
+        if len(self._counts) > MAX_TRACKED:
+            # Keep the heaviest half
+            heaviest = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+            self._counts = dict(heaviest[:MAX_TRACKED // 2])
+
+    def exclusions(self):
+        """
+        Get the authors to exclude from searches right now, heaviest first.
+
+        Returns:
+            list: Raw author ids.
+        """
+        if not self.exclude_heavy:
+            return []
+        now = self.clock()
+        for author, until in list(self._excluded.items()):
+            if until <= now:
+                # Lapsed: the author must be filtered min_count times again
+                del self._excluded[author]
+                self._counts.pop(author, None)
+        candidates = sorted(
+            (author for author, count in self._counts.items()
+             if count >= self.min_count and author not in self._excluded),
+            key=lambda author: self._counts[author], reverse=True
+        )
+        for author in candidates[:max(0, self.max_exclusions - len(self._excluded))]:
+            self._excluded[author] = now + self.exclusion_ttl
+        return sorted(self._excluded, key=lambda author: self._counts.get(author, 0), reverse=True)
+
+    def narrow(self, query, max_length):
+        """
+        Add -from: exclusions to a query while it stays within max_length.
+
+        Args:
+            query (str): Search query.
+            max_length (int): Query length limit.
+
+        Returns:
+            str: The query with as many exclusions as fit.
+        """
+        for author in self.exclusions():
+            narrowed = f"{query} -from:{author}"
+            if len(narrowed) > max_length:
+                break
+            query = narrowed
+        return query
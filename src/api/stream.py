@@ -0,0 +1,401 @@
+import json
+import time
+import queue
+import logging
+import threading
+import contextlib
+from collections import OrderedDict
+from datetime import datetime
+
+import requests
+import tweepy
+
+from config import load_config, get_config_section
+from src.api.transport import API_HOST, ERROR_CLASSES
+from src.api.deadline import Deadline, DeadlineExceeded, TimeoutAdapter, CONNECT_TIMEOUT
+from src.api.endpoints import extract_mentions, process_due_retries, SEARCH_EXPANSIONS, SEARCH_TWEET_FIELDS
+
+logger = logging.getLogger(__name__)
+
+STREAM_ROUTE = "/2/tweets/search/stream"
+RULES_ROUTE = "/2/tweets/search/stream/rules"
+RULE_TAG = "houndthecult:"      # Prefix of the rules this bot manages
+HEARTBEAT_TIMEOUT = 30      # Seconds without data or keep-alive before a stream counts as stalled
+CATCH_UP_AFTER = 60         # Seconds of downtime after which a reconnect runs a catch-up search
+CHECK_INTERVAL = 300        # Seconds between check-time updates while connected and idle
+MIN_WAIT = 1.0              # Shortest wait for stream events, so the loop never spins
+
+# Reconnect backoff per failure kind: (first delay, cap, exponential), as
+# Twitter asks of streaming clients
+RECONNECT_BACKOFF = {
+    "network": (0.25, 16, False),   # Linear: 0.25s, 0.5s, ... up to 16s
+    "http": (5, 320, True),         # Doubling from 5s up to 320s
+    "rate_limit": (60, 960, True)   # Doubling from a minute
+}
+
+def reconnect_delay(kind, attempt):
+    """
+    Get the wait before the attempt-th consecutive reconnect after a failure.
+
+    Args:
+        kind (str): "network", "http" or "rate_limit".
+        attempt (int): Consecutive failures of that kind, from 1.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    first, cap, exponential = RECONNECT_BACKOFF[kind]
+    delay = first * 2 ** (attempt - 1) if exponential else first * attempt
+    return min(cap, delay)
+
+class FilteredStream:
+    """
+    Long-lived filtered-stream connection, read on a background thread.
+
+    Manages its own tagged rules, then reads the stream line by line. Every
+    matched tweet is put on `events` as ("tweet", payload). If nothing, not
+    even a keep-alive, arrives within `heartbeat_timeout`, the connection
+    counts as stalled and is dropped. Dropped connections are reopened with
+    the backoff for the failure kind. A reconnect after at least
+    `catch_up_after` seconds without data puts ("gap", seconds) on
+    `events`. Errors a reconnect can't fix (bad credentials, a suspended
+    account, rejected rules) are put there as ("error", exception) and end
+    the thread.
+    """
+    def __init__(self, bearer_token, rules, host=API_HOST, heartbeat_timeout=HEARTBEAT_TIMEOUT,
+                 catch_up_after=CATCH_UP_AFTER, session=None, clock=time.monotonic):
+        """
+        Args:
+            bearer_token (str): App-only token; the stream doesn't take user auth.
+            rules (dict): Rule tag suffix -> rule value.
+            host (str): API host, e.g. a local stand-in server.
+            heartbeat_timeout (float): Seconds of silence before reconnecting.
+            catch_up_after (float): Seconds of downtime worth a gap event.
+            session (requests.Session, optional): Session to use.
+            clock (callable): Monotonic time source.
+        """
+        self.host = host.rstrip("/")
+        self.rules = {f"{RULE_TAG}{tag}": value for tag, value in rules.items()}
+        self.heartbeat_timeout = heartbeat_timeout
+        self.catch_up_after = catch_up_after
+        self.clock = clock
+        self.session = session or requests.Session()
+        if session is None:
+            # The read timeout bounds each wait on the socket, so it is the heartbeat check
+            adapter = TimeoutAdapter(connect=CONNECT_TIMEOUT, read=heartbeat_timeout)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = "houndthecult"
+        self.session.headers["Authorization"] = f"Bearer {bearer_token}"
+        self.events = queue.SimpleQueue()
+        self.connected = False
+        self.connects = 0
+        self._response = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _request(self, method, route, **kwargs):
+        """Make a request, raising the tweepy exception for a failed status."""
+        with Deadline.for_operation("stream"):
+            response = self.session.request(method, self.host + route, **kwargs)
+        status = response.status_code
+        if not 200 <= status < 300:
+            error_class = ERROR_CLASSES.get(
+                status, tweepy.errors.TwitterServerError if status >= 500 else tweepy.errors.HTTPException
+            )
+            raise error_class(response)
+        return response
+
+    def sync_rules(self):
+        """
+        Make the stream's tagged rules match ours, leaving other rules alone.
+
+        Returns:
+            tuple: (rules added, rules deleted)
+        """
+        current = self._request("GET", RULES_ROUTE).json().get("data") or []
+        kept = {rule["tag"] for rule in current if self.rules.get(rule.get("tag")) == rule["value"]}
+        stale = [
+            rule["id"] for rule in current
+            if (rule.get("tag") or "").startswith(RULE_TAG) and rule["tag"] not in kept
+        ]
+        missing = [{"value": value, "tag": tag} for tag, value in self.rules.items() if tag not in kept]
+        if stale:
+            self._request("POST", RULES_ROUTE, json={"delete": {"ids": stale}})
+        if missing:
+            self._request("POST", RULES_ROUTE, json={"add": missing})
+        if stale or missing:
+            logger.info("📡 Stream rules updated: %d added, %d deleted", len(missing), len(stale))
+        return len(missing), len(stale)
+
+    def start(self):
+        """Start reading on a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stream", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop reading and drop the connection."""
+        self._stop.set()
+        response = self._response
+        if response is not None:
+            response.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.heartbeat_timeout)
+        self.session.close()
+
+    def _connect(self):
+        return self._request("GET", STREAM_ROUTE, stream=True, params={
+            "expansions": ",".join(SEARCH_EXPANSIONS),
+            "tweet.fields": ",".join(SEARCH_TWEET_FIELDS)
+        })
+
+    def _run(self):
+        try:
+            self._read_loop()
+        except Exception as e:
+            self.events.put(("error", e))
+
+    def _read_loop(self):
+        failures = {}           # failure kind -> consecutive count
+        last_alive = None       # When data last arrived
+        while not self._stop.is_set():
+            kind = None
+            try:
+                self._response = self._connect()
+            except (tweepy.errors.BadRequest, tweepy.errors.Unauthorized, tweepy.errors.Forbidden) as e:
+                self.events.put(("error", e))
+                return
+            except tweepy.errors.TooManyRequests as e:
+                kind, reason = "rate_limit", e
+            except tweepy.errors.HTTPException as e:
+                kind, reason = "http", e
+            except (requests.exceptions.RequestException, DeadlineExceeded) as e:
+                kind, reason = "network", e
+
+            if kind is None:
+                failures.clear()
+                self.connected = True
+                self.connects += 1
+                now = self.clock()
+                if last_alive is not None and now - last_alive >= self.catch_up_after:
+                    self.events.put(("gap", now - last_alive))
+                last_alive = now
+                logger.info("📡 Stream connected")
+                try:
+                    for line in self._response.iter_lines(chunk_size=None):
+                        last_alive = self.clock()
+                        if self._stop.is_set():
+                            return
+                        if line:    # Empty lines are keep-alives
+                            self._handle_line(line)
+                    reason = "closed by the server"
+                except (requests.exceptions.RequestException, DeadlineExceeded) as e:
+                    # A read timing out means the heartbeats stopped
+                    reason = e
+                finally:
+                    self.connected = False
+                    self._response.close()
+                kind = "network"
+
+            if self._stop.is_set():
+                return
+            failures[kind] = failures.get(kind, 0) + 1
+            delay = reconnect_delay(kind, failures[kind])
+            logger.warning("📡 Stream disconnected (%s). Reconnecting in %.2fs", reason, delay)
+            self._stop.wait(delay)
+
+    def _handle_line(self, line):
+        try:
+            payload = json.loads(line)
+        except ValueError:
+            logger.warning("Skipping malformed stream line: %.80r", line)
+            return
+        if "data" in payload:
+            self.events.put(("tweet", payload))
+        elif payload.get("errors"):
+            # Operational disconnects announce themselves before the stream closes
+            logger.warning("Stream error: %s", payload["errors"][0].get("title") or payload["errors"][0])
+
+class MentionStream:
+    """
+    Ingests mentions from a filtered stream instead of polling search.
+
+    Each watch-list query becomes a stream rule, so matched tweets route to
+    the same targets and handlers as search results. Tweets that arrive
+    while a batch is being processed are handled together as the next
+    batch, so they coalesce and are fairly ordered as usual. On start, and
+    after a reconnect that followed real downtime, one search catches up
+    from the last check time; the handled set drops anything already seen.
+    Only the bot state's owner thread touches it.
+    """
+    def __init__(self, client, bot_state, watchlist, stream, check_interval=CHECK_INTERVAL,
+                 clock=time.monotonic, diagnostics=None):
+        """
+        Args:
+            client (tweepy.Client): Authenticated Twitter API client.
+            bot_state: Bot state manager object.
+            watchlist (Watchlist): Targets to stream.
+            stream (FilteredStream): Connection with one rule per watch-list query.
+            check_interval (float): Seconds between check-time updates while idle.
+            clock (callable): Monotonic time source.
+            diagnostics (Diagnostics, optional): Profiles batches on request;
+                each dispatch counts as a cycle.
+        """
+        self.client = client
+        self.bot_state = bot_state
+        self.watchlist = watchlist
+        self.stream = stream
+        self.check_interval = check_interval
+        self.clock = clock
+        self.diagnostics = diagnostics
+        self._batches = {f"{RULE_TAG}{i}": batch for i, (_, batch) in enumerate(watchlist.queries)}
+        self._checked_at = clock()
+
+    @classmethod
+    def from_config(cls, client, bot_state, watchlist, options=None, diagnostics=None):
+        """
+        Create a mention stream from the "stream" config section.
+
+        Args:
+            client (tweepy.Client): Authenticated Twitter API client.
+            bot_state: Bot state manager object.
+            watchlist (Watchlist): Targets to stream.
+            options (dict, optional): Overrides the config section.
+            diagnostics (Diagnostics, optional): Profiles batches on request.
+
+        Returns:
+            MentionStream: The configured stream, not yet started.
+        """
+        if options is None:
+            options = get_config_section("stream")
+        stream = FilteredStream(
+            load_config()["twitter_api"]["BEARER_TOKEN"],
+            {str(i): query for i, (query, _) in enumerate(watchlist.queries)},
+            host=options.get("host", API_HOST),
+            heartbeat_timeout=options.get("heartbeat_timeout", HEARTBEAT_TIMEOUT),
+            catch_up_after=options.get("catch_up_after", CATCH_UP_AFTER)
+        )
+        return cls(client, bot_state, watchlist, stream,
+                   check_interval=options.get("check_interval", CHECK_INTERVAL),
+                   diagnostics=diagnostics)
+
+    def route(self, payloads):
+        """
+        Turn stream payloads into routed mentions.
+
+        Args:
+            payloads (list): Stream lines, each with data, includes and
+                matching_rules.
+
+        Returns:
+            OrderedDict: WatchTarget -> mentions, in target order.
+        """
+        included = [tweet for payload in payloads for tweet in (payload.get("includes") or {}).get("tweets", [])]
+        response = tweepy.Response([payload["data"] for payload in payloads], {"tweets": included}, [], {})
+        mentions = self.bot_state.prefilter.apply(extract_mentions(response, self.bot_state), self.bot_state)
+        tags = {
+            int(payload["data"]["id"]): next(
+                (rule.get("tag") for rule in payload.get("matching_rules") or () if rule.get("tag") in self._batches),
+                None
+            )
+            for payload in payloads
+        }
+        found = OrderedDict()
+        for mention in mentions:
+            batch = self._batches.get(tags.get(mention.id), self.watchlist.targets)
+            for target, routed in self.watchlist.route([mention], batch).items():
+                found.setdefault(target, []).extend(routed)
+        return OrderedDict((t, found[t]) for t in self.watchlist.targets if t in found)
+
+    def _dispatch(self, found, checked_at=None):
+        total = sum(len(mentions) for mentions in found.values())
+        with self.diagnostics.cycle() if self.diagnostics else contextlib.nullcontext():
+            with self.bot_state.cycle():
+                if total:
+                    logger.info("🎯 Streamed %d new mentions", total)
+                    self.bot_state.history.record("mentions", total)
+                    self.watchlist.dispatch(found, self.client, self.bot_state)
+                self.bot_state.update_check_time(checked_at)
+            self._checked_at = self.clock()
+            self.bot_state.breakers.export()
+            self.bot_state.tweet_cache.save()
+            self.bot_state.latency.export()
+
+    def catch_up(self, downtime=None):
+        """Search for what arrived while the stream wasn't connected."""
+        if downtime is not None:
+            logger.info("⏪ Stream was down for %.0fs. Catching up", downtime)
+        searched_at = datetime.now()
+        self._dispatch(self.watchlist.search(self.client, self.bot_state), searched_at)
+
+    def _wait_time(self):
+        if self.stream.connected:
+            wait = self.check_interval - (self.clock() - self._checked_at)
+        else:
+            # No idle update is due while disconnected; the reconnect's events wake us
+            wait = self.check_interval
+        due_in = self.bot_state.retry_queue.next_due_in()
+        if due_in is not None:
+            wait = min(wait, due_in)
+        return max(MIN_WAIT, wait)
+
+    def run(self):
+        """
+        Process streamed mentions until an error a reconnect can't fix.
+
+        Raises:
+            Exception: The stream's fatal error, for the Supervisor.
+        """
+        self.stream.sync_rules()
+        self.stream.start()
+        # Started first, so nothing falls between the catch-up and the stream
+        self.catch_up()
+        while True:
+            try:
+                events = [self.stream.events.get(timeout=self._wait_time())]
+            except queue.Empty:
+                events = []
+            # Everything streamed before now is in this batch or already handled
+            received_at = datetime.now()
+            while True:
+                # Everything already queued goes into the same batch
+                try:
+                    events.append(self.stream.events.get_nowait())
+                except queue.Empty:
+                    break
+
+            payloads = []
+            for kind, value in events:
+                if kind == "error":
+                    raise value
+                if kind == "gap":
+                    self.catch_up(value)
+                else:
+                    payloads.append(value)
+            if payloads:
+                self._dispatch(self.route(payloads), received_at)
+            elif self.stream.connected and self.clock() - self._checked_at >= self.check_interval:
+                # Connected and quiet: nothing before now was missed
+                self._dispatch(OrderedDict(), received_at)
+            process_due_retries(self.client, self.bot_state)
+
+    def close(self):
+        self.stream.close()
+
+def run_stream(client, bot_state, watchlist, options=None, diagnostics=None):
+    """
+    Run the bot on streamed mentions until a fatal error.
+
+    Args:
+        client (tweepy.Client): Authenticated Twitter API client.
+        bot_state: Bot state manager object.
+        watchlist (Watchlist): Targets to stream.
+        options (dict, optional): Overrides the "stream" config section.
+        diagnostics (Diagnostics, optional): Profiles batches on request.
+    """
+    stream = MentionStream.from_config(client, bot_state, watchlist, options, diagnostics)
+    try:
+        stream.run()
+    finally:
+        stream.close()
@@ -0,0 +1,139 @@
+import datetime
+import logging
+
+import requests
+import tweepy
+from requests_oauthlib import OAuth1
+
+from src.api.cassette import CaseInsensitiveHeaders
+from src.api.deadline import timeout_adapter
+
+logger = logging.getLogger(__name__)
+
+API_HOST = "https://api.twitter.com"
+POOL_SIZE = 4       # Keep-alive connections kept per host
+
+# Status code to tweepy error class, so callers' except clauses are unchanged
+ERROR_CLASSES = {
+    400: tweepy.errors.BadRequest,
+    401: tweepy.errors.Unauthorized,
+    403: tweepy.errors.Forbidden,
+    404: tweepy.errors.NotFound,
+    429: tweepy.errors.TooManyRequests
+}
+
+class ApiResponse:
+    """
+    Parsed API response: the raw JSON sections, with no model objects.
+
+    `data` is the raw tweet dict (or list of them); callers extract what they
+    need with the models in src.api.models.
+    """
+    __slots__ = ("data", "includes", "errors", "meta", "headers")
+
+    def __init__(self, data, includes, errors, meta, headers):
+        self.data = data
+        self.includes = includes
+        self.errors = errors
+        self.meta = meta
+        self.headers = headers
+
+def _params(params):
+    """Convert keyword arguments to query parameters the way tweepy does."""
+    query = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if name.endswith("_fields"):
+            name = name[:-len("_fields")] + ".fields"
+        if isinstance(value, (list, tuple)):
+            value = ",".join(map(str, value))
+        elif isinstance(value, datetime.datetime):
+            if value.tzinfo is not None:
+                value = value.astimezone(datetime.timezone.utc)
+            value = value.strftime("%Y-%m-%dT%H:%M:%SZ")
+        query[name] = value
+    return query
+
+class DirectClient:
+    """
+    Thin client for the endpoints on the hot path.
+
+    Calls search_recent_tweets, get_tweet and create_tweet straight over a
+    pooled keep-alive session with a reusable OAuth 1.0a signer, returns the
+    JSON as ApiResponse, and keeps the last response headers in
+    last_headers for rate-limit tracking. Failures raise the same tweepy
+    exceptions the tweepy client would. get_me goes through this client too,
+    but returns a tweepy.User for the startup check.
+    """
+    def __init__(self, bearer_token, consumer_key, consumer_secret,
+                 access_token, access_token_secret, pool_size=POOL_SIZE, session=None):
+        """
+        Args:
+            bearer_token (str): App-only token for reads without user_auth.
+            consumer_key (str): API key.
+            consumer_secret (str): API secret.
+            access_token (str): User access token.
+            access_token_secret (str): User access token secret.
+            pool_size (int): Keep-alive connections kept per host.
+            session (requests.Session, optional): Session to use, e.g. one
+                with a stub adapter mounted for benchmarks.
+        """
+        self.session = session or requests.Session()
+        if session is None:
+            # Connect/read timeouts, capped by the active Deadline
+            self.session.mount("https://", timeout_adapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers["User-Agent"] = "houndthecult"
+        self._bearer = {"Authorization": f"Bearer {bearer_token}"}
+        self._oauth = OAuth1(consumer_key, consumer_secret, access_token, access_token_secret)
+        self.last_headers = CaseInsensitiveHeaders()
+
+    def _request(self, method, route, params=None, json=None, user_auth=False):
+        response = self.session.request(
+            method, API_HOST + route, params=params, json=json,
+            headers=None if user_auth else self._bearer,
+            auth=self._oauth if user_auth else None
+        )
+        self.last_headers = response.headers
+        status = response.status_code
+        if not 200 <= status < 300:
+            error_class = ERROR_CLASSES.get(
+                status, tweepy.errors.TwitterServerError if status >= 500 else tweepy.errors.HTTPException
+            )
+            raise error_class(response)
+        body = response.json()
+        return ApiResponse(
+            body.get("data"),
+            body.get("includes", {}),
+            body.get("errors", []),
+            body.get("meta", {}),
+            response.headers
+        )
+
+    def search_recent_tweets(self, query, *, user_auth=False, **params):
+        return self._request(
+            "GET", "/2/tweets/search/recent", _params(dict(params, query=query)), user_auth=user_auth
+        )
+
+    def get_tweet(self, id, *, user_auth=False, **params):
+        return self._request("GET", f"/2/tweets/{id}", _params(params), user_auth=user_auth)
+
+    def create_tweet(self, *, text=None, quote_tweet_id=None, in_reply_to_tweet_id=None, user_auth=True):
+        body = {}
+        if text is not None:
+            body["text"] = text
+        if quote_tweet_id is not None:
+            body["quote_tweet_id"] = str(quote_tweet_id)
+        if in_reply_to_tweet_id is not None:
+            body["reply"] = {"in_reply_to_tweet_id": str(in_reply_to_tweet_id)}
+        return self._request("POST", "/2/tweets", json=body, user_auth=user_auth)
+
+    def get_me(self, *, user_auth=True, **params):
+        response = self._request("GET", "/2/users/me", _params(params), user_auth=user_auth)
+        return tweepy.Response(
+            tweepy.User(response.data) if response.data else None,
+            response.includes, response.errors, response.meta
+        )
+
+    def close(self):
+        self.session.close()
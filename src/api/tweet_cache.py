@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import logging
+from collections import OrderedDict
+
+from config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+# Cache defaults
+MAX_SIZE = 2000                 # Tweets kept in memory
+TTL = 6 * 60 * 60               # Hydrated tweets are reused for 6h
+NEGATIVE_TTL = 24 * 60 * 60     # Deleted tweets are remembered for 24h
+
+# Marker returned for tweets known to be deleted
+NOT_FOUND = object()
+
+class TweetCache:
+    """
+    Bounded LRU cache of hydrated tweets with per-entry expiry.
+
+    Values are the raw tweet payloads (the "data" dict of a tweepy Tweet),
+    keyed by tweet id. Tweets that came back NotFound are cached as
+    NOT_FOUND so deleted tweets are not fetched again.
+    """
+    def __init__(self, max_size=MAX_SIZE, ttl=TTL, negative_ttl=NEGATIVE_TTL,
+                 cache_file=None, clock=time.time):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of entries.
+            ttl (float): Lifetime of a hydrated tweet, in seconds.
+            negative_ttl (float): Lifetime of a NotFound entry, in seconds.
+            cache_file (str, optional): Where to persist the cache across
+                restarts. Without one the cache is in-memory only.
+            clock (callable): Returns the current time in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.cache_file = cache_file
+        self.clock = clock
+        self._entries = OrderedDict()  # tweet id -> (expires_at, payload or None)
+        self.hits = 0
+        self.misses = 0
+
+        if cache_file:
+            self.load()
+
+    @classmethod
+    def from_config(cls, options=None):
+        """
+        Create a cache from the "tweet_cache" config section.
+
+        Args:
+            options (dict, optional): Overrides the config section.
+
+        Returns:
+            TweetCache: The configured cache.
+        """
+        if options is None:
+            options = get_config_section("tweet_cache")
+        return cls(
+            max_size=int(options.get("max_size", MAX_SIZE)),
+            ttl=float(options.get("ttl", TTL)),
+            negative_ttl=float(options.get("negative_ttl", NEGATIVE_TTL)),
+            cache_file=options.get("path", "data/tweet_cache.json") if options.get("persist") else None
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, tweet_id):
+        """
+        Look up a tweet.
+
+        Args:
+            tweet_id: Tweet id.
+
+        Returns:
+            dict, NOT_FOUND or None: The cached payload, NOT_FOUND if the
+            tweet is known to be deleted, or None on a miss.
+        """
+        key = str(tweet_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, payload = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return NOT_FOUND if payload is None else payload
+
+    def put(self, tweet_id, payload):
+        """
+        Cache a hydrated tweet.
+
+        Args:
+            tweet_id: Tweet id.
+            payload (dict): Raw tweet data.
+        """
+        self._store(str(tweet_id), payload, self.ttl)
+
+    def put_missing(self, tweet_id):
+        """
+        Remember that a tweet no longer exists.
+
+        Args:
+            tweet_id: Tweet id.
+        """
+        self._store(str(tweet_id), None, self.negative_ttl)
+
+    def _store(self, key, payload, ttl):
+        self._entries[key] = (self.clock() + ttl, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def load(self):
+        """Load unexpired entries from the cache file."""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                entries = json.load(f)
+            now = self.clock()
+            for key, expires_at, payload in entries:
+                if expires_at > now and (payload is None or isinstance(payload, dict)):
+                    self._entries[str(key)] = (float(expires_at), payload)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            logger.info("Loaded %d cached tweets", len(self._entries))
+        except Exception as e:
+            logger.warning("Failed to load tweet cache: %s", e)
+            self._entries.clear()
+
+    def save(self):
+        """Write unexpired entries to the cache file, oldest first."""
+        if not self.cache_file:
+            return
+        try:
+            now = self.clock()
+            entries = [[key, expires_at, payload] for key, (expires_at, payload)
+                       in self._entries.items() if expires_at > now]
+            os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+            # Per process, so concurrent writers never share a temporary file
+            tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(entries, f, separators=(",", ":"), default=str)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning("Failed to save tweet cache: %s", e)
+
+    def stats(self):
+        """Get hit/miss counters for monitoring."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
@@ -0,0 +1,196 @@
+import re
+import logging
+from collections import OrderedDict
+
+from config import get_config_section
+from src.api.endpoints import search_for_mentions, process_mention
+from src.api.coalescing import coalesce_mentions, fair_order
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_LENGTH = 512          # Recent search query limit on the basic tiers
+QUERY_SUFFIX = "-is:retweet"    # Applied to every packed query
+
+def quote_mentions(mentions, client, bot_state):
+    """Default handler: coalesce, share fairly across authors, and quote."""
+    for mention in fair_order(coalesce_mentions(mentions, bot_state), bot_state):
+        process_mention(mention, client, bot_state)
+
+def log_mentions(mentions, client, bot_state):
+    """Handler that only records matches, for keywords we monitor."""
+    for mention in mentions:
+        bot_state.mark_handled(mention.id)
+    logger.info("Watched %d matching tweets", len(mentions))
+
+# Handler name -> callable(mentions, client, bot_state)
+HANDLERS = {
+    "quote": quote_mentions,
+    "log": log_mentions
+}
+
+class WatchTarget:
+    """
+    One thing to watch: a handle, hashtag, keyword or quoted phrase.
+    """
+    __slots__ = ("name", "term", "handler", "_pattern")
+
+    def __init__(self, term, handler="quote", name=None):
+        """
+        Args:
+            term (str): Search term, e.g. "@HoundTheCult", "#cult" or "\"the cult\"".
+            handler (str): Name of the handler in HANDLERS its matches go to.
+            name (str, optional): Label for logs. Defaults to the term.
+        """
+        if handler not in HANDLERS:
+            raise ValueError(f"Unknown watch handler: {handler}")
+        self.term = term.strip()
+        self.handler = handler
+        self.name = name or self.term
+
+        # Handles and hashtags match as whole tokens; keywords and phrases as substrings
+        text = self.term.strip('"').lower()
+        if text[:1] in ("@", "#"):
+            self._pattern = re.compile(r"(?<![\w@#])" + re.escape(text) + r"\b")
+        else:
+            self._pattern = re.compile(re.escape(text))
+
+    def matches(self, text_lower):
+        """Check a lowercased tweet text against the target."""
+        return self._pattern.search(text_lower) is not None
+
+    def __repr__(self):
+        return f"WatchTarget({self.term!r}, handler={self.handler!r})"
+
+def pack_queries(targets, max_length=MAX_QUERY_LENGTH, suffix=QUERY_SUFFIX):
+    """
+    Pack targets into as few OR-combined queries as the length limit allows.
+
+    Args:
+        targets (list): WatchTarget objects, in priority order.
+        max_length (int): Maximum query length in characters.
+        suffix (str): Operators appended to every query.
+
+    Returns:
+        list: (query, targets in that query) pairs.
+
+    Raises:
+        ValueError: If a single target can't fit in a query.
+    """
+    def build(terms):
+        body = terms[0] if len(terms) == 1 else "(" + " OR ".join(terms) + ")"
+        return f"{body} {suffix}" if suffix else body
+
+    batches = []
+    current = []
+    for target in targets:
+        if len(build([target.term])) > max_length:
+            raise ValueError(f"Watch term too long for a query: {target.term}")
+        if current and len(build([t.term for t in current] + [target.term])) > max_length:
+            batches.append(current)
+            current = []
+        current.append(target)
+    if current:
+        batches.append(current)
+    return [(build([t.term for t in batch]), batch) for batch in batches]
+
+class Watchlist:
+    """
+    Watches several targets with as few search reads as possible.
+
+    Targets are packed into OR-combined queries, and each result is routed
+    back to the first target (in list order) whose term it contains, so a
+    tweet is handled once even when it matches several targets.
+    """
+    def __init__(self, targets, max_length=MAX_QUERY_LENGTH):
+        """
+        Args:
+            targets (list): WatchTarget objects, in priority order.
+            max_length (int): Maximum query length in characters.
+        """
+        self.targets = targets
+        self.max_length = max_length
+        self.queries = pack_queries(targets, max_length)
+
+    @classmethod
+    def from_config(cls, username="HoundTheCult", options=None):
+        """
+        Create the watch list from the "watchlist" config section.
+
+        The bot's own handle is always watched first, with the quote handler,
+        so the default configuration behaves exactly like a plain mention
+        search.
+
+        Args:
+            username (str): The bot's username.
+            options (dict, optional): Overrides the config section. "targets"
+                is a list of {"term", "handler", "name"} objects;
+                "max_query_length" overrides the query limit.
+
+        Returns:
+            Watchlist: The configured watch list.
+        """
+        if options is None:
+            options = get_config_section("watchlist")
+        targets = [WatchTarget(f"@{username}", "quote", name="mentions")]
+        seen = {targets[0].term.lower()}
+        for entry in options.get("targets", []):
+            target = WatchTarget(entry["term"], entry.get("handler", "quote"), entry.get("name"))
+            if target.term.lower() not in seen:
+                seen.add(target.term.lower())
+                targets.append(target)
+        return cls(targets, int(options.get("max_query_length", MAX_QUERY_LENGTH)))
+
+    def route(self, mentions, batch):
+        """
+        Group search results by the target they belong to.
+
+        Args:
+            mentions (list): Results of one packed query.
+            batch (list): The targets in that query.
+
+        Returns:
+            OrderedDict: WatchTarget -> list of mentions.
+        """
+        routed = OrderedDict()
+        for mention in mentions:
+            # Matched by an operator the text doesn't show; give it to the batch's first target
+            target = next((t for t in batch if t.matches(mention.text_lower)), batch[0])
+            routed.setdefault(target, []).append(mention)
+        return routed
+
+    def search(self, client, bot_state):
+        """
+        Run every packed query and route the results.
+
+        Args:
+            client (tweepy.Client): Authenticated Twitter API client.
+            bot_state: Bot state manager object.
+
+        Returns:
+            OrderedDict: WatchTarget -> list of mentions, in target order.
+        """
+        found = OrderedDict()
+        seen = set()
+        for query, batch in self.queries:
+            # A tweet matching targets in several queries is routed once
+            query = bot_state.prefilter.narrow(query, self.max_length)
+            results = [m for m in search_for_mentions(client, bot_state, query=query) if m.id not in seen]
+            seen.update(m.id for m in results)
+            for target, mentions in self.route(results, batch).items():
+                found.setdefault(target, []).extend(mentions)
+        ordered = OrderedDict((t, found[t]) for t in self.targets if t in found)
+        if ordered:
+            logger.info("Watch results: %s", ", ".join(f"{t.name}={len(m)}" for t, m in ordered.items()))
+        return ordered
+
+    def dispatch(self, found, client, bot_state):
+        """
+        Hand routed results to their targets' handlers.
+
+        Args:
+            found (OrderedDict): Results of search().
+            client (tweepy.Client): Authenticated Twitter API client.
+            bot_state: Bot state manager object.
+        """
+        for target, mentions in found.items():
+            HANDLERS[target.handler](mentions, client, bot_state)
@@ -0,0 +1,113 @@
+import time
+import random
+import logging
+import contextlib
+from datetime import datetime
+
+from src.utils.timing import human_delay
+from src.api.endpoints import process_due_retries, check_rate_limits
+from src.api.stream import run_stream
+
+def wait_for_next_cycle(client, bot_state, min_sec, max_sec):
+    """
+    Sleep until the next cycle, waking early to retry deferred mentions.
+    
+    Args:
+        client (tweepy.Client): Authenticated Twitter API client.
+        bot_state: Bot state manager object.
+        min_sec (float): Minimum sleep in seconds.
+        max_sec (float): Maximum sleep in seconds.
+    """
+    wake_at = time.time() + random.uniform(min_sec, max_sec)
+    
+    while True:
+        remaining = wake_at - time.time()
+        if remaining <= 0:
+            return
+        due_in = bot_state.retry_queue.next_due_in()
+        if due_in is None or due_in >= remaining:
+            time.sleep(remaining)
+            return
+        time.sleep(due_in)
+        process_due_retries(client, bot_state)
+
+def hound_the_cult(bot_state, client, watchlist, diagnostics=None):
+    """
+    Main bot function that processes mentions and quotes tweets.
+    
+    Runs until an error escapes a cycle; the Supervisor decides how to
+    recover and calls it again with the components that survived.
+    
+    Args:
+        bot_state: Bot state manager object.
+        client (tweepy.Client): Authenticated Twitter API client.
+        watchlist (Watchlist): Search targets and their handlers.
+        diagnostics (Diagnostics, optional): Profiles cycles on request.
+    """
+    logging.info("🎯 Bot activated with secure user preferences, state validation, and gradual rate limiting!")
+    
+    check_interval = 0
+    
+    while True:
+        # Randomized main loop timing
+        human_delay(60, 300)  # 1-5 min between cycles
+        
+        # Check daily/monthly quotas; rolling windows are handled per call
+        exhausted = next((
+            admission for admission in map(bot_state.admit, ("search", "post"))
+            if not admission.allowed and admission.binding.period != "window"
+        ), None)
+        if exhausted:
+            sleep_for = min(exhausted.wait_seconds, 86400)
+            logging.warning(f"⚠️ {exhausted.binding} quota reached. Sleeping {sleep_for / 3600:.1f}h.")
+            human_delay(sleep_for, sleep_for + 300)  # Until reset, at most 24h, +5m
+            continue
+            
+        # Periodically check actual rate limits from Twitter API
+        check_interval += 1
+        if check_interval >= 10:  # Check every 10 cycles
+            check_rate_limits(client, bot_state)
+            check_interval = 0
+            
+        with diagnostics.cycle() if diagnostics else contextlib.nullcontext():
+            # Retry deferred work, then process new mentions; all state
+            # updates in a cycle commit together
+            process_due_retries(client, bot_state)
+            with bot_state.cycle():
+                # One packed search covers every watch target. The next one
+                # starts where this one did, since processing takes a while
+                # and mentions keep arriving meanwhile
+                searched_at = datetime.now()
+                found = watchlist.search(client, bot_state)
+                if found:
+                    total = sum(len(mentions) for mentions in found.values())
+                    logging.info(f"🎯 Found {total} new mentions!")
+                    bot_state.history.record("mentions", total)
+                    # Quote targets coalesce: one hydration and at most one quote per tweet
+                    watchlist.dispatch(found, client, bot_state)
+                    bot_state.update_check_time(searched_at)
+        
+            # Publish endpoint health for monitoring and keep warm caches on disk
+            bot_state.breakers.export()
+            bot_state.tweet_cache.save()
+            bot_state.latency.export()
+        
+        # Variable sleep with jitter - more natural behavior
+        base_sleep = random.randint(3600, 14400)  # 1-4h
+        wait_for_next_cycle(client, bot_state, base_sleep - 600, base_sleep + 600)  # ±10m
+
+def stream_the_cult(bot_state, client, watchlist, diagnostics=None):
+    """
+    Bot loop for streaming mode: mentions are pushed as they are posted.
+    
+    Reconnects by itself and returns only by raising an error reconnecting
+    can't fix, which the Supervisor recovers from as in polling mode.
+    
+    Args:
+        bot_state: Bot state manager object.
+        client (tweepy.Client): Authenticated Twitter API client.
+        watchlist (Watchlist): Search targets and their handlers.
+        diagnostics (Diagnostics, optional): Profiles batches on request.
+    """
+    logging.info("📡 Bot activated in streaming mode!")
+    run_stream(client, bot_state, watchlist, diagnostics=diagnostics)
@@ -0,0 +1,17 @@
+# This file makes the cluster directory a Python package
+
+from .leader import LeaderLock, FileLock
+from .spool import Spool, partition_for
+from .budget import SharedQuotaEngine
+from .worker import run_worker, spawn_workers
+
+# Expose cluster components at the package level
+__all__ = [
+    'LeaderLock',
+    'FileLock',
+    'Spool',
+    'partition_for',
+    'SharedQuotaEngine',
+    'run_worker',
+    'spawn_workers'
+]
@@ -0,0 +1,83 @@
+import os
+import json
+import logging
+
+from src.rate_limiting.limiter import RateLimiter
+from src.rate_limiting.quota import QuotaEngine
+from src.state.usage import UsageTracker
+from src.storage.base import TIMESTAMP_KEYS
+from .leader import FileLock
+
+logger = logging.getLogger(__name__)
+
+class SharedQuotaEngine(QuotaEngine):
+    """
+    Quota engine whose usage is shared by every worker process on the host.
+
+    The rolling-window timestamps and day/month counters live in one ledger
+    file. Each admit and record reloads it under an fcntl lock, so all
+    workers draw from a single budget. Admission and recording are separate
+    steps, so concurrent workers can overshoot a layer by at most one call
+    each; the limits in the default quotas leave room for that.
+    """
+    def __init__(self, path="data/cluster/budget.json", seed_counters=None, quotas=None, history=None):
+        """
+        Args:
+            path (str): Ledger file path, shared by all workers.
+            seed_counters (dict, optional): Usage counters to start from when
+                the ledger doesn't exist yet, e.g. those of a single-process
+                run, so switching to workers doesn't reset the monthly budget.
+            quotas (dict, optional): Layers per endpoint, as for QuotaEngine.
+            history (UsageHistory, optional): Per-minute history; its ring
+                files are only written under the ledger lock.
+        """
+        usage = UsageTracker()
+        if seed_counters:
+            usage.counters = seed_counters
+        super().__init__(RateLimiter(), usage, quotas, history=history)
+        self.path = path
+        self._lock = FileLock(f"{path}.lock")
+
+    def _load(self):
+        """Refresh the limiter and counters from the ledger file."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                ledger = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to read shared budget, keeping last known usage: %s", e)
+            return
+        for key, endpoint in TIMESTAMP_KEYS.items():
+            timestamps = self.rate_limiter.requests_for(endpoint)
+            timestamps.clear()
+            timestamps.extend(sorted(float(ts) for ts in ledger.get(key, [])))
+        if isinstance(ledger.get("counters"), dict):
+            self.usage.counters = ledger["counters"]
+
+    def _save(self):
+        """Write the limiter and counters to the ledger file."""
+        ledger = {key: list(self.rate_limiter.requests_for(endpoint))
+                  for key, endpoint in TIMESTAMP_KEYS.items()}
+        ledger["counters"] = self.usage.counters
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_file = f"{self.path}.tmp.{os.getpid()}"
+        with open(tmp_file, "w") as f:
+            json.dump(ledger, f)
+        os.replace(tmp_file, self.path)
+
+    def admit(self, endpoint):
+        with self._lock:
+            self._load()
+            return super().admit(endpoint)
+
+    def record(self, endpoint):
+        with self._lock:
+            self._load()
+            super().record(endpoint)
+            self._save()
+
+    def status(self):
+        with self._lock:
+            self._load()
+            return super().status()
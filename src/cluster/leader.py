@@ -0,0 +1,85 @@
+import os
+import fcntl
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LeaderLock:
+    """
+    Leader election between worker processes on one host.
+
+    Leadership is an exclusive fcntl lock on a file in data/. The kernel
+    releases it when the holder exits, however it dies, so another worker's
+    next try_acquire takes over without any stale-lock cleanup.
+    """
+    def __init__(self, path="data/leader.lock"):
+        """
+        Args:
+            path (str): Lock file path, shared by all workers.
+        """
+        self.path = path
+        self._fd = None
+
+    @property
+    def is_leader(self):
+        return self._fd is not None
+
+    def try_acquire(self):
+        """
+        Become leader if no other process is.
+
+        Returns:
+            bool: True if this process holds leadership.
+        """
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        # Record the holder for operators; the lock itself is what counts
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        logger.info("Acquired leadership (pid %d)", os.getpid())
+        return True
+
+    def release(self):
+        """Give up leadership."""
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+        logger.info("Released leadership")
+
+class FileLock:
+    """
+    Blocking exclusive fcntl lock, used as a context manager to serialize
+    read-modify-write cycles on files shared between workers.
+    """
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Lock file path.
+        """
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
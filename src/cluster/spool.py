@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import logging
+import itertools
+
+from src.utils.security import hash_user_id
+from src.api.models import Mention
+
+logger = logging.getLogger(__name__)
+
+def partition_for(author_id, workers):
+    """
+    Pick the worker that owns an author.
+
+    Partitioning on the hashed author id keeps each author's mentions (and
+    their opt-in/out state) on one worker, in order.
+
+    Args:
+        author_id: Tweet author id.
+        workers (int): Number of workers.
+
+    Returns:
+        int: Worker index in [0, workers).
+    """
+    return int(hash_user_id(str(author_id))[:8], 16) % workers
+
+class Spool:
+    """
+    Spool directory handing mentions from the leader to workers.
+
+    Each worker has its own subdirectory. Messages are single JSON files,
+    written to a temporary name and renamed into place so a reader never
+    sees a partial file, and named so lexical order is arrival order.
+    A message is deleted only once its worker has processed it, so work in
+    flight when a worker dies is picked up again when it restarts. Workers
+    report the tweets they quoted back to the leader the same way, through
+    the quoted subdirectory.
+    """
+    def __init__(self, root="data/spool", workers=1):
+        """
+        Args:
+            root (str): Spool root directory, shared by all workers.
+            workers (int): Number of worker partitions.
+        """
+        self.root = root
+        self.workers = workers
+        self._counter = itertools.count()
+        for worker in range(workers):
+            os.makedirs(self._dir(worker), exist_ok=True)
+        os.makedirs(self._quoted_dir(), exist_ok=True)
+
+    def _dir(self, worker):
+        return os.path.join(self.root, f"worker-{worker}")
+
+    def _quoted_dir(self):
+        return os.path.join(self.root, "quoted")
+
+    def _write(self, directory, payload):
+        """Write one message atomically; returns its path."""
+        name = f"{time.time_ns():020d}-{os.getpid()}-{next(self._counter)}.json"
+        path = os.path.join(directory, name)
+        tmp_file = os.path.join(self.root, f".{name}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_file, path)
+        return path
+
+    def dispatch(self, mention):
+        """
+        Queue a mention for the worker that owns its author.
+
+        Args:
+            mention (Mention): Mention from search_for_mentions.
+
+        Returns:
+            int: The worker the mention was sent to.
+        """
+        worker = partition_for(mention.author_id, self.workers)
+        self._write(self._dir(worker), mention.to_dict())
+        return worker
+
+    def report_quote(self, tweet_id):
+        """
+        Tell the leader that a worker quoted a tweet.
+
+        Args:
+            tweet_id: The quoted tweet's id.
+        """
+        self._write(self._quoted_dir(), {"tweet_id": str(tweet_id)})
+
+    def quoted(self):
+        """
+        Collect the tweets workers reported quoting, removing the reports.
+
+        Returns:
+            list: Tweet ids, oldest report first.
+        """
+        directory = self._quoted_dir()
+        tweet_ids = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                with open(path) as f:
+                    tweet_ids.append(json.load(f)["tweet_id"])
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Dropping unreadable quote report %s: %s", name, e)
+            self.ack(path)
+        return tweet_ids
+
+    def pending(self, worker):
+        """
+        Iterate a worker's queued mentions, oldest first.
+
+        Args:
+            worker (int): Worker index.
+
+        Yields:
+            tuple: (message path, Mention). Call ack(path) once the
+            mention has been processed.
+        """
+        directory = self._dir(worker)
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                with open(path) as f:
+                    mention = Mention.from_dict(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning("Dropping unreadable spool message %s: %s", name, e)
+                self.ack(path)
+                continue
+            yield path, mention
+
+    def ack(self, path):
+        """Remove a processed message."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def depth(self):
+        """Get queued message counts per worker for monitoring."""
+        return {
+            worker: sum(1 for name in os.listdir(self._dir(worker)) if name.endswith(".json"))
+            for worker in range(self.workers)
+        }
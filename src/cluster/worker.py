@@ -0,0 +1,233 @@
+import time
+import random
+import logging
+import multiprocessing
+from datetime import datetime
+
+import tweepy
+
+from src.utils.logging_setup import setup_logging
+from src.state import BotState
+from src.state.history import UsageHistory
+from src.storage import JsonStorage, create_storage
+from src.api.client import initialize_twitter_client
+from src.api.endpoints import process_mention, process_due_retries
+from src.api.watchlist import Watchlist, HANDLERS
+from src.api.coalescing import coalesce_mentions, fair_order, is_command
+from .leader import LeaderLock
+from .spool import Spool
+from .budget import SharedQuotaEngine
+
+logger = logging.getLogger(__name__)
+
+# Worker loop timing
+POLL_INTERVAL = (5, 15)                         # Seconds between spool checks
+SEARCH_INTERVAL = (3600 - 600, 14400 + 600)     # 1-4h ±10m between searches, as in main
+RESTART_DELAY = 30                              # Seconds before a dead worker is respawned
+
+def lead_cycle(client, leader_state, spool, watchlist):
+    """
+    Search for mentions and hand them out to the workers.
+
+    The leader handles opt-in/out commands itself, since they need no API
+    calls, and drops mentions from opted-out authors before dispatch, so
+    workers never need the shared preferences. Watch targets with handlers
+    other than "quote" are handled on the leader. Quotes the workers report
+    are recorded first, so mentions of a tweet already quoted on any
+    partition coalesce away.
+
+    Args:
+        client (tweepy.Client): Authenticated Twitter API client.
+        leader_state (BotState): State of the leader role.
+        spool (Spool): Spool to dispatch mentions to.
+        watchlist (Watchlist): Targets to search for.
+    """
+    with leader_state.cycle():
+        for tweet_id in spool.quoted():
+            leader_state.record_quote(tweet_id)
+        searched_at = datetime.now()
+        found = watchlist.search(client, leader_state)
+        if found:
+            total = sum(len(mentions) for mentions in found.values())
+            logger.info("🎯 Found %d new mentions!", total)
+            leader_state.history.record("mentions", total)
+            mentions = []
+            for target, matched in found.items():
+                if target.handler == "quote":
+                    mentions.extend(matched)
+                else:
+                    HANDLERS[target.handler](matched, client, leader_state)
+            dispatched = 0
+            for mention in fair_order(coalesce_mentions(mentions, leader_state), leader_state):
+                if is_command(mention) or leader_state.is_opted_out(str(mention.author_id)):
+                    process_mention(mention, client, leader_state)
+                    continue
+                # The worker owns the mention and any followers from here on
+                leader_state.mark_handled(mention.id)
+                for follower in mention.followers:
+                    leader_state.mark_handled(follower.id)
+                spool.dispatch(mention)
+                dispatched += 1
+            logger.info("Dispatched %d mentions: %s", dispatched, spool.depth())
+            leader_state.update_check_time(searched_at)
+
+    leader_state.breakers.export()
+    leader_state.tweet_cache.save()
+
+def work_partition(client, worker_state, spool, worker_id):
+    """
+    Process the mentions queued for this worker.
+
+    Args:
+        client (tweepy.Client): Authenticated Twitter API client.
+        worker_state (BotState): State of this worker's partition.
+        spool (Spool): Spool to read from.
+        worker_id (int): This worker's partition.
+    """
+    processed = 0
+    with worker_state.cycle():
+        for path, mention in spool.pending(worker_id):
+            if not worker_state.is_handled(mention.id):
+                process_mention(mention, client, worker_state)
+                processed += 1
+            # Acknowledge once processed; a crash before this replays the message
+            spool.ack(path)
+    if processed:
+        worker_state.latency.export()
+
+def report_quotes(worker_state, spool, since):
+    """
+    Report this worker's quotes to the leader.
+
+    Args:
+        worker_state (BotState): State of this worker's partition.
+        spool (Spool): Spool to report through.
+        since (float): Time of the previous report.
+
+    Returns:
+        float: Time of this report, for the next call.
+    """
+    now = time.time()
+    for tweet_id in worker_state.quoted_targets.quoted_since(since):
+        spool.report_quote(tweet_id)
+    return now
+
+def run_worker(worker_id, workers):
+    """
+    Run one worker process.
+
+    Every worker processes its own partition of mentions. Whichever worker
+    holds the leader lock also searches; when it dies the lock is released
+    and the next worker to check takes over.
+
+    Args:
+        worker_id (int): This worker's partition, in [0, workers).
+        workers (int): Total number of workers.
+    """
+    spool = Spool(workers=workers)
+    leader = LeaderLock()
+    # The single-process store is only read to seed the ledger
+    seed_storage = create_storage()
+    try:
+        seed_counters = seed_storage.load_usage().get("counters")
+    finally:
+        seed_storage.close()
+    quota = SharedQuotaEngine(seed_counters=seed_counters, history=UsageHistory.from_config())
+    # Each partition keeps its own handled ids and retry queue; preferences
+    # are only read here, the leader is the one writing them, and the same
+    # goes for the tweet cache file
+    worker_state = BotState(
+        storage=JsonStorage(state_file=f"data/worker-{worker_id}/bot_state.json"),
+        quota=quota
+    )
+    worker_state.latency.stats_file = f"data/worker-{worker_id}/latency_slo.json"
+    watchlist = Watchlist.from_config()
+    leader_state = None
+    client = initialize_twitter_client()
+    next_search = 0
+    reported_at = time.time()
+
+    logger.info("Worker %d/%d started", worker_id, workers)
+
+    while True:
+        try:
+            if leader_state is None and leader.try_acquire():
+                leader_state = BotState(quota=quota)
+                next_search = time.time() + random.uniform(60, 300)
+
+            if leader_state is not None and time.time() >= next_search:
+                lead_cycle(client, leader_state, spool, watchlist)
+                next_search = time.time() + random.uniform(*SEARCH_INTERVAL)
+
+            process_due_retries(client, worker_state)
+            work_partition(client, worker_state, spool, worker_id)
+            reported_at = report_quotes(worker_state, spool, reported_at)
+            time.sleep(random.uniform(*POLL_INTERVAL))
+
+        except tweepy.errors.Forbidden as e:
+            if "suspended" in str(e).lower():
+                logger.critical("💀 ACCOUNT SUSPENDED!")
+                break
+            time.sleep(random.uniform(3600, 7200))
+        except Exception as e:
+            logger.error("💥 Worker %d error: %s. Restarting in 5-10m...", worker_id, e)
+            time.sleep(random.uniform(300, 600))
+
+    if leader_state is not None:
+        leader_state.close()
+    leader.release()
+    worker_state.close()
+
+def _worker_main(worker_id, workers):
+    # Rotating handlers can't be shared across processes, so each worker logs to its own file
+    setup_logging(log_file=f"logs/worker-{worker_id}.log")
+    try:
+        run_worker(worker_id, workers)
+    except KeyboardInterrupt:
+        pass
+
+def spawn_workers(workers):
+    """
+    Start the worker processes and keep them running.
+
+    A worker that dies is respawned after a short delay; if it was the
+    leader, another worker has usually taken over by then. Workers that
+    exit cleanly (the account was suspended) are not restarted.
+
+    Args:
+        workers (int): Number of worker processes.
+    """
+    # Fresh interpreters rather than forks, so no logging threads or open
+    # state files are inherited from the parent
+    context = multiprocessing.get_context("spawn")
+    processes = {}
+
+    def start(worker_id):
+        process = context.Process(
+            target=_worker_main, args=(worker_id, workers), name=f"worker-{worker_id}"
+        )
+        process.start()
+        processes[worker_id] = process
+
+    for worker_id in range(workers):
+        start(worker_id)
+    logger.info("Started %d workers", workers)
+
+    try:
+        while processes:
+            time.sleep(RESTART_DELAY)
+            for worker_id, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+                if process.exitcode == 0:
+                    logger.warning("Worker %d stopped", worker_id)
+                    del processes[worker_id]
+                else:
+                    logger.warning("Worker %d exited with code %s. Restarting", worker_id, process.exitcode)
+                    start(worker_id)
+    except KeyboardInterrupt:
+        logger.info("👋 Stopping workers")
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.join()
@@ -2,6 +2,8 @@
 
 from .limiter import (
     RateLimiter,
+    load_backoff_tiers,
+    DEFAULT_BACKOFF_TIERS,
     SEARCH_RECENT_LIMIT,
     TWEET_LOOKUP_LIMIT,
     POST_TWEET_LIMIT,
@@ -12,11 +14,23 @@ from .limiter import (
 )
 
 from .backoff import handle_rate_limit_response
+from .circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+from .scheduler import EndpointScheduler, RetryQueue
+from .quota import QuotaEngine, QuotaLimit, Admission
 
 # Expose key components at the package level
 __all__ = [
     'RateLimiter',
+    'load_backoff_tiers',
+    'DEFAULT_BACKOFF_TIERS',
     'handle_rate_limit_response',
+    'CircuitBreaker',
+    'CircuitBreakerRegistry',
+    'EndpointScheduler',
+    'RetryQueue',
+    'QuotaEngine',
+    'QuotaLimit',
+    'Admission',
     'SEARCH_RECENT_LIMIT',
     'TWEET_LOOKUP_LIMIT',
     'POST_TWEET_LIMIT',
@@ -6,6 +6,11 @@ def handle_rate_limit_response(status_code=None, headers=None, bot_state=None, r
     """
     Handle 429 responses explicitly and adaptively.
     
+    When the bot state has an endpoint scheduler, the backoff becomes a
+    scheduling decision: the endpoint is marked unavailable for the computed
+    time and the call returns immediately, leaving other endpoints usable.
+    Without one (e.g. during client initialization) the call sleeps inline.
+    
     Args:
         status_code (int, optional): HTTP status code from the response. 429 indicates rate limiting.
         headers (dict, optional): Response headers, may contain Retry-After information.
@@ -13,24 +18,23 @@ def handle_rate_limit_response(status_code=None, headers=None, bot_state=None, r
         request_type (str, optional): Type of request ("search", "lookup", or "post").
         
     Returns:
-        None
+        float: Seconds until the endpoint should be retried.
     """
     if status_code == 429:
         # Check for Retry-After header
-        retry_after = None
+        wait_time = None
         if headers and 'Retry-After' in headers:
             try:
                 retry_after = int(headers['Retry-After'])
                 logging.warning(f"⚠️ Rate limited by Twitter API. Retry-After: {retry_after}s")
-                time.sleep(retry_after + random.randint(5, 15))  # Add jitter
-                return
+                wait_time = retry_after + random.randint(5, 15)  # Add jitter
             except (ValueError, TypeError):
                 pass
         
         # If no valid Retry-After, use escalating backoff
-        backoff = 300 + random.randint(0, 60)  # Start with 5m + jitter
-        logging.warning(f"⚠️ Rate limited by Twitter API. Backing off for {backoff}s")
-        time.sleep(backoff)
+        if wait_time is None:
+            wait_time = 300 + random.randint(0, 60)  # Start with 5m + jitter
+            logging.warning(f"⚠️ Rate limited by Twitter API. Backing off for {wait_time}s")
     else:
         # General error with gradual backoff based on rate limit usage
         wait_time = 5  # Default minimum wait
@@ -40,4 +44,10 @@ def handle_rate_limit_response(status_code=None, headers=None, bot_state=None, r
             wait_time += additional_delay
             
         logging.warning(f"⚠️ Request failed. Waiting {wait_time:.1f}s before retry")
+    
+    scheduler = getattr(bot_state, "scheduler", None)
+    if scheduler is not None and request_type:
+        scheduler.block(request_type, wait_time)
+    else:
         time.sleep(wait_time)
+    return wait_time
@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import logging
+from collections import deque
+
+from config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Breaker defaults
+ERROR_WINDOW = 10 * 60          # Rolling window for error rate, in seconds
+MIN_CALLS = 4                   # Calls needed in the window before we judge
+FAILURE_THRESHOLD = 0.5         # Error rate that trips the breaker
+OPEN_SECONDS = 5 * 60           # How long to fail fast before probing again
+MAX_OPEN_SECONDS = 60 * 60      # Cap for repeated failed probes
+
+ENDPOINTS = ("search", "lookup", "post")
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single API endpoint.
+
+    Closed: calls pass through and outcomes are tracked over a rolling
+    window. Open: calls are rejected without touching the API. Half-open:
+    after the cool-down a single probe call is let through; success closes
+    the breaker, failure reopens it for twice as long.
+    """
+    def __init__(self, name, window=ERROR_WINDOW, min_calls=MIN_CALLS,
+                 failure_threshold=FAILURE_THRESHOLD, open_seconds=OPEN_SECONDS,
+                 max_open_seconds=MAX_OPEN_SECONDS, clock=time.time):
+        """
+        Initialize the breaker.
+
+        Args:
+            name (str): Endpoint name, used in logs and stats.
+            window (float): Rolling window for the error rate, in seconds.
+            min_calls (int): Minimum calls in the window before tripping.
+            failure_threshold (float): Error rate (0-1) that opens the breaker.
+            open_seconds (float): Initial cool-down while open.
+            max_open_seconds (float): Upper bound for the cool-down.
+            clock (callable): Returns the current time in seconds.
+        """
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.base_open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.clock = clock
+
+        self.state = CLOSED
+        self.outcomes = deque()  # (timestamp, succeeded)
+        self.open_seconds = open_seconds
+        self.opened_at = None
+        self.probe_in_flight = False
+
+        # Lifetime counters for monitoring
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_timeouts = 0
+        self.rejected_calls = 0
+        self.times_opened = 0
+
+    def _trim(self, now):
+        """Drop outcomes older than the rolling window."""
+        cutoff = now - self.window
+        while self.outcomes and self.outcomes[0][0] < cutoff:
+            self.outcomes.popleft()
+
+    def error_rate(self):
+        """Get the error rate over the rolling window."""
+        self._trim(self.clock())
+        return self._rate(self.outcomes)
+
+    def _rate(self, outcomes):
+        if not outcomes:
+            return 0.0
+        failures = sum(1 for _, ok in outcomes if not ok)
+        return failures / len(outcomes)
+
+    def retry_in(self):
+        """Get seconds until an open breaker will allow a probe."""
+        if self.state != OPEN:
+            return 0
+        return max(0, self.opened_at + self.open_seconds - self.clock())
+
+    def allow(self):
+        """
+        Check whether a call may go ahead.
+
+        Returns:
+            bool: False if the call should fail fast.
+        """
+        if self.state == OPEN:
+            if self.retry_in() > 0:
+                self.rejected_calls += 1
+                return False
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+            logger.info("Circuit %s half-open, probing", self.name)
+
+        if self.state == HALF_OPEN:
+            if self.probe_in_flight:
+                self.rejected_calls += 1
+                return False
+            self.probe_in_flight = True
+
+        return True
+
+    def is_open(self):
+        """Check whether the breaker is currently failing fast."""
+        return self.state == OPEN and self.retry_in() > 0
+
+    def record_success(self):
+        """Record a successful call."""
+        now = self.clock()
+        self.total_calls += 1
+        if self.state == HALF_OPEN:
+            logger.info("✅ Circuit %s closed after successful probe", self.name)
+            self.state = CLOSED
+            self.outcomes.clear()
+            self.open_seconds = self.base_open_seconds
+            self.probe_in_flight = False
+        self.outcomes.append((now, True))
+        self._trim(now)
+
+    def record_failure(self):
+        """Record a failed call, opening the breaker if the error rate is too high."""
+        now = self.clock()
+        self.total_calls += 1
+        self.total_failures += 1
+
+        if self.state == HALF_OPEN:
+            self.open_seconds = min(self.open_seconds * 2, self.max_open_seconds)
+            self._open(now)
+            return
+
+        self.outcomes.append((now, False))
+        self._trim(now)
+        if self.state == CLOSED and len(self.outcomes) >= self.min_calls \
+                and self.error_rate() >= self.failure_threshold:
+            self._open(now)
+
+    def record_timeout(self):
+        """Record a call that timed out; counts as a failure."""
+        self.total_timeouts += 1
+        self.record_failure()
+
+    def _open(self, now):
+        self.state = OPEN
+        self.opened_at = now
+        self.probe_in_flight = False
+        self.times_opened += 1
+        logger.warning("⛔ Circuit %s open for %.0fs (error rate %.0f%%)",
+                       self.name, self.open_seconds, self.error_rate() * 100)
+
+    def stats(self):
+        """
+        Get a snapshot of the breaker for monitoring.
+
+        Leaves the breaker untouched, so it may be called from another
+        thread, e.g. for a diagnostics dump.
+
+        Returns:
+            dict: State, rolling error rate and lifetime counters.
+        """
+        cutoff = self.clock() - self.window
+        outcomes = [outcome for outcome in list(self.outcomes) if outcome[0] >= cutoff]
+        return {
+            "state": self.state,
+            "error_rate": round(self._rate(outcomes), 4),
+            "window_calls": len(outcomes),
+            "retry_in": round(self.retry_in(), 1),
+            "opened_at": self.opened_at,
+            "total_calls": self.total_calls,
+            "total_failures": self.total_failures,
+            "total_timeouts": self.total_timeouts,
+            "rejected_calls": self.rejected_calls,
+            "times_opened": self.times_opened
+        }
+
+class CircuitBreakerRegistry:
+    """
+    One circuit breaker per API endpoint (search, lookup, post).
+    """
+    def __init__(self, options=None, stats_file="data/circuit_breakers.json"):
+        """
+        Initialize the registry.
+
+        Args:
+            options (dict, optional): Breaker settings. Defaults to the
+                "circuit_breaker" section of the config file; keys match the
+                CircuitBreaker arguments.
+            stats_file (str): Where export() writes breaker stats.
+        """
+        if options is None:
+            options = get_config_section("circuit_breaker")
+        settings = {
+            key: options[key] for key in
+            ("window", "min_calls", "failure_threshold", "open_seconds", "max_open_seconds")
+            if key in options
+        }
+        self.stats_file = stats_file
+        self.breakers = {name: CircuitBreaker(name, **settings) for name in ENDPOINTS}
+
+    def __getitem__(self, endpoint):
+        return self.breakers[endpoint]
+
+    def allow(self, endpoint):
+        return self.breakers[endpoint].allow()
+
+    def is_open(self, endpoint):
+        return self.breakers[endpoint].is_open()
+
+    def record_success(self, endpoint):
+        self.breakers[endpoint].record_success()
+
+    def record_failure(self, endpoint):
+        self.breakers[endpoint].record_failure()
+
+    def record_timeout(self, endpoint):
+        self.breakers[endpoint].record_timeout()
+
+    def stats(self):
+        """Get stats for every endpoint's breaker."""
+        return {name: breaker.stats() for name, breaker in self.breakers.items()}
+
+    def export(self):
+        """Write breaker stats to the stats file for external monitoring."""
+        try:
+            os.makedirs(os.path.dirname(self.stats_file), exist_ok=True)
+            tmp_file = f"{self.stats_file}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump({"updated_at": time.time(), "breakers": self.stats()}, f, indent=2)
+            os.replace(tmp_file, self.stats_file)
+        except Exception as e:
+            logger.warning("Failed to export circuit breaker stats: %s", e)
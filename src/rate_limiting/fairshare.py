@@ -0,0 +1,166 @@
+import time
+import heapq
+import logging
+from collections import OrderedDict
+
+from config import get_config_section
+from src.utils.security import hash_user_id
+
+logger = logging.getLogger(__name__)
+
+# Per-author defaults: the monthly post budget is ~16 quotes a day in total
+AUTHOR_BURST = 2            # Quotes an author can get back to back
+AUTHOR_PER_DAY = 4          # Sustained quotes per author per day
+MAX_AUTHORS = 10000         # Authors tracked before the least recent is evicted
+
+class AuthorShare:
+    """
+    Token bucket and fair-queuing finish tag of one author.
+    """
+    __slots__ = ("tokens", "updated", "finish")
+
+    def __init__(self, tokens, updated, finish):
+        self.tokens = tokens
+        self.updated = updated
+        self.finish = finish
+
+class FairShareScheduler:
+    """
+    Weighted fair queuing of quote requests across authors.
+
+    Each author, keyed by hashed id, has a token bucket that caps how many
+    quotes they can get (`burst` at once, refilling at `per_day`). Within a
+    batch, mentions are ordered by self-clocked fair-queuing finish tags, so
+    the first posts of a cycle go to as many different authors as possible
+    before anyone gets a second one; `weights` maps hashed ids to a share
+    other than 1. Ordering only checks the buckets; a token is spent by
+    charge() once a post is actually admitted, so mentions that end without
+    a post cost their author nothing. Authors are kept in a bounded LRU, and
+    one evicted long enough to be least recent has refilled anyway.
+    """
+    def __init__(self, burst=AUTHOR_BURST, per_day=AUTHOR_PER_DAY, max_authors=MAX_AUTHORS,
+                 weights=None, enabled=True, clock=time.time):
+        """
+        Args:
+            burst (float): Bucket size in quotes.
+            per_day (float): Refill rate in quotes per day.
+            max_authors (int): Authors tracked at most.
+            weights (dict, optional): Hashed author id -> weight.
+            enabled (bool): When off, batches pass through unchanged.
+            clock (callable): Returns the current time in seconds.
+        """
+        self.burst = float(burst)
+        self.rate = float(per_day) / 86400
+        self.max_authors = max_authors
+        self.weights = weights or {}
+        self.enabled = enabled
+        self.clock = clock
+        self.virtual_time = 0.0
+        self._authors = OrderedDict()   # hashed id -> AuthorShare, least recent first
+
+    @classmethod
+    def from_config(cls, options=None):
+        """
+        Create a scheduler from the "fair_share" config section.
+
+        Args:
+            options (dict, optional): Overrides the config section.
+
+        Returns:
+            FairShareScheduler: The configured scheduler.
+        """
+        if options is None:
+            options = get_config_section("fair_share")
+        return cls(
+            burst=options.get("burst", AUTHOR_BURST),
+            per_day=options.get("per_day", AUTHOR_PER_DAY),
+            max_authors=options.get("max_authors", MAX_AUTHORS),
+            weights=options.get("weights"),
+            enabled=options.get("enabled", True)
+        )
+
+    def __len__(self):
+        return len(self._authors)
+
+    def _share(self, key, now):
+        """Get an author's share with its bucket refilled to now."""
+        share = self._authors.get(key)
+        if share is None:
+            share = self._authors[key] = AuthorShare(self.burst, now, self.virtual_time)
+            while len(self._authors) > self.max_authors:
+                self._authors.popitem(last=False)
+        else:
+            self._authors.move_to_end(key)
+            share.tokens = min(self.burst, share.tokens + (now - share.updated) * self.rate)
+            share.updated = now
+        return share
+
+    def tokens(self, author_id):
+        """Get the quotes an author can currently get."""
+        key = hash_user_id(str(author_id))
+        if key not in self._authors:
+            return self.burst
+        return self._share(key, self.clock()).tokens
+
+    def order(self, mentions, exempt=None, successor=None):
+        """
+        Order a batch fairly and drop mentions over their author's cap.
+
+        Each admitted mention holds one of its author's tokens for the rest
+        of the batch, so an author never gets more admitted than their bucket
+        holds; nothing is spent until charge().
+
+        Args:
+            mentions (list): Mentions in arrival order.
+            exempt (callable, optional): Mentions it returns True for (e.g.
+                commands) spend nothing and go first.
+            successor (callable, optional): Called with each dropped
+                mention; may return a mention to try in its place.
+
+        Returns:
+            tuple: (admitted mentions in service order, dropped mentions)
+        """
+        if not self.enabled:
+            return list(mentions), []
+        now = self.clock()
+        queue = []
+        dropped = []
+        held = {}   # hashed id -> tokens held by this batch
+        for index, mention in enumerate(mentions):
+            if exempt is not None and exempt(mention):
+                queue.append((self.virtual_time, index, mention))
+                continue
+            while mention is not None:
+                key = hash_user_id(str(mention.author_id))
+                share = self._share(key, now)
+                if share.tokens - held.get(key, 0) >= 1:
+                    break
+                dropped.append(mention)
+                mention = successor(mention) if successor is not None else None
+            if mention is None:
+                continue
+            held[key] = held.get(key, 0) + 1
+            share.finish = max(self.virtual_time, share.finish) + 1.0 / self.weights.get(key, 1.0)
+            queue.append((share.finish, index, mention))
+
+        heapq.heapify(queue)
+        admitted = []
+        while queue:
+            finish, _, mention = heapq.heappop(queue)
+            self.virtual_time = max(self.virtual_time, finish)  # Self-clocked: tag in service
+            admitted.append(mention)
+        return admitted, dropped
+
+    def charge(self, author_id):
+        """
+        Spend one of an author's tokens for a post about to be made.
+
+        An author can go into debt here, e.g. when a coalesced mention takes
+        over a group; the bucket then refills from below zero.
+
+        Args:
+            author_id: Tweet author id.
+        """
+        if not self.enabled:
+            return
+        self._share(hash_user_id(str(author_id)), self.clock()).tokens -= 1
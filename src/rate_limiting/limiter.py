@@ -1,7 +1,9 @@
+import time
 import logging
 import random
 from collections import deque
-from datetime import datetime
+
+from config import get_config_section
 
 # Rate Limiting Constants
 SEARCH_RECENT_LIMIT = 180  # Requests per 15-minute window
@@ -9,21 +11,124 @@ TWEET_LOOKUP_LIMIT = 300   # Requests per 15-minute window
 POST_TWEET_LIMIT = 200     # Requests per 15-minute window
 WINDOW_SIZE = 15 * 60      # 15 minutes in seconds
 
+# Window limits backoff is measured against until the quota engine sets its own
+DEFAULT_WINDOW_LIMITS = {
+    "search": SEARCH_RECENT_LIMIT,
+    "lookup": TWEET_LOOKUP_LIMIT,
+    "post": POST_TWEET_LIMIT
+}
+
 # Gradual backoff thresholds
 LOW_THRESHOLD = 0.5        # 50% of limit
 MEDIUM_THRESHOLD = 0.7     # 70% of limit
 HIGH_THRESHOLD = 0.9       # 90% of limit
 
+# Delay ranges in seconds from each threshold up; override with the "tiers"
+# list of the "backoff" config section
+DEFAULT_BACKOFF_TIERS = [
+    {"threshold": LOW_THRESHOLD, "delay": [1, 5]},
+    {"threshold": MEDIUM_THRESHOLD, "delay": [5, 30]},
+    {"threshold": HIGH_THRESHOLD, "delay": [30, 120]}
+]
+
+logger = logging.getLogger(__name__)
+
+def load_backoff_tiers(tiers=None):
+    """
+    Validate backoff tiers and sort them by threshold.
+
+    Args:
+        tiers (list, optional): {"threshold", "delay": [min, max]} entries.
+            Defaults to the "backoff" config section, then DEFAULT_BACKOFF_TIERS.
+
+    Returns:
+        list: (threshold, min_delay, max_delay) tuples, lowest threshold first.
+
+    Raises:
+        ValueError: If a tier is malformed.
+    """
+    if tiers is None:
+        tiers = get_config_section("backoff").get("tiers") or DEFAULT_BACKOFF_TIERS
+    parsed = []
+    for tier in tiers:
+        try:
+            threshold = float(tier["threshold"])
+            low, high = (float(d) for d in tier["delay"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid backoff tier: {tier!r}")
+        if not 0 <= low <= high:
+            raise ValueError(f"Invalid backoff delay range: {tier!r}")
+        parsed.append((threshold, low, high))
+    return sorted(parsed)
+
+def _log_usage(label, count, limit, ratio):
+    """Log window usage lazily; skipped entirely when INFO is disabled."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    level = "LOW"
+    if ratio >= HIGH_THRESHOLD:
+        level = "HIGH"
+    elif ratio >= MEDIUM_THRESHOLD:
+        level = "MEDIUM"
+    elif ratio >= LOW_THRESHOLD:
+        level = "MODERATE"
+    logger.info("%s request: %d/%d in window (%s: %.2f%%)", label, count, limit, level, ratio * 100)
+
 class RateLimiter:
-    def __init__(self):
+    def __init__(self, tiers=None, clock=time.time, rng=random):
+        """
+        Args:
+            tiers (list, optional): Gradual backoff tiers, see load_backoff_tiers.
+            clock (callable): Returns the current epoch time in seconds.
+            rng (random.Random): Source of backoff jitter.
+        """
         # Rate limiting with rolling windows
         self.search_requests = deque()
         self.tweet_lookup_requests = deque()
         self.post_tweet_requests = deque()
+        self.tiers = load_backoff_tiers(tiers)
+        self.clock = clock
+        self.rng = rng
+        # endpoint -> [(limit, seconds)], the rolling windows usage ratios use
+        self.window_limits = {
+            endpoint: [(limit, WINDOW_SIZE)] for endpoint, limit in DEFAULT_WINDOW_LIMITS.items()
+        }
+    
+    def set_window_limits(self, endpoint, limits):
+        """
+        Set the rolling-window limits an endpoint's usage ratio is measured against.
+        
+        Args:
+            endpoint (str): "search", "lookup" or "post".
+            limits (list): (limit, seconds) pairs, e.g. the quota engine's
+                window layers; seconds are at most WINDOW_SIZE.
+        """
+        self.window_limits[endpoint] = [(limit, min(seconds, WINDOW_SIZE)) for limit, seconds in limits]
+    
+    def usage_ratio(self, request_type):
+        """
+        Get how full the fullest rolling window of a request type is.
+        
+        Returns:
+            float: Calls in the window over its limit; 1.0 for a zero limit.
+        """
+        timestamps = self.requests_for(request_type)
+        now = self.clock()
+        ratio = 0.0
+        for limit, seconds in self.window_limits.get(request_type, ()):
+            if limit <= 0:
+                return 1.0
+            used = sum(1 for ts in timestamps if ts >= now - seconds)
+            ratio = max(ratio, used / limit)
+        return ratio
+    
+    def window_limit(self, request_type):
+        """Get the tightest window limit of a request type, for logs."""
+        return min((limit for limit, _ in self.window_limits.get(request_type, ())), default=0)
     
     def _clean_timestamp_queues(self):
         """Remove timestamps outside the current window."""
-        now = datetime.now().timestamp()
+        now = self.clock()
         cutoff = now - WINDOW_SIZE
         
         # Clean up queues by removing timestamps older than the window
@@ -38,18 +143,15 @@ class RateLimiter:
     
     def get_search_usage_ratio(self):
         """Get current search API usage ratio."""
-        self._clean_timestamp_queues()
-        return len(self.search_requests) / SEARCH_RECENT_LIMIT
+        return self.usage_ratio("search")
     
     def get_lookup_usage_ratio(self):
         """Get current lookup API usage ratio."""
-        self._clean_timestamp_queues()
-        return len(self.tweet_lookup_requests) / TWEET_LOOKUP_LIMIT
+        return self.usage_ratio("lookup")
     
     def get_post_usage_ratio(self):
         """Get current post API usage ratio."""
-        self._clean_timestamp_queues()
-        return len(self.post_tweet_requests) / POST_TWEET_LIMIT
+        return self.usage_ratio("post")
     
     def can_search(self):
         """Check if we can make a search request within rate limits."""
@@ -68,21 +170,21 @@ class RateLimiter:
         if not self.search_requests:
             return 0
         oldest = self.search_requests[0]
-        return max(0, (oldest + WINDOW_SIZE) - datetime.now().timestamp())
+        return max(0, (oldest + WINDOW_SIZE) - self.clock())
     
     def get_lookup_window_reset(self):
         """Get seconds until lookup window resets."""
         if not self.tweet_lookup_requests:
             return 0
         oldest = self.tweet_lookup_requests[0]
-        return max(0, (oldest + WINDOW_SIZE) - datetime.now().timestamp())
+        return max(0, (oldest + WINDOW_SIZE) - self.clock())
     
     def get_post_window_reset(self):
         """Get seconds until post window resets."""
         if not self.post_tweet_requests:
             return 0
         oldest = self.post_tweet_requests[0]
-        return max(0, (oldest + WINDOW_SIZE) - datetime.now().timestamp())
+        return max(0, (oldest + WINDOW_SIZE) - self.clock())
     
     def get_gradual_backoff_delay(self, request_type):
         """Calculate delay based on current API usage level."""
@@ -95,59 +197,64 @@ class RateLimiter:
         elif request_type == "post":
             usage_ratio = self.get_post_usage_ratio()
         
-        # No delay if below low threshold
-        if usage_ratio < LOW_THRESHOLD:
-            return 0
+        # Highest tier reached sets the delay; none below the lowest threshold
+        for threshold, low, high in reversed(self.tiers):
+            if usage_ratio >= threshold:
+                return self.rng.uniform(low, high)
+        return 0
+    
+    def requests_for(self, request_type):
+        """Get the rolling-window timestamps for a request type."""
+        self._clean_timestamp_queues()
+        if request_type == "search":
+            return self.search_requests
+        elif request_type == "lookup":
+            return self.tweet_lookup_requests
+        elif request_type == "post":
+            return self.post_tweet_requests
+        return ()
+    
+    def snapshot(self, request_type):
+        """
+        Copy the rolling-window timestamps for a request type without pruning.
         
-        # Gradual backoff delays
-        if usage_ratio < MEDIUM_THRESHOLD:
-            # 50-70% utilization: short delay
-            return random.uniform(1, 5)
-        elif usage_ratio < HIGH_THRESHOLD:
-            # 70-90% utilization: medium delay
-            return random.uniform(5, 30)
+        Safe to call from another thread: the queue is copied in one step
+        and never modified, so the bot thread's iteration is undisturbed.
+        """
+        if request_type == "search":
+            queue = self.search_requests
+        elif request_type == "lookup":
+            queue = self.tweet_lookup_requests
+        elif request_type == "post":
+            queue = self.post_tweet_requests
         else:
-            # >90% utilization: significant delay
-            return random.uniform(30, 120)
+            return []
+        cutoff = self.clock() - WINDOW_SIZE
+        return [ts for ts in list(queue) if ts >= cutoff]
+    
+    def record(self, request_type):
+        """Record a request of the given type."""
+        if request_type == "search":
+            self.record_search()
+        elif request_type == "lookup":
+            self.record_lookup()
+        elif request_type == "post":
+            self.record_post()
     
     def record_search(self):
         """Record a search request."""
-        now = datetime.now().timestamp()
+        now = self.clock()
         self.search_requests.append(now)
-        ratio = self.get_search_usage_ratio()
-        level = "LOW"
-        if ratio >= HIGH_THRESHOLD:
-            level = "HIGH"
-        elif ratio >= MEDIUM_THRESHOLD:
-            level = "MEDIUM"
-        elif ratio >= LOW_THRESHOLD:
-            level = "MODERATE"
-        logging.info(f"Search request: {len(self.search_requests)}/{SEARCH_RECENT_LIMIT} in window ({level}: {ratio:.2%})")
+        _log_usage("Search", len(self.search_requests), self.window_limit("search"), self.get_search_usage_ratio())
     
     def record_lookup(self):
         """Record a tweet lookup request."""
-        now = datetime.now().timestamp()
+        now = self.clock()
         self.tweet_lookup_requests.append(now)
-        ratio = self.get_lookup_usage_ratio()
-        level = "LOW"
-        if ratio >= HIGH_THRESHOLD:
-            level = "HIGH"
-        elif ratio >= MEDIUM_THRESHOLD:
-            level = "MEDIUM"
-        elif ratio >= LOW_THRESHOLD:
-            level = "MODERATE"
-        logging.info(f"Lookup request: {len(self.tweet_lookup_requests)}/{TWEET_LOOKUP_LIMIT} in window ({level}: {ratio:.2%})")
+        _log_usage("Lookup", len(self.tweet_lookup_requests), self.window_limit("lookup"), self.get_lookup_usage_ratio())
     
     def record_post(self):
         """Record a post request."""
-        now = datetime.now().timestamp()
+        now = self.clock()
         self.post_tweet_requests.append(now)
-        ratio = self.get_post_usage_ratio()
-        level = "LOW"
-        if ratio >= HIGH_THRESHOLD:
-            level = "HIGH"
-        elif ratio >= MEDIUM_THRESHOLD:
-            level = "MEDIUM"
-        elif ratio >= LOW_THRESHOLD:
-            level = "MODERATE"
-        logging.info(f"Post request: {len(self.post_tweet_requests)}/{POST_TWEET_LIMIT} in window ({level}: {ratio:.2%})")
+        _log_usage("Post", len(self.post_tweet_requests), self.window_limit("post"), self.get_post_usage_ratio())
@@ -0,0 +1,181 @@
+import logging
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from config import get_config_section
+from .limiter import SEARCH_RECENT_LIMIT, TWEET_LOOKUP_LIMIT, POST_TWEET_LIMIT, WINDOW_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Layers per endpoint. Window layers count the limiter's rolling 15-minute
+# history; day and month layers count calendar periods on a named usage
+# counter, which endpoints may share (search and lookup both spend reads).
+DEFAULT_QUOTAS = {
+    "search": [
+        {"period": "window", "limit": SEARCH_RECENT_LIMIT},
+        {"period": "month", "limit": 95, "counter": "reads"}
+    ],
+    "lookup": [
+        {"period": "window", "limit": TWEET_LOOKUP_LIMIT},
+        {"period": "month", "limit": 95, "counter": "reads"}
+    ],
+    "post": [
+        {"period": "window", "limit": POST_TWEET_LIMIT},
+        {"period": "month", "limit": 490, "counter": "posts"}
+    ]
+}
+
+PERIODS = ("window", "day", "month")
+
+Admission = namedtuple("Admission", ("allowed", "endpoint", "binding", "wait_seconds"))
+
+class QuotaLimit:
+    """
+    A single limit layer: at most `limit` calls per period.
+    """
+    __slots__ = ("endpoint", "period", "limit", "counter", "seconds")
+
+    def __init__(self, endpoint, period, limit, counter=None, seconds=WINDOW_SIZE):
+        """
+        Args:
+            endpoint (str): Endpoint the layer applies to.
+            period (str): "window", "day" or "month".
+            limit (int): Maximum calls in the period.
+            counter (str, optional): Usage counter for day/month layers.
+                Defaults to the endpoint name.
+            seconds (float): Rolling window length for window layers; at most
+                the limiter's 15-minute history.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Unknown quota period: {period}")
+        self.endpoint = endpoint
+        self.period = period
+        self.limit = int(limit)
+        self.counter = counter or endpoint
+        self.seconds = min(float(seconds), WINDOW_SIZE)
+
+    def __repr__(self):
+        if self.period == "window":
+            return f"{self.endpoint} {self.limit}/{self.seconds / 60:.0f}min window"
+        return f"{self.endpoint} {self.limit}/{self.period} ({self.counter})"
+
+class QuotaEngine:
+    """
+    Checks every limit layer of an endpoint in one call.
+
+    Rolling-window usage comes from the RateLimiter and calendar usage from
+    the UsageTracker, so there is one place that decides whether a call may
+    go ahead and, if not, which layer binds and when it frees up.
+    """
+    def __init__(self, rate_limiter, usage, quotas=None, clock=datetime.now, history=None):
+        """
+        Args:
+            rate_limiter (RateLimiter): Source of rolling-window timestamps.
+            usage (UsageTracker): Source of day/month counters.
+            quotas (dict, optional): Layers per endpoint, shaped like
+                DEFAULT_QUOTAS. Defaults to the "quotas" config section,
+                with unlisted endpoints keeping their defaults.
+            clock (callable): Returns the current local datetime.
+            history (UsageHistory, optional): Where recorded calls are also
+                kept as per-minute history.
+        """
+        self.rate_limiter = rate_limiter
+        self.usage = usage
+        self.clock = clock
+        self.history = history
+
+        if quotas is None:
+            quotas = get_config_section("quotas")
+        merged = dict(DEFAULT_QUOTAS)
+        merged.update(quotas)
+        self.layers = {
+            endpoint: [QuotaLimit(endpoint, **layer) for layer in layers]
+            for endpoint, layers in merged.items()
+        }
+        # Gradual backoff measures usage against the same windows admission does
+        for endpoint, layers in self.layers.items():
+            windows = [(layer.limit, layer.seconds) for layer in layers if layer.period == "window"]
+            if windows:
+                rate_limiter.set_window_limits(endpoint, windows)
+
+    def _used(self, layer, now):
+        """Get how much of a layer has been used."""
+        if layer.period == "window":
+            cutoff = now.timestamp() - layer.seconds
+            return sum(1 for ts in self.rate_limiter.snapshot(layer.endpoint) if ts >= cutoff)
+        return self.usage.count(layer.counter, layer.period)
+
+    def _wait(self, layer, used, now):
+        """Get seconds until a layer drops back below its limit."""
+        if layer.period == "window":
+            timestamps = sorted(self.rate_limiter.snapshot(layer.endpoint))
+            cutoff = now.timestamp() - layer.seconds
+            in_window = [ts for ts in timestamps if ts >= cutoff]
+            if not in_window:
+                return layer.seconds  # A zero limit never frees up within the window
+            if layer.limit <= 0:
+                # Nor with calls in it; look again once the newest has left the window
+                return max(0.0, in_window[-1] + layer.seconds - now.timestamp())
+            # The call that must expire before we are under the limit again
+            freeing = in_window[used - layer.limit]
+            return max(0.0, freeing + layer.seconds - now.timestamp())
+        if layer.period == "day":
+            next_start = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        else:
+            first = now.date().replace(day=1)
+            next_start = datetime.combine((first + timedelta(days=32)).replace(day=1), datetime.min.time())
+        return max(0.0, (next_start - now).total_seconds())
+
+    def admit(self, endpoint):
+        """
+        Check whether a call to an endpoint fits within every limit layer.
+
+        Args:
+            endpoint (str): "search", "lookup" or "post".
+
+        Returns:
+            Admission: Whether the call is allowed, the binding layer (the
+            exhausted layer that frees up last), and seconds until then.
+        """
+        now = self.clock()
+        binding = None
+        wait = 0.0
+        for layer in self.layers.get(endpoint, []):
+            used = self._used(layer, now)
+            if used >= layer.limit:
+                layer_wait = self._wait(layer, used, now)
+                if binding is None or layer_wait > wait:
+                    binding, wait = layer, layer_wait
+        return Admission(binding is None, endpoint, binding, wait)
+
+    def record(self, endpoint):
+        """
+        Record a call against every layer of an endpoint.
+
+        Args:
+            endpoint (str): "search", "lookup" or "post".
+        """
+        self.rate_limiter.record(endpoint)
+        counters = {layer.counter for layer in self.layers.get(endpoint, []) if layer.period != "window"}
+        for counter in sorted(counters):
+            self.usage.increment(counter)
+        if self.history is not None:
+            self.history.record(endpoint)
+            for counter in counters:
+                self.history.record(counter)
+
+    def status(self):
+        """
+        Get usage of every layer for monitoring.
+
+        Returns:
+            dict: endpoint -> list of {"layer", "used", "limit"}.
+        """
+        now = self.clock()
+        return {
+            endpoint: [
+                {"layer": repr(layer), "used": self._used(layer, now), "limit": layer.limit}
+                for layer in layers
+            ]
+            for endpoint, layers in self.layers.items()
+        }
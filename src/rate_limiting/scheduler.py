@@ -0,0 +1,123 @@
+import time
+import heapq
+import logging
+import itertools
+
+logger = logging.getLogger(__name__)
+
+# Retry queue defaults
+MAX_RETRY_QUEUE = 500   # Deferred items kept before the oldest are dropped
+MAX_ATTEMPTS = 3        # Deferrals per item before it is given up
+
+class EndpointScheduler:
+    """
+    Tracks when each API endpoint may be called again.
+
+    A throttled endpoint is marked unavailable until a computed time instead
+    of sleeping the whole process; other endpoints stay usable meanwhile.
+    """
+    def __init__(self, clock=time.time):
+        """
+        Initialize the scheduler.
+
+        Args:
+            clock (callable): Returns the current time in seconds.
+        """
+        self.clock = clock
+        self.blocked_until = {}
+
+    def block(self, endpoint, seconds):
+        """
+        Mark an endpoint unavailable for the given number of seconds.
+
+        Args:
+            endpoint (str): Endpoint name ("search", "lookup" or "post").
+            seconds (float): How long to keep it unavailable.
+        """
+        until = self.clock() + max(0, seconds)
+        if until > self.blocked_until.get(endpoint, 0):
+            self.blocked_until[endpoint] = until
+            logger.info("Endpoint %s unavailable for %.0fs", endpoint, seconds)
+
+    def available_in(self, endpoint):
+        """Get seconds until an endpoint may be called again."""
+        return max(0, self.blocked_until.get(endpoint, 0) - self.clock())
+
+    def is_available(self, endpoint):
+        """Check whether an endpoint may be called now."""
+        return self.available_in(endpoint) <= 0
+
+class RetryQueue:
+    """
+    Bounded min-heap of deferred work ordered by due time.
+    """
+    def __init__(self, max_size=MAX_RETRY_QUEUE, max_attempts=MAX_ATTEMPTS, clock=time.time):
+        """
+        Initialize the retry queue.
+
+        Args:
+            max_size (int): Maximum number of queued items.
+            max_attempts (int): Deferrals allowed per item.
+            clock (callable): Returns the current time in seconds.
+        """
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self._heap = []
+        self._counter = itertools.count()
+        self._attempts = {}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, item, delay, key=None):
+        """
+        Defer an item until delay seconds from now.
+
+        Args:
+            item: The deferred work, e.g. a mention.
+            delay (float): Seconds until the item is due.
+            key (optional): Identity used to count attempts. Defaults to id(item).
+
+        Returns:
+            bool: False if the item was dropped after too many attempts.
+        """
+        key = key if key is not None else id(item)
+        attempts = self._attempts.get(key, 0) + 1
+        if attempts > self.max_attempts:
+            self._attempts.pop(key, None)
+            logger.warning("Dropping deferred item after %d attempts", self.max_attempts)
+            return False
+        self._attempts[key] = attempts
+
+        if len(self._heap) >= self.max_size:
+            # Drop the earliest-due item rather than grow without bound
+            dropped = heapq.heappop(self._heap)
+            self._attempts.pop(dropped[2], None)
+            logger.warning("Retry queue full, dropping oldest deferred item")
+
+        heapq.heappush(self._heap, (self.clock() + max(0, delay), next(self._counter), key, item))
+        return True
+
+    def pop_due(self):
+        """
+        Remove and return every item whose due time has passed.
+
+        Returns:
+            list: Due items in due-time order.
+        """
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[3])
+        return due
+
+    def next_due_in(self):
+        """Get seconds until the next item is due, or None if the queue is empty."""
+        if not self._heap:
+            return None
+        return max(0, self._heap[0][0] - self.clock())
+
+    def forget(self, key):
+        """Clear the attempt count of an item that is done with, however it ended."""
+        self._attempts.pop(key, None)
@@ -1,51 +1,211 @@
 # This file makes the state directory a Python package
 
+from contextlib import contextmanager
+
+from src.rate_limiting.limiter import RateLimiter
+from src.rate_limiting.circuit_breaker import CircuitBreakerRegistry
+from src.rate_limiting.scheduler import EndpointScheduler, RetryQueue
+from src.rate_limiting.quota import QuotaEngine
+from src.rate_limiting.fairshare import FairShareScheduler
+from src.storage import create_storage
+from config import get_config_section
+from src.api.tweet_cache import TweetCache
+from src.api.prefilter import Prefilter
+from src.utils.timing import LatencySLO
+
 from .persistence import StateManager
 from .preferences import UserPreferences
 from .usage import UsageTracker
+from .tracking import HandledMentions, QuotedTargets, QUOTE_WINDOW
+from .history import UsageHistory
 
 # Main state class that combines all state functionality
 class BotState:
-    def __init__(self):
-        self.state_manager = StateManager()
-        self.preferences = UserPreferences()
-        self.usage = UsageTracker()
-        
+    def __init__(self, storage=None, quota=None):
+        # One backend shared by every component so a cycle commits together
+        self.storage = storage if storage is not None else create_storage()
+        # A quota engine passed in (e.g. one shared between worker processes)
+        # brings its own limiter, so backoff sees the same usage it admits on
+        self.rate_limiter = quota.rate_limiter if quota is not None else RateLimiter()
+        self.breakers = CircuitBreakerRegistry()
+        self.scheduler = EndpointScheduler()
+        self.retry_queue = RetryQueue()
+        self.fair_share = FairShareScheduler.from_config()
+        self.prefilter = Prefilter.from_config()
+        self.tweet_cache = TweetCache.from_config()
+        self.latency = LatencySLO.from_config()
+        self.handled = HandledMentions()
+        self.quoted_targets = QuotedTargets(
+            window=float(get_config_section("coalescing").get("window", QUOTE_WINDOW))
+        )
+        self.state_manager = StateManager(self.storage)
+        self.preferences = UserPreferences(self.storage)
+        # The tracker the quota engine charges is the one everything reads;
+        # a shared engine keeps its counters in its own ledger, so only the
+        # check time comes from this state's storage
+        self._owns_usage = quota is None
+        if quota is None:
+            self.usage = UsageTracker(self.storage)
+            quota = QuotaEngine(self.rate_limiter, self.usage)
+        else:
+            self.usage = quota.usage
+        if quota.history is None:
+            quota.history = UsageHistory.from_config()
+        self.quota = quota
+        self.history = quota.history
+
         # Initialize from saved state
-        self.state_manager.load_state(self)
-    
+        self.load_state()
+
     # Delegate methods to appropriate components
     def load_state(self):
         self.state_manager.load_state(self)
-    
+        self.usage.load(self.storage, counters=self._owns_usage)
+
     def save_state(self):
-        self.state_manager.save_state(self)
-    
+        with self.storage.transaction():
+            self.state_manager.save_state(self)
+            self.usage.save(self.storage)
+
+    @contextmanager
+    def cycle(self):
+        """Commit everything a cycle changes, including a final snapshot, as one transaction."""
+        with self.storage.transaction():
+            try:
+                yield self
+            finally:
+                self.save_state()
+
+    def close(self):
+        self.storage.close()
+        self.history.close()
+
     def update_user_prefs(self, user_id, action):
         self.preferences.update_user_prefs(user_id, action)
-    
+
     def is_opted_out(self, user_id):
         return self.preferences.is_opted_out(user_id)
-    
+
+    def mark_handled(self, mention_id):
+        self.handled.add(mention_id)
+
+    def is_handled(self, mention_id):
+        return mention_id in self.handled
+
+    def record_quote(self, tweet_id):
+        self.quoted_targets.record(tweet_id)
+
     def increment_read(self):
         self.usage.increment_read()
         self.save_state()
-    
+
     def increment_post(self):
         self.usage.increment_post()
         self.save_state()
-    
-    def update_check_time(self):
-        self.usage.update_check_time()
+
+    def update_check_time(self, checked_at=None):
+        self.usage.update_check_time(checked_at)
         self.save_state()
-    
+
     def check_reset(self):
         self.usage.check_reset()
 
+    # Usage counters live on the usage tracker
+    @property
+    def reads_this_month(self):
+        return self.usage.reads_this_month
+
+    @property
+    def posts_this_month(self):
+        return self.usage.posts_this_month
+
+    @property
+    def last_check_time(self):
+        return self.usage.last_check_time
+
+    # Rolling-window tracking lives on the rate limiter
+    @property
+    def search_requests(self):
+        return self.rate_limiter.search_requests
+
+    @search_requests.setter
+    def search_requests(self, value):
+        self.rate_limiter.search_requests = value
+
+    @property
+    def tweet_lookup_requests(self):
+        return self.rate_limiter.tweet_lookup_requests
+
+    @tweet_lookup_requests.setter
+    def tweet_lookup_requests(self, value):
+        self.rate_limiter.tweet_lookup_requests = value
+
+    @property
+    def post_tweet_requests(self):
+        return self.rate_limiter.post_tweet_requests
+
+    @post_tweet_requests.setter
+    def post_tweet_requests(self, value):
+        self.rate_limiter.post_tweet_requests = value
+
+    def admit(self, endpoint):
+        return self.quota.admit(endpoint)
+
+    def can_search(self):
+        return self.rate_limiter.can_search()
+
+    def can_lookup_tweet(self):
+        return self.rate_limiter.can_lookup_tweet()
+
+    def can_post_tweet(self):
+        return self.rate_limiter.can_post_tweet()
+
+    def get_search_usage_ratio(self):
+        return self.rate_limiter.get_search_usage_ratio()
+
+    def get_lookup_usage_ratio(self):
+        return self.rate_limiter.get_lookup_usage_ratio()
+
+    def get_post_usage_ratio(self):
+        return self.rate_limiter.get_post_usage_ratio()
+
+    def get_search_window_reset(self):
+        return self.rate_limiter.get_search_window_reset()
+
+    def get_lookup_window_reset(self):
+        return self.rate_limiter.get_lookup_window_reset()
+
+    def get_post_window_reset(self):
+        return self.rate_limiter.get_post_window_reset()
+
+    def get_gradual_backoff_delay(self, request_type):
+        return self.rate_limiter.get_gradual_backoff_delay(request_type)
+
+    def record_search(self):
+        self.quota.record("search")
+        self.save_state()
+
+    def record_lookup(self):
+        self.quota.record("lookup")
+        self.save_state()
+
+    def record_post(self):
+        self.quota.record("post")
+        self.save_state()
+
+    def record_timeout(self, endpoint):
+        # The request may have reached Twitter, so it still spends quota
+        self.quota.record(endpoint)
+        self.breakers.record_timeout(endpoint)
+        self.save_state()
+
 # Expose primary classes at the package level
 __all__ = [
     'BotState',
     'StateManager',
     'UserPreferences',
-    'UsageTracker'
+    'UsageTracker',
+    'HandledMentions',
+    'QuotedTargets',
+    'UsageHistory'
 ]
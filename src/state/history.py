@@ -0,0 +1,205 @@
+import os
+import sys
+import mmap
+import json
+import time
+import logging
+from datetime import datetime
+
+from config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+# History defaults
+RETENTION_DAYS = 30
+SLOT_BYTES = 12         # int64 minute stamp + uint32 count
+MAX_COUNT = 2 ** 32 - 1
+
+class RingSeries:
+    """
+    Fixed-size ring of per-minute counts backed by a memory-mapped file.
+
+    The file holds `slots` minute stamps followed by `slots` counts. A minute
+    lands in slot minute % slots; a stale stamp in that slot means the
+    bucket has wrapped and its count is reset. Updates are in-place writes to
+    the mapping, so recording costs no I/O call and the file never grows.
+    """
+    def __init__(self, path, slots):
+        """
+        Args:
+            path (str): Ring file path; created zero-filled if missing.
+            slots (int): Minutes kept.
+        """
+        self.path = path
+        self.slots = slots
+        size = slots * SLOT_BYTES
+
+        if os.path.exists(path) and os.path.getsize(path) != size:
+            logger.warning("Retention of %s changed, starting its history over", path)
+            os.remove(path)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.truncate(size)
+
+        with open(path, "r+b") as f:
+            self._map = mmap.mmap(f.fileno(), size)
+        view = memoryview(self._map)
+        self._stamps = view[:slots * 8].cast("q")
+        self._counts = view[slots * 8:].cast("I")
+
+    def add(self, minute, count=1):
+        """Add to the count of a minute."""
+        slot = minute % self.slots
+        if self._stamps[slot] != minute:
+            self._stamps[slot] = minute
+            self._counts[slot] = 0
+        self._counts[slot] = min(MAX_COUNT, self._counts[slot] + count)
+
+    def get(self, minute):
+        """Get the count of a minute, 0 if it was never recorded or has expired."""
+        slot = minute % self.slots
+        return self._counts[slot] if self._stamps[slot] == minute else 0
+
+    def close(self):
+        self._stamps.release()
+        self._counts.release()
+        self._map.close()
+
+class UsageHistory:
+    """
+    Rolling per-minute history of API calls, usage counters and mention load.
+
+    Each series ("search", "lookup", "post", "reads", "posts", "mentions")
+    is a RingSeries file under `path`, covering the last `retention_days`.
+    """
+    def __init__(self, path="data/history", retention_days=RETENTION_DAYS, clock=time.time):
+        """
+        Args:
+            path (str): Directory holding one ring file per series.
+            retention_days (float): Days of history kept.
+            clock (callable): Returns the current time in seconds.
+        """
+        self.path = path
+        self.slots = max(1, int(retention_days * 24 * 60))
+        self.clock = clock
+        self._series = {}
+        os.makedirs(path, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, options=None):
+        """
+        Create a history store from the "history" config section.
+
+        Args:
+            options (dict, optional): Overrides the config section.
+
+        Returns:
+            UsageHistory: The configured store.
+        """
+        if options is None:
+            options = get_config_section("history")
+        return cls(
+            path=options.get("path", "data/history"),
+            retention_days=float(options.get("retention_days", RETENTION_DAYS))
+        )
+
+    def _ring(self, name):
+        ring = self._series.get(name)
+        if ring is None:
+            ring = self._series[name] = RingSeries(os.path.join(self.path, f"{name}.ring"), self.slots)
+        return ring
+
+    def record(self, name, count=1):
+        """
+        Count events in the current minute.
+
+        Args:
+            name (str): Series name.
+            count (int): Number of events.
+        """
+        if count <= 0:
+            return
+        try:
+            self._ring(name).add(int(self.clock() // 60), count)
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to record %s history: %s", name, e)
+
+    def counts(self, name, start=None, end=None):
+        """
+        Get per-minute counts over a time range.
+
+        Args:
+            name (str): Series name.
+            start (float, optional): Range start in epoch seconds. Defaults
+                to the oldest retained minute.
+            end (float, optional): Range end in epoch seconds. Defaults to now.
+
+        Returns:
+            list: (minute start in epoch seconds, count) pairs, oldest first,
+            with unrecorded minutes as 0.
+        """
+        now_minute = int(self.clock() // 60)
+        first = now_minute - self.slots + 1
+        end_minute = min(now_minute, int((end if end is not None else self.clock()) // 60))
+        start_minute = max(first, int(start // 60) if start is not None else first)
+        if name not in self._series and not os.path.exists(os.path.join(self.path, f"{name}.ring")):
+            return [(minute * 60, 0) for minute in range(start_minute, end_minute + 1)]
+        ring = self._ring(name)
+        return [(minute * 60, ring.get(minute)) for minute in range(start_minute, end_minute + 1)]
+
+    def summary(self, name, start=None, end=None, bucket=60):
+        """
+        Summarize a series over a time range.
+
+        Args:
+            name (str): Series name.
+            start (float, optional): Range start in epoch seconds.
+            end (float, optional): Range end in epoch seconds.
+            bucket (int): Bucket width in seconds for peaks and percentiles,
+                e.g. 900 to compare against 15-minute rate limits.
+
+        Returns:
+            dict: Total, average rate per hour, and peak (with its start time)
+            and p50/p95/p99 of the per-bucket totals.
+        """
+        minutes = self.counts(name, start, end)
+        per_bucket = max(1, int(bucket // 60))
+        buckets = [
+            (minutes[i][0], sum(count for _, count in minutes[i:i + per_bucket]))
+            for i in range(0, len(minutes), per_bucket)
+        ]
+        total = sum(count for _, count in minutes)
+        if not buckets:
+            return {"series": name, "total": 0, "per_hour": 0.0, "peak": 0, "peak_at": None,
+                    "p50": 0, "p95": 0, "p99": 0}
+
+        peak_at, peak = max(buckets, key=lambda b: b[1])
+        ordered = sorted(count for _, count in buckets)
+
+        def pct(p):
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        return {
+            "series": name,
+            "total": total,
+            "per_hour": round(total * 60 / len(minutes), 3),
+            "peak": peak,
+            "peak_at": datetime.fromtimestamp(peak_at).isoformat() if peak else None,
+            "p50": pct(0.5),
+            "p95": pct(0.95),
+            "p99": pct(0.99)
+        }
+
+    def close(self):
+        for ring in self._series.values():
+            ring.close()
+        self._series.clear()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.state.history <series> [hours=24] [bucket_seconds=900]")
+        sys.exit(1)
+    hours = float(sys.argv[2]) if len(sys.argv) > 2 else 24
+    bucket = int(sys.argv[3]) if len(sys.argv) > 3 else 900
+    history = UsageHistory.from_config()
+    print(json.dumps(history.summary(sys.argv[1], start=time.time() - hours * 3600, bucket=bucket), indent=2))
@@ -1,53 +1,24 @@
-import os
-import json
 import logging
 from src.utils.security import hash_user_id
+from src.storage import JsonStorage
+
+logger = logging.getLogger(__name__)
 
 class UserPreferences:
     """
     Manages user opt-in and opt-out preferences.
     """
-    def __init__(self, opt_file="data/user_prefs.json"):
+    def __init__(self, storage=None):
         """
         Initialize the user preferences manager.
 
         Args:
-            opt_file (str): Path to the user preferences file.
+            storage (StorageBackend, optional): Backend the preferences are
+                stored in. Defaults to data/user_prefs.json.
         """
-        self.opt_file = opt_file
-        self.cached_optouts = set()
-        self.cached_optins = set()
-        self._ensure_file_exists()
-        self._load_user_prefs()
-
-    def _ensure_file_exists(self):
-        """Ensure the preferences file exists with default values."""
-        # Ensure data directory exists
-        os.makedirs(os.path.dirname(self.opt_file), exist_ok=True)
-        
-        if not os.path.exists(self.opt_file):
-            with open(self.opt_file, "w") as f:
-                json.dump({"opt_out": [], "opt_in": []}, f)
-
-    def _load_user_prefs(self):
-        """Load user preferences into memory cache."""
-        try:
-            with open(self.opt_file) as f:
-                prefs = json.load(f)
-                # Validate that we have valid lists
-                if not isinstance(prefs.get("opt_out", []), list):
-                    prefs["opt_out"] = []
-                if not isinstance(prefs.get("opt_in", []), list):
-                    prefs["opt_in"] = []
-                # Validate each entry is a string
-                self.cached_optouts = set(str(uid) for uid in prefs.get("opt_out", []) if isinstance(uid, (str, int)))
-                self.cached_optins = set(str(uid) for uid in prefs.get("opt_in", []) if isinstance(uid, (str, int)))
-                logging.info(f"Loaded user preferences: {len(self.cached_optouts)} opt-outs, {len(self.cached_optins)} opt-ins")
-        except Exception as e:
-            logging.error(f"Failed to load user preferences: {e}")
-            # Initialize with empty sets if loading fails
-            self.cached_optouts = set()
-            self.cached_optins = set()
+        self.storage = storage if storage is not None else JsonStorage()
+        counts = self.storage.pref_counts()
+        logger.info("Loaded user preferences: %d opt-outs, %d opt-ins", counts["opt_out"], counts["opt_in"])
 
     def update_user_prefs(self, user_id: str, action: str):
         """
@@ -57,31 +28,16 @@ class UserPreferences:
             user_id (str): The user ID to update.
             action (str): The action to perform ("opt_in" or "opt_out").
         """
+        if action not in ("opt_in", "opt_out"):
+            logger.error("Failed updating prefs: unknown action %s", action)
+            return
         hashed_id = hash_user_id(user_id)
         try:
-            with open(self.opt_file, "r+") as f:
-                prefs = json.load(f)
-                if action == "opt_out" and hashed_id not in prefs["opt_out"]:
-                    prefs["opt_out"].append(hashed_id)
-                    if hashed_id in prefs["opt_in"]:
-                        prefs["opt_in"].remove(hashed_id)
-                elif action == "opt_in" and hashed_id not in prefs["opt_in"]:
-                    prefs["opt_in"].append(hashed_id)
-                    if hashed_id in prefs["opt_out"]:
-                        prefs["opt_out"].remove(hashed_id)
-                f.seek(0)
-                json.dump(prefs, f, indent=2)
-                f.truncate()
-            # Update the cache
-            if action == "opt_out":
-                self.cached_optouts.add(hashed_id)
-                self.cached_optins.discard(hashed_id)
-            elif action == "opt_in":
-                self.cached_optins.add(hashed_id)
-                self.cached_optouts.discard(hashed_id)
-            logging.info(f"User ...{user_id[-4:]} {action.replace('_', '-')}")
+            if self.storage.get_pref(hashed_id) != action:
+                self.storage.set_pref(hashed_id, action)
+            logger.info("User ...%s %s", user_id[-4:], action.replace('_', '-'))
         except Exception as e:
-            logging.error(f"Failed updating prefs: {e}")
+            logger.error("Failed updating prefs: %s", e)
 
     def is_opted_out(self, user_id: str) -> bool:
         """
@@ -93,4 +49,4 @@ class UserPreferences:
         Returns:
             bool: True if the user is opted out, False otherwise.
         """
-        return hash_user_id(user_id) in self.cached_optouts
+        return self.storage.get_pref(hash_user_id(user_id)) == "opt_out"
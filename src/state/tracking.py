@@ -0,0 +1,104 @@
+import time
+from collections import OrderedDict
+
+# Tracking defaults
+MAX_HANDLED = 5000          # Mention ids remembered for dedupe
+QUOTE_WINDOW = 6 * 60 * 60  # Don't quote the same tweet twice within 6h
+MAX_QUOTED = 2000           # Quoted targets remembered
+
+class HandledMentions:
+    """
+    Bounded record of mention ids that have already been handled.
+    """
+    def __init__(self, max_size=MAX_HANDLED):
+        """
+        Args:
+            max_size (int): Maximum number of ids remembered; oldest go first.
+        """
+        self.max_size = max_size
+        self._ids = OrderedDict()
+
+    def __contains__(self, mention_id):
+        return str(mention_id) in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, mention_id):
+        """Mark a mention as handled."""
+        key = str(mention_id)
+        self._ids[key] = None
+        self._ids.move_to_end(key)
+        while len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+
+    def to_list(self):
+        """Serialize for storage, oldest first."""
+        return list(self._ids)
+
+    def load(self, ids):
+        """Restore from a list written by to_list."""
+        self._ids.clear()
+        for mention_id in ids or []:
+            if isinstance(mention_id, (str, int)):
+                self.add(mention_id)
+
+class QuotedTargets:
+    """
+    Remembers which tweets were quoted recently, so a burst of mentions of
+    the same tweet produces at most one quote per window.
+    """
+    def __init__(self, window=QUOTE_WINDOW, max_size=MAX_QUOTED, clock=time.time):
+        """
+        Args:
+            window (float): Seconds during which a quoted tweet isn't quoted again.
+            max_size (int): Maximum number of targets remembered.
+            clock (callable): Returns the current time in seconds.
+        """
+        self.window = window
+        self.max_size = max_size
+        self.clock = clock
+        self._quoted = OrderedDict()  # tweet id -> time quoted
+
+    def record(self, tweet_id):
+        """Record that a tweet was just quoted."""
+        key = str(tweet_id)
+        self._quoted[key] = self.clock()
+        self._quoted.move_to_end(key)
+        while len(self._quoted) > self.max_size:
+            self._quoted.popitem(last=False)
+
+    def recently_quoted(self, tweet_id):
+        """Check whether a tweet was quoted within the window."""
+        quoted_at = self._quoted.get(str(tweet_id))
+        return quoted_at is not None and self.clock() - quoted_at < self.window
+
+    def quoted_since(self, timestamp):
+        """
+        Get the tweets quoted after a point in time.
+
+        Args:
+            timestamp (float): Epoch seconds.
+
+        Returns:
+            list: Tweet ids, most recently quoted first.
+        """
+        since = []
+        for key in reversed(self._quoted):
+            if self._quoted[key] <= timestamp:
+                break
+            since.append(key)
+        return since
+
+    def to_dict(self):
+        """Serialize unexpired entries for storage."""
+        cutoff = self.clock() - self.window
+        return {key: ts for key, ts in self._quoted.items() if ts >= cutoff}
+
+    def load(self, quoted):
+        """Restore from a dict written by to_dict."""
+        self._quoted.clear()
+        if isinstance(quoted, dict):
+            for key, ts in sorted(quoted.items(), key=lambda item: item[1]):
+                if isinstance(ts, (int, float)):
+                    self._quoted[str(key)] = float(ts)
@@ -1,52 +1,197 @@
 import logging
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Calendar periods every usage counter is tracked over
+PERIODS = ("day", "month")
+
+def _period_key(period, now):
+    """Get the key identifying the calendar period `now` falls in."""
+    if period == "day":
+        return now.date().isoformat()
+    return now.strftime("%Y-%m")
+
 class UsageTracker:
     """
-    Tracks API usage for monthly limits.
+    Tracks API usage counters per calendar day and month.
+    
+    Counters are named by the quota they feed ("reads", "posts", ...) and
+    reset themselves when their period rolls over.
     """
-    def __init__(self):
+    def __init__(self, storage=None, clock=datetime.now):
         """
         Initialize usage tracker.
+        
+        Args:
+            storage (StorageBackend, optional): Backend the counters are
+                persisted in. Without one, load and save are no-ops.
+            clock (callable): Returns the current local datetime.
         """
-        self.reads_today = 0
-        self.posts_today = 0
-        self.last_reset_date = datetime.now().date().isoformat()
+        self.storage = storage
+        self.clock = clock
+        self.counters = {}  # counter -> {period: [period key, count]}
         self.last_check_time = datetime.now().isoformat()
     
+    def load(self, storage=None, counters=True):
+        """
+        Load usage counters from storage, validating each value.
+        
+        Args:
+            storage (StorageBackend, optional): Backend to load from.
+                Defaults to the tracker's own.
+            counters (bool): False to load only the last check time, e.g.
+                when the counters are kept in a shared budget ledger.
+        """
+        storage = storage if storage is not None else self.storage
+        if storage is None:
+            return
+        try:
+            usage = storage.load_usage()
+        except Exception as e:
+            logger.error("Failed loading usage counters: %s", e)
+            return
+        
+        if counters:
+            self._load_counters(usage)
+        
+        try:
+            if isinstance(usage.get("last_check_time"), str):
+                datetime.fromisoformat(usage["last_check_time"])
+                self.last_check_time = usage["last_check_time"]
+        except (ValueError, TypeError):
+            logger.warning("Invalid last_check_time in state file. Using current time.")
+    
+    def _load_counters(self, usage):
+        """Replace the counters with those in a stored usage document."""
+        counters = usage.get("counters")
+        if isinstance(counters, dict):
+            self.counters = {}
+            for counter, periods in counters.items():
+                if not isinstance(periods, dict):
+                    continue
+                for period, entry in periods.items():
+                    try:
+                        key, count = str(entry[0]), max(0, int(entry[1]))
+                    except (ValueError, TypeError, IndexError, KeyError):
+                        logger.warning("Invalid %s %s usage counter in state file. Starting from zero.", counter, period)
+                        continue
+                    if period in PERIODS:
+                        self.counters.setdefault(counter, {})[period] = [key, count]
+        else:
+            self._migrate_legacy(usage)
+    
+    def _migrate_legacy(self, usage):
+        """
+        Seed monthly counters from the old reads_today/posts_today fields,
+        which despite their names counted the current month.
+        """
+        try:
+            last_reset = datetime.fromisoformat(usage.get("last_reset_date", "")).date()
+        except (ValueError, TypeError):
+            return
+        now = self.clock()
+        if (last_reset.year, last_reset.month) != (now.year, now.month):
+            return
+        month = _period_key("month", now)
+        for legacy_key, counter in (("reads_today", "reads"), ("posts_today", "posts")):
+            try:
+                count = max(0, int(usage.get(legacy_key, 0)))
+            except (ValueError, TypeError):
+                continue
+            if count:
+                self.counters.setdefault(counter, {})["month"] = [month, count]
+    
+    def save(self, storage=None):
+        """
+        Save usage counters to storage.
+        
+        Args:
+            storage (StorageBackend, optional): Backend to save to. Defaults
+                to the tracker's own.
+        """
+        storage = storage if storage is not None else self.storage
+        if storage is None:
+            return
+        storage.save_usage({
+            "counters": {counter: {period: list(entry) for period, entry in periods.items()}
+                         for counter, periods in self.counters.items()},
+            "last_check_time": self.last_check_time
+        })
+    
+    def count(self, counter, period):
+        """
+        Get a counter's value for the current period.
+        
+        Args:
+            counter (str): Counter name, e.g. "reads".
+            period (str): "day" or "month".
+        
+        Returns:
+            int: Calls counted so far in the current period.
+        """
+        entry = self.counters.get(counter, {}).get(period)
+        if entry is None or entry[0] != _period_key(period, self.clock()):
+            return 0
+        return entry[1]
+    
+    def increment(self, counter):
+        """
+        Count one call against a counter in every period.
+        
+        Args:
+            counter (str): Counter name, e.g. "reads".
+        """
+        now = self.clock()
+        periods = self.counters.setdefault(counter, {})
+        for period in PERIODS:
+            key = _period_key(period, now)
+            entry = periods.get(period)
+            if entry is None or entry[0] != key:
+                if entry is not None and entry[1]:
+                    logger.info("Resetting %s %s counter. Previous: %d", counter, period, entry[1])
+                entry = periods[period] = [key, 0]
+            entry[1] += 1
+        logger.info("API %s: %d today, %d this month", counter, periods["day"][1], periods["month"][1])
+    
     def increment_read(self):
         """
         Increment the read counter.
         """
-        self.check_reset()
-        self.reads_today += 1
-        logging.info(f"API Reads this month: {self.reads_today}/100")
+        self.increment("reads")
     
     def increment_post(self):
         """
         Increment the post counter.
         """
-        self.check_reset()
-        self.posts_today += 1
-        logging.info(f"API Posts this month: {self.posts_today}/500")
+        self.increment("posts")
     
-    def update_check_time(self):
-        """
-        Update the last check time to now.
-        """
-        self.last_check_time = datetime.now().isoformat()
+    @property
+    def reads_this_month(self):
+        return self.count("reads", "month")
+    
+    @property
+    def posts_this_month(self):
+        return self.count("posts", "month")
     
     def check_reset(self):
         """
-        Check if the month has changed and reset counters if needed.
+        Drop counters whose period has rolled over.
+        """
+        now = self.clock()
+        for counter, periods in self.counters.items():
+            for period, entry in list(periods.items()):
+                if entry[0] != _period_key(period, now):
+                    if entry[1]:
+                        logger.info("Resetting %s %s counter. Previous: %d", counter, period, entry[1])
+                    del periods[period]
+    
+    def update_check_time(self, checked_at=None):
         """
-        current_date = datetime.now().date()
-        last_date = datetime.fromisoformat(self.last_reset_date).date() if isinstance(self.last_reset_date, str) else self.last_reset_date
+        Update the last check time.
         
-        if current_date.month != last_date.month:
-            logging.info(f"Resetting API usage counters. Previous: {self.reads_today} reads, {self.posts_today} posts")
-            self.reads_today = 0
-            self.posts_today = 0
-            self.last_reset_date = current_date.isoformat()
-            return True
-        return False
+        Args:
+            checked_at (datetime, optional): When the search that covered
+                everything up to now was made. Defaults to now.
+        """
+        self.last_check_time = (checked_at or datetime.now()).isoformat()
@@ -0,0 +1,41 @@
+# This file makes the storage directory a Python package
+
+from config import get_config_section
+
+from .base import StorageBackend, TIMESTAMP_KEYS
+from .json_backend import JsonStorage
+from .sqlite_backend import SqliteStorage
+
+def create_storage(options=None):
+    """
+    Create the storage backend selected in the config file.
+
+    Args:
+        options (dict, optional): Storage settings. Defaults to the "storage"
+            section of the config file. "backend" is "json" (default) or
+            "sqlite"; "path" overrides the SQLite database location.
+
+    Returns:
+        StorageBackend: The configured backend.
+    """
+    if options is None:
+        options = get_config_section("storage")
+
+    backend = options.get("backend", "json")
+    if backend == "sqlite":
+        return SqliteStorage(options.get("path", "data/houndthecult.db"))
+    if backend != "json":
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return JsonStorage(
+        options.get("state_file", "data/bot_state.json"),
+        options.get("opt_file", "data/user_prefs.json")
+    )
+
+# Expose storage components at the package level
+__all__ = [
+    'StorageBackend',
+    'JsonStorage',
+    'SqliteStorage',
+    'create_storage',
+    'TIMESTAMP_KEYS'
+]
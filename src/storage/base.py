@@ -0,0 +1,198 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Limiter queues as they appear in the state document, mapped to endpoint names
+TIMESTAMP_KEYS = {
+    "search_timestamps": "search",
+    "tweet_lookup_timestamps": "lookup",
+    "post_tweet_timestamps": "post"
+}
+
+class StorageBackend:
+    """
+    Base class for bot state storage.
+
+    Writes are buffered while a transaction is open and applied together when
+    the outermost transaction exits, so a whole cycle's updates to usage
+    counts, limiter timestamps and preferences land as one unit. Writes made
+    outside a transaction are applied immediately.
+
+    Subclasses implement load_state, load_usage, _lookup_pref, pref_counts,
+    iter_prefs, merge_prefs, compact and _write.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._pending_state = None
+        self._pending_usage = None
+        self._pending_prefs = {}
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group all writes made inside the block into a single commit.
+
+        Pending writes are committed even if the block raises: they describe
+        API calls that have already happened, so dropping them would only
+        make our tracking drift from Twitter's.
+        """
+        with self._lock:
+            self._depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                outermost = self._depth == 0
+            if outermost:
+                self.flush()
+
+    def save_state(self, state):
+        """
+        Persist the bot state document (limiter timestamps and metadata).
+
+        Args:
+            state (dict): State values keyed as in the JSON state file.
+        """
+        with self._lock:
+            self._pending_state = dict(state)
+        self._flush_if_idle()
+
+    def save_usage(self, usage):
+        """
+        Persist usage counters.
+
+        Args:
+            usage (dict): Usage values such as "counters" and "last_check_time".
+        """
+        with self._lock:
+            self._pending_usage = dict(usage)
+        self._flush_if_idle()
+
+    def set_pref(self, hashed_id, action):
+        """
+        Record a user's opt-in or opt-out.
+
+        Args:
+            hashed_id (str): Hashed user ID.
+            action (str): "opt_in" or "opt_out".
+        """
+        with self._lock:
+            self._pending_prefs[hashed_id] = action
+        self._flush_if_idle()
+
+    def get_pref(self, hashed_id):
+        """
+        Look up a single user's preference.
+
+        Args:
+            hashed_id (str): Hashed user ID.
+
+        Returns:
+            str or None: "opt_in", "opt_out", or None if the user has no preference.
+        """
+        with self._lock:
+            if hashed_id in self._pending_prefs:
+                return self._pending_prefs[hashed_id]
+        return self._lookup_pref(hashed_id)
+
+    def flush(self):
+        """
+        Apply all pending writes in one commit.
+
+        On failure the pending writes are kept so the next flush retries them.
+        """
+        with self._lock:
+            state, usage, prefs = self._pending_state, self._pending_usage, self._pending_prefs
+            if state is None and usage is None and not prefs:
+                return
+            self._pending_state, self._pending_usage, self._pending_prefs = None, None, {}
+            try:
+                self._write(state, usage, prefs)
+            except Exception as e:
+                logger.error("Failed writing %s: %s", type(self).__name__, e)
+                # Keep the writes so the next flush retries them
+                self._pending_state, self._pending_usage, self._pending_prefs = state, usage, prefs
+
+    def _flush_if_idle(self):
+        """Flush immediately when no transaction is open."""
+        with self._lock:
+            idle = self._depth == 0
+        if idle:
+            self.flush()
+
+    def close(self):
+        """Flush pending writes and release resources."""
+        self.flush()
+
+    def load_state(self):
+        """
+        Load the bot state document.
+
+        Returns:
+            dict: Stored state values.
+
+        Raises:
+            Exception: If the stored state cannot be read.
+        """
+        raise NotImplementedError
+
+    def load_usage(self):
+        """
+        Load usage counters.
+
+        Returns:
+            dict: Stored usage values.
+        """
+        raise NotImplementedError
+
+    def pref_counts(self):
+        """
+        Count stored preferences.
+
+        Returns:
+            dict: Number of entries per action, e.g. {"opt_out": 3, "opt_in": 1}.
+        """
+        raise NotImplementedError
+
+    def iter_prefs(self):
+        """
+        Iterate over all stored preferences.
+
+        Yields:
+            tuple: (hashed_id, action) pairs.
+        """
+        raise NotImplementedError
+
+    def merge_prefs(self, pairs):
+        """
+        Apply many preferences in one pass, e.g. for a bulk import.
+
+        Later pairs win over earlier ones and over stored values, so
+        duplicates in the input collapse into a single entry.
+
+        Args:
+            pairs (iterable): (hashed_id, action) pairs; may be a generator.
+
+        Returns:
+            int: Number of pairs applied.
+        """
+        raise NotImplementedError
+
+    def compact(self):
+        """
+        Rewrite the preference store without duplicates or dead space.
+
+        Returns:
+            dict: Number of entries per action after compaction.
+        """
+        raise NotImplementedError
+
+    def _lookup_pref(self, hashed_id):
+        raise NotImplementedError
+
+    def _write(self, state, usage, prefs):
+        raise NotImplementedError
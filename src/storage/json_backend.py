@@ -0,0 +1,195 @@
+import os
+import json
+import logging
+from datetime import datetime
+
+from .base import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# reads_today/posts_today/last_reset_date are the pre-"counters" layout, still
+# read once to migrate older state files
+USAGE_KEYS = ("counters", "last_check_time", "reads_today", "posts_today", "last_reset_date")
+
+class JsonStorage(StorageBackend):
+    """
+    Storage backed by the original JSON files in data/.
+
+    Usage counters and limiter timestamps share data/bot_state.json so they
+    are always written together; preferences live in data/user_prefs.json.
+    """
+    def __init__(self, state_file="data/bot_state.json", opt_file="data/user_prefs.json"):
+        """
+        Initialize the JSON storage.
+
+        Args:
+            state_file (str): Path to the state file.
+            opt_file (str): Path to the user preferences file.
+        """
+        super().__init__()
+        self.state_file = state_file
+        self.opt_file = opt_file
+        self._doc = {}
+        self._prefs = {}
+        self._ensure_files_exist()
+        self._load_prefs()
+        try:
+            self._read_doc()
+        except Exception:
+            pass  # Reported to the caller by load_state
+
+    def _ensure_files_exist(self):
+        """Initialize files with empty defaults if missing."""
+        # Ensure data directories exist
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        os.makedirs(os.path.dirname(self.opt_file), exist_ok=True)
+
+        defaults = {
+            "counters": {},
+            "last_check_time": datetime.now().isoformat(),
+            "search_timestamps": [],
+            "tweet_lookup_timestamps": [],
+            "post_tweet_timestamps": []
+        }
+
+        if not os.path.exists(self.state_file):
+            with open(self.state_file, "w") as f:
+                json.dump(defaults, f)
+
+        if not os.path.exists(self.opt_file):
+            with open(self.opt_file, "w") as f:
+                json.dump({"opt_out": [], "opt_in": []}, f)
+
+    def _read_doc(self):
+        """Read the state document from disk and cache it."""
+        with open(self.state_file) as f:
+            doc = json.load(f)
+        if not isinstance(doc, dict):
+            raise ValueError("state file does not contain an object")
+        with self._lock:
+            self._doc = doc
+        return doc
+
+    def _load_prefs(self):
+        """Load user preferences into memory."""
+        try:
+            with open(self.opt_file) as f:
+                prefs = json.load(f)
+            # Validate that we have valid lists of string/int IDs
+            opt_out = prefs.get("opt_out", [])
+            opt_in = prefs.get("opt_in", [])
+            self._prefs = {}
+            for action, ids in (("opt_in", opt_in), ("opt_out", opt_out)):
+                if isinstance(ids, list):
+                    for uid in ids:
+                        if isinstance(uid, (str, int)):
+                            self._prefs[str(uid)] = action
+        except Exception as e:
+            logger.error("Failed to load user preferences: %s", e)
+            # Initialize with empty preferences if loading fails
+            self._prefs = {}
+
+    def load_state(self):
+        doc = self._read_doc()
+        return {k: v for k, v in doc.items() if k not in USAGE_KEYS}
+
+    def load_usage(self):
+        with self._lock:
+            doc = self._doc
+        if not doc:
+            doc = self._read_doc()
+        return {k: doc[k] for k in USAGE_KEYS if k in doc}
+
+    def pref_counts(self):
+        counts = {"opt_out": 0, "opt_in": 0}
+        with self._lock:
+            for action in self._prefs.values():
+                counts[action] = counts.get(action, 0) + 1
+        return counts
+
+    def iter_prefs(self):
+        with self._lock:
+            items = list(self._prefs.items())
+        return iter(items)
+
+    def merge_prefs(self, pairs):
+        # Fold everything into one copy of the map and write the file once
+        self.flush()
+        with self._lock:
+            merged = dict(self._prefs)
+            applied = 0
+            for hashed_id, action in pairs:
+                merged[hashed_id] = action
+                applied += 1
+            if applied:
+                self._dump_prefs(merged)
+                self._prefs = merged
+        return applied
+
+    def compact(self):
+        # The in-memory map is already deduplicated; rewrite it sorted
+        self.flush()
+        with self._lock:
+            self._dump_prefs(self._prefs)
+        return self.pref_counts()
+
+    def _lookup_pref(self, hashed_id):
+        return self._prefs.get(hashed_id)
+
+    def _write(self, state, usage, prefs):
+        if state is not None or usage is not None:
+            doc = dict(self._doc)
+            if state is not None:
+                doc.update(state)
+            if usage is not None:
+                doc.update(usage)
+            self._write_state_file(doc)
+            self._doc = doc
+
+        if prefs:
+            merged = dict(self._prefs)
+            merged.update(prefs)
+            self._dump_prefs(merged)
+            self._prefs = merged
+
+    def _dump_prefs(self, prefs):
+        """Write the preferences file from a hashed id -> action map."""
+        self._atomic_dump(self.opt_file, {
+            "opt_out": sorted(uid for uid, action in prefs.items() if action == "opt_out"),
+            "opt_in": sorted(uid for uid, action in prefs.items() if action == "opt_in")
+        }, indent=2)
+
+    def _write_state_file(self, doc):
+        """
+        Save the state document with backup and atomic operations.
+
+        Args:
+            doc (dict): Complete state document.
+        """
+        backup_file = f"{self.state_file}.bak"
+
+        # Create a backup of the current state file
+        if os.path.exists(self.state_file):
+            try:
+                os.replace(self.state_file, backup_file)
+            except Exception as e:
+                logger.warning("Failed to create backup state file: %s", e)
+
+        try:
+            self._atomic_dump(self.state_file, doc)
+        except Exception:
+            # Attempt to restore from backup if save failed
+            if os.path.exists(backup_file) and not os.path.exists(self.state_file):
+                try:
+                    os.replace(backup_file, self.state_file)
+                    logger.info("Restored state file from backup after failed save")
+                except Exception:
+                    logger.error("Failed to restore state from backup")
+            raise
+
+    def _atomic_dump(self, path, data, indent=None):
+        """Write JSON to a temporary file first, then rename it into place."""
+        tmp_file = f"{path}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(data, f, indent=indent)
+        os.replace(tmp_file, path)
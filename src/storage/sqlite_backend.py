@@ -0,0 +1,200 @@
+import os
+import json
+import sqlite3
+import logging
+
+from .base import StorageBackend, TIMESTAMP_KEYS
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS request_timestamps (
+    endpoint TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_request_timestamps ON request_timestamps (endpoint, ts);
+
+CREATE TABLE IF NOT EXISTS user_prefs (
+    hashed_id TEXT PRIMARY KEY,
+    action TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_user_prefs_action ON user_prefs (action);
+
+CREATE TABLE IF NOT EXISTS usage (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+class SqliteStorage(StorageBackend):
+    """
+    Storage backed by an embedded SQLite database in WAL mode.
+
+    Limiter timestamps, preferences and usage counters live in indexed
+    tables, so preference checks are primary-key lookups instead of a scan of
+    the whole opt-out list, and each flush is a single short transaction.
+    """
+    def __init__(self, db_file="data/houndthecult.db"):
+        """
+        Initialize the SQLite storage.
+
+        Args:
+            db_file (str): Path to the database file.
+        """
+        super().__init__()
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+
+        # Autocommit mode: we issue BEGIN/COMMIT ourselves in _write
+        self._conn = sqlite3.connect(db_file, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+
+    def load_state(self):
+        with self._lock:
+            state = {key: json.loads(value) for key, value in
+                     self._conn.execute("SELECT key, value FROM state")}
+            for key, endpoint in TIMESTAMP_KEYS.items():
+                state[key] = [row[0] for row in self._conn.execute(
+                    "SELECT ts FROM request_timestamps WHERE endpoint = ? ORDER BY ts", (endpoint,)
+                )]
+        return state
+
+    def load_usage(self):
+        with self._lock:
+            return {key: json.loads(value) for key, value in
+                    self._conn.execute("SELECT key, value FROM usage")}
+
+    def pref_counts(self):
+        counts = {"opt_out": 0, "opt_in": 0}
+        with self._lock:
+            for action, count in self._conn.execute(
+                "SELECT action, COUNT(*) FROM user_prefs GROUP BY action"
+            ):
+                counts[action] = count
+        return counts
+
+    def iter_prefs(self, page_size=1000):
+        # Keyset pages, each read under the lock, so callers can stream
+        # without holding it while other threads write
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT hashed_id, action FROM user_prefs WHERE hashed_id > ? ORDER BY hashed_id LIMIT ?",
+                    (last, page_size)
+                ).fetchall()
+            if not rows:
+                break
+            yield from rows
+            last = rows[-1][0]
+
+    def merge_prefs(self, pairs, batch_size=10000):
+        # One transaction, fed in fixed-size batches so memory stays bounded
+        self.flush()
+        applied = 0
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                batch = []
+                for pair in pairs:
+                    batch.append(pair)
+                    if len(batch) >= batch_size:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO user_prefs (hashed_id, action) VALUES (?, ?)", batch
+                        )
+                        applied += len(batch)
+                        batch = []
+                if batch:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO user_prefs (hashed_id, action) VALUES (?, ?)", batch
+                    )
+                    applied += len(batch)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return applied
+
+    def compact(self):
+        # The primary key already rules out duplicates; reclaim free pages
+        self.flush()
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("VACUUM")
+            self._conn.execute("ANALYZE")
+        return self.pref_counts()
+
+    def _lookup_pref(self, hashed_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT action FROM user_prefs WHERE hashed_id = ?", (hashed_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _write(self, state, usage, prefs):
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if state is not None:
+                for key, value in state.items():
+                    if key in TIMESTAMP_KEYS:
+                        self._sync_timestamps(TIMESTAMP_KEYS[key], value)
+                    else:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                            (key, json.dumps(value))
+                        )
+            if usage is not None:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO usage (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value)) for key, value in usage.items()]
+                )
+            if prefs:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO user_prefs (hashed_id, action) VALUES (?, ?)",
+                    list(prefs.items())
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _sync_timestamps(self, endpoint, timestamps):
+        """
+        Bring the stored timestamps for one endpoint in line with the limiter.
+
+        Only expired rows are deleted and only rows newer than the latest
+        stored one are inserted, so a save touches a handful of rows rather
+        than rewriting the whole window.
+        """
+        conn = self._conn
+        if not timestamps:
+            conn.execute("DELETE FROM request_timestamps WHERE endpoint = ?", (endpoint,))
+            return
+
+        timestamps = sorted(float(ts) for ts in timestamps)
+        conn.execute(
+            "DELETE FROM request_timestamps WHERE endpoint = ? AND ts < ?",
+            (endpoint, timestamps[0])
+        )
+        latest = conn.execute(
+            "SELECT MAX(ts) FROM request_timestamps WHERE endpoint = ?", (endpoint,)
+        ).fetchone()[0]
+        conn.executemany(
+            "INSERT INTO request_timestamps (endpoint, ts) VALUES (?, ?)",
+            [(endpoint, ts) for ts in timestamps if latest is None or ts > latest]
+        )
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self._conn.close()
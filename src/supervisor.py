@@ -0,0 +1,190 @@
+import time
+import random
+import logging
+import sqlite3
+
+import requests
+import tweepy
+
+from src.state import BotState
+from src.api.client import initialize_twitter_client
+from src.api.watchlist import Watchlist
+from src.rate_limiting.backoff import handle_rate_limit_response
+
+logger = logging.getLogger(__name__)
+
+class FailureClass:
+    """
+    How to recover from one kind of failure.
+    """
+    __slots__ = ("name", "base", "max_delay", "rebuild", "rebuild_after", "fatal")
+
+    def __init__(self, name, base, max_delay, rebuild=(), rebuild_after=1, fatal=False):
+        """
+        Args:
+            name (str): Label for logs.
+            base (float): First restart delay in seconds; doubles per repeat.
+            max_delay (float): Cap on the restart delay.
+            rebuild (tuple): Components to rebuild ("state" or "client").
+            rebuild_after (int): Consecutive failures before rebuilding.
+            fatal (bool): Stop instead of restarting.
+        """
+        self.name = name
+        self.base = base
+        self.max_delay = max_delay
+        self.rebuild = rebuild
+        self.rebuild_after = rebuild_after
+        self.fatal = fatal
+
+SUSPENDED = FailureClass("suspended", 0, 0, fatal=True)
+RATE_LIMITED = FailureClass("rate_limited", 60, 3600)
+UNAUTHORIZED = FailureClass("unauthorized", 300, 3600, rebuild=("client",))
+FORBIDDEN = FailureClass("forbidden", 600, 7200)
+SERVER = FailureClass("server", 30, 1800)
+NETWORK = FailureClass("network", 5, 600, rebuild=("client",), rebuild_after=3)
+STORAGE = FailureClass("storage", 5, 300, rebuild=("state",))
+API = FailureClass("api", 30, 1800)
+UNEXPECTED = FailureClass("unexpected", 10, 1800)
+
+def classify(error):
+    """
+    Map an exception to its failure class.
+
+    Args:
+        error (Exception): What escaped the bot loop.
+
+    Returns:
+        FailureClass: How to recover.
+    """
+    if isinstance(error, tweepy.errors.Forbidden):
+        return SUSPENDED if "suspended" in str(error).lower() else FORBIDDEN
+    if isinstance(error, tweepy.errors.TooManyRequests):
+        return RATE_LIMITED
+    if isinstance(error, tweepy.errors.Unauthorized):
+        return UNAUTHORIZED
+    if isinstance(error, tweepy.errors.TwitterServerError):
+        return SERVER
+    if isinstance(error, tweepy.errors.HTTPException):
+        return API
+    if isinstance(error, (requests.exceptions.RequestException, ConnectionError, TimeoutError)):
+        return NETWORK
+    if isinstance(error, tweepy.errors.TweepyException):
+        # Transport failures tweepy wraps without an HTTP response
+        return NETWORK
+    if isinstance(error, (sqlite3.Error, OSError, UnicodeDecodeError)):
+        return STORAGE
+    return UNEXPECTED
+
+class Supervisor:
+    """
+    Runs the bot loop and restarts it in-process when it fails.
+
+    Long-lived components (bot state with its caches, limiter and
+    preference index, the API client, the watch list) are built once and
+    handed to every run. A failure only rebuilds the components its class
+    names, and each class backs off on its own schedule, so a network blip
+    costs seconds while repeated rate limiting still backs off for long.
+    """
+    def __init__(self, target, reset_after=3600, clock=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            target (callable): Bot loop, called as target(bot_state, client,
+                watchlist); expected to run until it raises.
+            reset_after (float): Seconds without a failure of a class after
+                which its backoff starts over.
+            clock (callable): Monotonic time source.
+            sleep (callable): Sleep function.
+        """
+        self.target = target
+        self.reset_after = reset_after
+        self.clock = clock
+        self.sleep = sleep
+        self.factories = {
+            "state": BotState,
+            "client": initialize_twitter_client,
+            "watchlist": Watchlist.from_config
+        }
+        self.components = {}
+        self._failures = {}     # class name -> (consecutive count, time of last failure)
+        self.restarts = 0
+
+    def get(self, name):
+        """Get a component, building it on first use."""
+        if name not in self.components:
+            logger.info("Building %s", name)
+            self.components[name] = self.factories[name]()
+        return self.components[name]
+
+    def rebuild(self, name):
+        """Drop a component so it is built again on next use."""
+        component = self.components.pop(name, None)
+        close = getattr(component, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.warning("Failed closing %s: %s", name, e)
+
+    def _record_failure(self, failure):
+        """Count a failure of a class and get its consecutive count."""
+        now = self.clock()
+        count, last = self._failures.get(failure.name, (0, None))
+        if last is not None and now - last > self.reset_after:
+            count = 0
+        count += 1
+        self._failures[failure.name] = (count, now)
+        return count
+
+    def backoff(self, failure, count):
+        """Get the restart delay for the count-th consecutive failure of a class."""
+        delay = min(failure.max_delay, failure.base * 2 ** (count - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    def handle_failure(self, error):
+        """
+        Recover from a failed run.
+
+        Args:
+            error (Exception): What escaped the bot loop.
+
+        Returns:
+            bool: False if the bot must stop.
+        """
+        failure = classify(error)
+        if failure.fatal:
+            logger.critical("💀 Stopping after %s failure: %s", failure.name, error)
+            return False
+
+        count = self._record_failure(failure)
+        if count >= failure.rebuild_after:
+            for name in failure.rebuild:
+                logger.info("Rebuilding %s after %s failure", name, failure.name)
+                self.rebuild(name)
+
+        if failure is RATE_LIMITED and "state" in self.components:
+            # Mark search unavailable until the reset instead of guessing
+            response = getattr(error, "response", None)
+            handle_rate_limit_response(429, getattr(response, "headers", None), self.components["state"], "search")
+
+        delay = self.backoff(failure, count)
+        logger.error("💥 %s failure #%d: %s. Restarting in %.0fs", failure.name, count, error, delay)
+        self.sleep(delay)
+        return True
+
+    def run(self):
+        """
+        Run the bot until a fatal failure or KeyboardInterrupt.
+        """
+        try:
+            while True:
+                try:
+                    self.target(self.get("state"), self.get("client"), self.get("watchlist"))
+                    logger.info("Bot loop returned. Restarting")
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    if not self.handle_failure(e):
+                        return
+                self.restarts += 1
+        finally:
+            self.rebuild("state")  # Flush and close storage
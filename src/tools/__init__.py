@@ -0,0 +1,4 @@
+# This file makes the tools directory a Python package
+#
+# Maintenance command-line tools, run as modules, e.g.:
+#   python -m src.tools.prefs --help
@@ -0,0 +1,306 @@
+import sys
+import json
+import math
+import heapq
+import random
+import logging
+import argparse
+import itertools
+from collections import deque, namedtuple
+from datetime import datetime
+
+from src.rate_limiting.limiter import (
+    RateLimiter, DEFAULT_BACKOFF_TIERS, TWEET_LOOKUP_LIMIT, POST_TWEET_LIMIT, WINDOW_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+LIMITS = {"lookup": TWEET_LOOKUP_LIMIT, "post": POST_TWEET_LIMIT}
+POST_DELAY = (5, 45)        # Human delay before posting, as in process_mention
+RETRY_JITTER = (5, 15)      # Added to Retry-After, as in handle_rate_limit_response
+ARRIVE = "arrive"
+
+Result = namedtuple("Result", ("mentions", "throughput", "p50", "p95", "p99", "max_latency", "calls", "rejected"))
+
+class SimClock:
+    """Simulated epoch clock for the limiter."""
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class SimServer:
+    """
+    Twitter's side of the rate limit.
+
+    Windows are fixed 15-minute blocks starting at the first call, not the
+    limiter's rolling window, and other clients of the same app spend the
+    quota at `background` calls per minute without the limiter seeing them.
+    """
+    def __init__(self, limits, background=0.0):
+        self.limits = limits
+        self.background = background
+        self.windows = {}   # endpoint -> [window start, calls by us]
+
+    def call(self, endpoint, now):
+        """
+        Attempt a call.
+
+        Returns:
+            float or None: None if the call succeeded, else the window reset time.
+        """
+        window = self.windows.get(endpoint)
+        if window is None or now >= window[0] + WINDOW_SIZE:
+            window = self.windows[endpoint] = [now, 0]
+        spent = window[1] + int(self.background * (now - window[0]) / 60)
+        if spent >= self.limits[endpoint]:
+            return window[0] + WINDOW_SIZE
+        window[1] += 1
+        return None
+
+def synthetic_trace(hours, rate, bursts=0.0, burst_size=0, seed=0):
+    """
+    Generate Poisson mention arrivals with occasional bursts.
+
+    Args:
+        hours (float): Trace length.
+        rate (float): Mean mentions per minute outside bursts.
+        bursts (float): Mean bursts per hour.
+        burst_size (int): Mentions per burst, spread over a minute.
+        seed (int): Random seed.
+
+    Returns:
+        list: Sorted arrival times in seconds.
+    """
+    rng = random.Random(seed)
+    end = hours * 3600
+    arrivals = []
+    if rate > 0:
+        t = rng.expovariate(rate / 60)
+        while t < end:
+            arrivals.append(t)
+            t += rng.expovariate(rate / 60)
+    if bursts > 0 and burst_size > 0:
+        t = rng.expovariate(bursts / 3600)
+        while t < end:
+            arrivals.extend(t + rng.uniform(0, 60) for _ in range(burst_size))
+            t += rng.expovariate(bursts / 3600)
+    return sorted(arrivals)
+
+def file_trace(path):
+    """
+    Read arrival times, one epoch timestamp or ISO datetime per line.
+
+    Returns:
+        list: Sorted arrival times in seconds.
+    """
+    arrivals = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                arrivals.append(float(line))
+            except ValueError:
+                arrivals.append(datetime.fromisoformat(line).timestamp())
+    return sorted(arrivals)
+
+def history_trace(hours, seed=0):
+    """
+    Rebuild arrivals from the "mentions" usage-history series.
+
+    Each minute's count is spread uniformly over that minute.
+
+    Returns:
+        list: Sorted arrival times in seconds.
+    """
+    from src.state.history import UsageHistory
+
+    rng = random.Random(seed)
+    history = UsageHistory.from_config()
+    try:
+        end = history.clock()
+        counts = history.counts("mentions", end - hours * 3600, end)
+    finally:
+        history.close()
+    return sorted(minute + rng.uniform(0, 60) for minute, count in counts for _ in range(count))
+
+def _percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+def simulate(arrivals, tiers, background=0.0, workers=1, seed=0):
+    """
+    Replay arrivals through a RateLimiter on a simulated clock.
+
+    Each mention is handled as the bot does: a lookup then a post, each
+    preceded by the limiter's gradual backoff, waiting out a full window,
+    and backing off past the reset on a 429. Up to `workers` mentions are
+    in flight at once, sharing one limiter as cluster workers share a budget.
+
+    Args:
+        arrivals (list): Sorted arrival times in seconds.
+        tiers (list): Backoff tiers for the limiter.
+        background (float): Calls per minute by other clients per endpoint.
+        workers (int): Mentions handled concurrently.
+        seed (int): Random seed for delays.
+
+    Returns:
+        Result: Throughput (quotes/hour), latency percentiles in seconds,
+        and calls attempted and rejected with a 429.
+    """
+    rng = random.Random(seed)
+    clock = SimClock(arrivals[0] if arrivals else 0.0)
+    limiter = RateLimiter(tiers, clock=clock, rng=rng)
+    server = SimServer(LIMITS, background)
+    events = [(arrived, i, ARRIVE, arrived) for i, arrived in enumerate(arrivals)]
+    heapq.heapify(events)
+    sequence = itertools.count(len(events))
+    waiting = deque()
+    idle = workers
+    latencies = []
+    calls = rejected = 0
+
+    def prepare(arrived, endpoint):
+        delay = limiter.get_gradual_backoff_delay(endpoint)
+        if endpoint == "post":
+            delay += rng.uniform(*POST_DELAY)
+        heapq.heappush(events, (clock() + delay, next(sequence), endpoint, arrived))
+
+    while events:
+        clock.now, _, kind, arrived = heapq.heappop(events)
+        if kind == ARRIVE:
+            waiting.append(arrived)
+        else:
+            window = limiter.requests_for(kind)
+            if len(window) >= LIMITS[kind]:
+                heapq.heappush(events, (window[0] + WINDOW_SIZE, next(sequence), kind, arrived))
+                continue
+            calls += 1
+            reset_at = server.call(kind, clock())
+            if reset_at is not None:
+                rejected += 1
+                heapq.heappush(events, (reset_at + rng.randint(*RETRY_JITTER), next(sequence), kind, arrived))
+                continue
+            limiter.record(kind)
+            if kind == "lookup":
+                prepare(arrived, "post")
+                continue
+            latencies.append(clock() - arrived)
+            idle += 1
+        while idle and waiting:
+            idle -= 1
+            prepare(waiting.popleft(), "lookup")
+
+    latencies.sort()
+    duration = max(clock() - arrivals[0], 1.0) if arrivals else 1.0
+    return Result(
+        len(latencies), len(latencies) * 3600 / duration,
+        _percentile(latencies, 0.50), _percentile(latencies, 0.95), _percentile(latencies, 0.99),
+        latencies[-1] if latencies else 0.0, calls, rejected
+    )
+
+def make_tiers(thresholds, scale):
+    """Build tiers from three thresholds, scaling the default delay ranges."""
+    return [
+        {"threshold": threshold, "delay": [round(d * scale, 2) for d in default["delay"]]}
+        for threshold, default in zip(thresholds, DEFAULT_BACKOFF_TIERS)
+    ]
+
+def sweep(arrivals, lows, mediums, highs, scales, background=0.0, workers=1, seeds=1):
+    """
+    Simulate every combination of thresholds and delay scales.
+
+    Yields:
+        tuple: (tiers, Result) with metrics summed over seeds for counts and
+        averaged for latencies and throughput.
+    """
+    for low, medium, high, scale in itertools.product(lows, mediums, highs, scales):
+        if not low < medium < high:
+            continue
+        tiers = make_tiers((low, medium, high), scale)
+        runs = [simulate(arrivals, tiers, background, workers, seed) for seed in range(seeds)]
+        yield tiers, Result(
+            runs[0].mentions,
+            sum(r.throughput for r in runs) / seeds,
+            sum(r.p50 for r in runs) / seeds,
+            sum(r.p95 for r in runs) / seeds,
+            sum(r.p99 for r in runs) / seeds,
+            max(r.max_latency for r in runs),
+            sum(r.calls for r in runs),
+            sum(r.rejected for r in runs)
+        )
+
+def rejection_rate(result):
+    """Share of calls answered with a 429."""
+    return result.rejected / result.calls if result.calls else 0.0
+
+def _floats(value):
+    return [float(v) for v in value.split(",") if v.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.backoff_sim",
+        description="Replay mention arrivals through the rate limiter and sweep gradual backoff tiers."
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--trace", help="File of arrival times, one epoch or ISO timestamp per line")
+    source.add_argument("--history", type=float, metavar="HOURS",
+                        help="Use the last HOURS of the recorded mentions history")
+    parser.add_argument("--hours", type=float, default=6, help="Synthetic trace length (default: 6)")
+    parser.add_argument("--rate", type=float, default=2, help="Synthetic mentions per minute (default: 2)")
+    parser.add_argument("--bursts", type=float, default=1, help="Synthetic bursts per hour (default: 1)")
+    parser.add_argument("--burst-size", type=int, default=60, help="Mentions per burst (default: 60)")
+    parser.add_argument("--background", type=float, default=4,
+                        help="Calls per minute per endpoint by other clients, unseen by the limiter (default: 4)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Mentions handled concurrently, as with --workers on the bot (default: 4)")
+    parser.add_argument("--low", type=_floats, default=[0.4, 0.5, 0.6], help="LOW thresholds to try")
+    parser.add_argument("--medium", type=_floats, default=[0.6, 0.7, 0.8], help="MEDIUM thresholds to try")
+    parser.add_argument("--high", type=_floats, default=[0.85, 0.9, 0.95], help="HIGH thresholds to try")
+    parser.add_argument("--scale", type=_floats, default=[0.5, 1, 2], help="Multipliers for the default delays")
+    parser.add_argument("--seeds", type=int, default=2, help="Runs per setting (default: 2)")
+    parser.add_argument("--max-429", type=float, default=0.01,
+                        help="Highest acceptable 429 probability when picking tiers (default: 0.01)")
+    parser.add_argument("--top", type=int, default=15, help="Settings to print (default: 15)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s", stream=sys.stderr)
+
+    if args.trace:
+        arrivals = file_trace(args.trace)
+    elif args.history:
+        arrivals = history_trace(args.history)
+    else:
+        arrivals = synthetic_trace(args.hours, args.rate, args.bursts, args.burst_size)
+    if not arrivals:
+        print("No arrivals in trace", file=sys.stderr)
+        return 1
+
+    results = list(sweep(arrivals, args.low, args.medium, args.high, args.scale, args.background,
+                         args.workers, args.seeds))
+    if not results:
+        print("No threshold combination to try: each needs LOW < MEDIUM < HIGH", file=sys.stderr)
+        return 1
+    results.sort(key=lambda item: (rejection_rate(item[1]) > args.max_429, item[1].p95, -item[1].throughput))
+
+    print(f"{len(arrivals)} mentions, {args.workers} workers, {len(results)} settings, "
+          f"{args.background:g} background calls/min")
+    print(f"{'thresholds':>17} {'scale':>5} {'quotes/h':>9} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'P(429)':>7}")
+    for tiers, result in results[:args.top]:
+        thresholds = "/".join(f"{tier['threshold']:g}" for tier in tiers)
+        scale = tiers[0]["delay"][1] / DEFAULT_BACKOFF_TIERS[0]["delay"][1]
+        print(f"{thresholds:>17} {scale:>5g} {result.throughput:9.1f} {result.p50:8.1f} "
+              f"{result.p95:8.1f} {result.p99:8.1f} {rejection_rate(result):7.2%}")
+
+    best_tiers, best = results[0]
+    if rejection_rate(best) > args.max_429:
+        print(f"No setting kept P(429) under {args.max_429:.2%}; showing the lowest-latency one", file=sys.stderr)
+    print("\nBest setting for config.json:")
+    print(json.dumps({"backoff": {"tiers": best_tiers}}, indent=4))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,671 @@
+import os
+import re
+import sys
+import json
+import time
+import errno
+import random
+import logging
+import builtins
+import argparse
+import tempfile
+import contextlib
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+
+import tweepy
+
+from src.bot import hound_the_cult
+from src.state import BotState
+from src.api.watchlist import Watchlist
+from src.api.deadline import DeadlineExceeded
+from src.api.cassette import ReplayHTTPResponse, ERROR_CLASSES
+from src.rate_limiting.limiter import SEARCH_RECENT_LIMIT, TWEET_LOOKUP_LIMIT, POST_TWEET_LIMIT
+from src.supervisor import Supervisor
+from src.tools.backoff_sim import SimServer
+
+logger = logging.getLogger(__name__)
+
+HOURS = 72                  # Simulated run length
+RATE = 0.5                  # Mentions per hour
+QUIET = 12                  # Final hours without new mentions, so every one can be handled
+AUTHORS = 40                # Distinct mention authors
+OPT_OUTS = 3                # Authors who send !optout early on
+INCLUDED = 0.7              # Share of mentions whose target comes in the search includes
+RESTART_DELAY = 10          # Seconds a process manager takes to restart a crashed bot
+BOT_ID = 1
+LIMITS = {"search": SEARCH_RECENT_LIMIT, "lookup": TWEET_LOOKUP_LIMIT, "post": POST_TWEET_LIMIT}
+API_POINTS = tuple(LIMITS)
+DISK_POINTS = ("write", "rename")
+
+# Fault kind -> points it can be injected at
+KINDS = {
+    "network": API_POINTS,          # Connection dropped before a response
+    "tweepy": API_POINTS,           # Other client error without a response
+    "timeout": API_POINTS,          # Deadline hit; the request never arrived
+    "timeout_sent": ("post",),      # Deadline hit after the quote went out
+    "suspended": API_POINTS,        # 403 saying the account is suspended
+    "enospc": DISK_POINTS,          # Disk full
+    "rename": ("rename",),          # os.replace fails
+    "restart": API_POINTS,          # Process restarts before the call
+    "truncate_state": API_POINTS,   # Process dies and bot_state.json is cut in half
+    "truncate_prefs": API_POINTS,   # Process dies and user_prefs.json is cut in half
+    "clock_jump": API_POINTS        # Wall clock jumps by the given seconds
+}
+CRASHES = ("restart", "truncate_state", "truncate_prefs")
+
+FAULT_SPEC = re.compile(
+    r"^(?P<kind>[a-z_]+|\d{3})(=(?P<arg>[-+]?\d+(\.\d+)?))?@(?P<point>[a-z]+)"
+    r"(:(?P<at>\d+))?(x(?P<count>\d+))?(~(?P<duration>\d+(\.\d+)?))?$"
+)
+
+# Built-in scenarios, each run against the same traffic
+SCENARIOS = OrderedDict([
+    ("baseline", []),
+    ("search-429", ["429@search:3"]),
+    ("search-503", ["503@search:3x4"]),
+    ("search-401", ["401@search:3x2"]),
+    ("search-network", ["network@search:3x4"]),
+    ("search-timeout", ["timeout@search:3x2"]),
+    ("lookup-503", ["503@lookup:2x3"]),
+    ("post-429", ["429@post:2"]),
+    ("post-403", ["403@post:2x2"]),
+    ("post-tweepy", ["tweepy@post:2"]),
+    ("post-timeout", ["timeout@post:2"]),
+    ("post-timeout-sent", ["timeout_sent@post:2"]),
+    ("suspended", ["suspended@post:4"]),
+    ("disk-full", ["enospc@write:20~7200"]),
+    ("rename-fail", ["rename@rename:20x3"]),
+    ("restart", ["restart@search:6"]),
+    ("truncated-state", ["truncate_state@search:6"]),
+    ("truncated-prefs", ["truncate_prefs@search:6"]),
+    ("clock-forward", ["clock_jump=21600@search:5"]),
+    ("clock-back", ["clock_jump=-7200@search:5"])
+])
+
+Report = namedtuple("Report", (
+    "scenario", "recovery", "posts", "lost", "duplicates", "unwanted",
+    "calls", "failed", "wasted", "restarts", "stopped"
+))
+
+_real_time = time.time
+_real_monotonic = time.monotonic
+_real_sleep = time.sleep
+_real_now = datetime.now
+_real_open = builtins.open
+_real_replace = os.replace
+
+class SimulationEnd(BaseException):
+    """Raised from a sleep that would pass the end of the run."""
+
+class SimulatedCrash(BaseException):
+    """Raised to kill the bot process at a fault point."""
+    def __init__(self, fault):
+        super().__init__(fault.kind)
+        self.fault = fault
+
+class VirtualTime:
+    """
+    Simulated clock for a whole bot run.
+
+    Sleeps return at once and advance the clock, so hours of cycles and
+    backoff take seconds. Wall-clock jumps move time.time and datetime.now
+    but not time.monotonic, as on a real host.
+    """
+    def __init__(self, horizon):
+        """
+        Args:
+            horizon (float): Simulated seconds before the run ends.
+        """
+        self.horizon = horizon
+        self.started = _real_time()
+        self.elapsed = 0.0
+        self.skew = 0.0
+
+    def time(self):
+        return self.started + self.elapsed + self.skew
+
+    def true_time(self):
+        """Wall-clock time without jumps, as Twitter sees it."""
+        return self.started + self.elapsed
+
+    def monotonic(self):
+        return self.elapsed
+
+    def now(self, tz=None):
+        return datetime.fromtimestamp(self.time(), tz)
+
+    def sleep(self, seconds):
+        self.elapsed += max(0.0, seconds)
+        if self.elapsed >= self.horizon:
+            raise SimulationEnd()
+
+    def jump(self, seconds):
+        self.skew += seconds
+
+    def attach(self, obj, depth=2, seen=None):
+        """
+        Point the clocks of a component and its parts at this clock.
+
+        Components take their clock as a default argument bound at import,
+        which patching the time module can't reach.
+
+        Returns:
+            The component.
+        """
+        seen = set() if seen is None else seen
+        if id(obj) in seen:
+            return obj
+        seen.add(id(obj))
+        clock = getattr(obj, "clock", None)
+        if clock is not None:
+            if clock == _real_time:
+                obj.clock = self.time
+            elif clock == _real_monotonic:
+                obj.clock = self.monotonic
+            elif clock == _real_now:
+                obj.clock = self.now
+        if depth:
+            for value in list(getattr(obj, "__dict__", {}).values()):
+                for item in (list(value.values()) if isinstance(value, dict) else [value]):
+                    if type(item).__module__.startswith("src."):
+                        self.attach(item, depth - 1, seen)
+        return obj
+
+    @contextlib.contextmanager
+    def installed(self):
+        """Route the time module and every src module's datetime through this clock."""
+        clock = self
+
+        class SimDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return cls.fromtimestamp(clock.time(), tz)
+
+        patched = [
+            module for name, module in list(sys.modules.items())
+            if name.startswith("src.") and getattr(module, "datetime", None) is datetime
+        ]
+        for module in patched:
+            module.datetime = SimDatetime
+        time.time, time.monotonic, time.sleep = self.time, self.monotonic, self.sleep
+        try:
+            yield self
+        finally:
+            time.time, time.monotonic, time.sleep = _real_time, _real_monotonic, _real_sleep
+            for module in patched:
+                module.datetime = datetime
+
+class Fault:
+    """
+    One fault injected at a point: an API call, a data file write or a rename.
+
+    It fires on the `at`-th occurrence of its point and the `count - 1`
+    after it, or, with a duration, on every occurrence for that many
+    simulated seconds.
+    """
+    def __init__(self, kind, point, at=1, count=1, duration=None, arg=None):
+        """
+        Args:
+            kind (str): A KINDS key, or an HTTP status such as "503".
+            point (str): "search", "lookup", "post", "write" or "rename".
+            at (int): Occurrence of the point the fault starts on.
+            count (int): Occurrences it fires on.
+            duration (float, optional): Seconds it fires for instead.
+            arg (float, optional): Seconds for clock_jump.
+        """
+        if kind.isdigit():
+            if point not in API_POINTS:
+                raise ValueError(f"HTTP errors can only be injected at {', '.join(API_POINTS)}")
+        elif kind not in KINDS:
+            raise ValueError(f"Unknown fault kind: {kind}")
+        elif point not in KINDS[kind]:
+            raise ValueError(f"{kind} can only be injected at {', '.join(KINDS[kind])}")
+        if kind == "clock_jump" and not arg:
+            raise ValueError("clock_jump needs seconds, e.g. clock_jump=3600@search:5")
+        self.kind = kind
+        self.point = point
+        self.at = at
+        self.count = count
+        self.duration = duration
+        self.arg = arg
+        self.first_fired = None
+        self.last_fired = None
+        self.fired = 0
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        Parse KIND[=ARG]@POINT[:AT][xCOUNT][~SECONDS], e.g. 503@search:3x4,
+        enospc@write:20~7200 or clock_jump=-3600@search:5.
+        """
+        match = FAULT_SPEC.match(spec)
+        if not match:
+            raise ValueError(f"Bad fault spec: {spec}")
+        return cls(
+            match["kind"], match["point"],
+            at=int(match["at"] or 1),
+            count=int(match["count"] or 1),
+            duration=float(match["duration"]) if match["duration"] else None,
+            arg=float(match["arg"]) if match["arg"] else None
+        )
+
+    def fires(self, occurrence, now):
+        """Check whether the fault hits this occurrence of its point, recording it if so."""
+        if self.duration is not None:
+            if self.first_fired is None and occurrence < self.at:
+                return False
+            if self.first_fired is not None and now - self.first_fired >= self.duration:
+                return False
+        elif not self.at <= occurrence < self.at + self.count:
+            return False
+        if self.first_fired is None:
+            self.first_fired = now
+        self.last_fired = now
+        self.fired += 1
+        return True
+
+    def error(self, reset_at):
+        """Build the exception an API fault raises."""
+        if self.kind == "network":
+            return ConnectionError("Connection reset by peer (injected)")
+        if self.kind == "tweepy":
+            return tweepy.errors.TweepyException("Injected client failure")
+        if self.kind in ("timeout", "timeout_sent"):
+            return DeadlineExceeded(f"{self.point} deadline exceeded (injected)")
+        status = 403 if self.kind == "suspended" else int(self.kind)
+        detail = "Your account is suspended" if self.kind == "suspended" else f"Injected {status}"
+        return _http_error(status, detail, reset_at)
+
+    def __str__(self):
+        return f"{self.kind}@{self.point}"
+
+def _http_error(status, detail, reset_at):
+    body = {"title": detail, "detail": detail}
+    headers = {"x-rate-limit-remaining": "0", "x-rate-limit-reset": str(int(reset_at))} if status == 429 else {}
+    class_name = ERROR_CLASSES.get(status, "TwitterServerError" if status >= 500 else "HTTPException")
+    return getattr(tweepy.errors, class_name)(ReplayHTTPResponse(status, headers, body), response_json=body)
+
+def _api_time(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+def make_traffic(hours=HOURS, rate=RATE, quiet=QUIET, authors=AUTHORS, opt_outs=OPT_OUTS, seed=0):
+    """
+    Generate mentions of the bot over a run.
+
+    Every quote request replies to its own tweet, so each should be quoted
+    exactly once unless its author opted out first.
+
+    Returns:
+        list: (offset seconds, mention payload, target payload or None if
+        the target isn't in the search includes), oldest first.
+    """
+    rng = random.Random(seed)
+    pool = [100 + i for i in range(authors)]
+    traffic = []
+    for author in pool[:opt_outs]:
+        offset = rng.uniform(0, (hours - quiet) * 900)
+        traffic.append((offset, {"text": "@HoundTheCult !optout", "author_id": str(author)}, None))
+    offset = 0.0
+    while True:
+        offset += rng.expovariate(rate / 3600)
+        if offset >= (hours - quiet) * 3600:
+            break
+        target = {"id": str(50000 + len(traffic)), "text": "something to quote", "author_id": "7"}
+        mention = {
+            "text": "@HoundTheCult look at this", "author_id": str(rng.choice(pool)),
+            "referenced_tweets": [{"type": "replied_to", "id": target["id"]}],
+            "_target": target   # Stripped before the bot sees it
+        }
+        traffic.append((offset, mention, target if rng.random() < INCLUDED else None))
+    traffic.sort(key=lambda item: item[0])
+    for index, (_, mention, _) in enumerate(traffic):
+        mention["id"] = str(10000 + index)
+    return traffic
+
+def expected_targets(traffic):
+    """Targets that should be quoted: requested by an author who hadn't opted out before."""
+    opted_out = set()
+    expected = set()
+    for _, mention, _ in traffic:
+        if "!optout" in mention["text"]:
+            opted_out.add(mention["author_id"])
+        elif mention["author_id"] not in opted_out:
+            expected.add(int(mention["_target"]["id"]))
+    return expected
+
+class FakeTwitter:
+    """
+    The API client the bot is handed: serves the traffic, enforces 15-minute
+    rate limits, injects API faults and logs every call.
+    """
+    def __init__(self, traffic, clock, faults):
+        """
+        Args:
+            traffic (list): Output of make_traffic.
+            clock (VirtualTime): Simulated clock.
+            faults (list): Faults for this run.
+        """
+        self.clock = clock
+        self.faults = faults
+        self.server = SimServer(LIMITS)
+        self.mentions = [(clock.started + offset, mention, target) for offset, mention, target in traffic]
+        self.targets = {int(m["_target"]["id"]): m["_target"] for _, m, _ in traffic if "_target" in m}
+        self.occurrences = dict.fromkeys(API_POINTS, 0)
+        self.calls = []         # (monotonic time, endpoint, succeeded)
+        self.posts = []         # quoted tweet ids, in order
+        self.lookups = []       # looked-up tweet ids, in order
+
+    def _call(self, endpoint):
+        """Count a call and raise whatever fault or rate limit hits it."""
+        self.occurrences[endpoint] += 1
+        now = self.clock.monotonic()
+        for fault in self.faults:
+            if fault.point != endpoint or not fault.fires(self.occurrences[endpoint], now):
+                continue
+            if fault.kind in CRASHES:
+                raise SimulatedCrash(fault)
+            if fault.kind == "clock_jump":
+                self.clock.jump(fault.arg)
+                continue
+            self.calls.append((now, endpoint, False))
+            return fault
+        reset_at = self.server.call(endpoint, now)
+        if reset_at is not None:
+            self.calls.append((now, endpoint, False))
+            raise _http_error(429, "Too Many Requests", self.clock.time() + reset_at - now)
+        self.calls.append((now, endpoint, True))
+        return None
+
+    def _raise(self, fault):
+        raise fault.error(self.clock.time() + 15 * 60)
+
+    def search_recent_tweets(self, query, max_results=10, start_time=None, user_auth=False, **kwargs):
+        fault = self._call("search")
+        if fault:
+            self._raise(fault)
+        now = self.clock.true_time()
+        since = now - 7 * 86400
+        if start_time:
+            # The bot sends local time marked as UTC; read it back the same way
+            since = datetime.strptime(start_time, "%Y-%m-%dT%H:%M:%SZ").timestamp()
+            if since > now:
+                self.calls[-1] = self.calls[-1][:2] + (False,)
+                raise _http_error(400, "Invalid start_time: must be before now", now)
+        found = [(created, m, t) for created, m, t in self.mentions if since <= created <= now]
+        found = found[::-1][:max_results]
+        if not found:
+            return tweepy.Response(None, {}, [], {"result_count": 0})
+        data = [
+            {**{k: v for k, v in m.items() if k != "_target"}, "created_at": _api_time(created)}
+            for created, m, _ in found
+        ]
+        included = [dict(t) for _, _, t in found if t is not None]
+        return tweepy.Response(data, {"tweets": included}, [], {"result_count": len(data)})
+
+    def get_tweet(self, id, **kwargs):
+        fault = self._call("lookup")
+        if fault:
+            self._raise(fault)
+        self.lookups.append(int(id))
+        target = self.targets.get(int(id))
+        if target is None:
+            raise _http_error(404, "Not Found", self.clock.time())
+        return tweepy.Response(dict(target), {}, [], {})
+
+    def create_tweet(self, text=None, quote_tweet_id=None, **kwargs):
+        fault = self._call("post")
+        if fault and fault.kind != "timeout_sent":
+            self._raise(fault)
+        self.posts.append(int(quote_tweet_id))
+        if fault:
+            self._raise(fault)
+        return tweepy.Response({"id": str(90000 + len(self.posts)), "text": text}, {}, [], {})
+
+    def get_me(self, **kwargs):
+        return tweepy.Response({"id": str(BOT_ID), "username": "HoundTheCult"}, {}, [], {})
+
+class FaultRun:
+    """
+    One run of the real bot loop under the Supervisor, in a scratch data
+    directory, on a simulated clock, with faults injected.
+    """
+    def __init__(self, name, faults, traffic, hours=HOURS, seed=0):
+        """
+        Args:
+            name (str): Scenario name for the report.
+            faults (list): Fault objects.
+            traffic (list): Output of make_traffic.
+            hours (float): Simulated run length.
+            seed (int): Random seed for the bot's own jitter.
+        """
+        self.name = name
+        self.faults = faults
+        self.traffic = traffic
+        self.seed = seed
+        self.clock = VirtualTime(hours * 3600)
+        self.twitter = FakeTwitter(traffic, self.clock, faults)
+        self.disk = {"write": 0, "rename": 0}
+        self.disk_log = []      # (monotonic time, point, succeeded)
+        self.restarts = 0
+        self.stopped = False
+        self._root = None
+
+    def _disk_fault(self, point, path):
+        """Raise the disk fault, if any, hitting this operation on a data file."""
+        if not os.path.abspath(path).startswith(self._root):
+            return
+        self.disk[point] += 1
+        now = self.clock.monotonic()
+        for fault in self.faults:
+            if fault.point == point and fault.fires(self.disk[point], now):
+                self.disk_log.append((now, point, False))
+                if fault.kind == "enospc":
+                    raise OSError(errno.ENOSPC, "No space left on device (injected)", path)
+                raise OSError(errno.EBUSY, "Rename failed (injected)", path)
+        self.disk_log.append((now, point, True))
+
+    def _open(self, file, mode="r", *args, **kwargs):
+        if isinstance(file, (str, bytes, os.PathLike)) and any(flag in mode for flag in "wax+"):
+            self._disk_fault("write", os.fsdecode(file))
+        return _real_open(file, mode, *args, **kwargs)
+
+    def _replace(self, src, dst, *args, **kwargs):
+        self._disk_fault("rename", os.fsdecode(dst))
+        # A full disk fails the write, not the rename of what was written
+        return _real_replace(src, dst, *args, **kwargs)
+
+    @contextlib.contextmanager
+    def _sandbox(self):
+        """Run in a scratch directory with its own config and data files."""
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory(prefix="hound-faults-") as root:
+            os.makedirs(os.path.join(root, "data"))
+            with _real_open(os.path.join(root, "config.json"), "w") as f:
+                json.dump({
+                    "twitter_api": {
+                        "API_KEY": "sim", "API_SECRET": "sim", "ACCESS_TOKEN": f"{BOT_ID}-sim",
+                        "ACCESS_SECRET": "sim", "BEARER_TOKEN": "sim"
+                    },
+                    # Random skips would hide lost quotes
+                    "skip_chance": 0
+                }, f)
+            self._root = os.path.join(root, "data")
+            os.chdir(root)
+            builtins.open, os.replace = self._open, self._replace
+            try:
+                yield root
+            finally:
+                builtins.open, os.replace = _real_open, _real_replace
+                os.chdir(cwd)
+
+    def _truncate(self, fault):
+        """Cut the file a crash fault corrupts to half its size."""
+        name = {"truncate_state": "bot_state.json", "truncate_prefs": "user_prefs.json"}.get(fault.kind)
+        if name is None:
+            return
+        path = os.path.join(self._root, name)
+        with _real_open(path, "rb") as f:
+            content = f.read()
+        with _real_open(path, "wb") as f:
+            f.write(content[:len(content) // 2])
+
+    def _supervisor(self):
+        supervisor = Supervisor(hound_the_cult, clock=self.clock.monotonic, sleep=self.clock.sleep)
+        supervisor.factories.update(
+            state=lambda: self.clock.attach(BotState()),
+            client=lambda: self.twitter,
+            watchlist=Watchlist.from_config
+        )
+        return supervisor
+
+    def run(self):
+        """
+        Run the bot until the simulated time is up.
+
+        Returns:
+            Report: What the faults cost.
+        """
+        random.seed(self.seed)
+        with self._sandbox(), self.clock.installed():
+            while True:
+                supervisor = self._supervisor()
+                try:
+                    supervisor.run()
+                    self.stopped = True     # Stopped on a fatal failure
+                    break
+                except SimulationEnd:
+                    break
+                except SimulatedCrash as crash:
+                    logger.warning("Crashing the bot at %s", crash.fault)
+                    self._truncate(crash.fault)
+                    try:
+                        self.clock.sleep(RESTART_DELAY)
+                    except SimulationEnd:
+                        break
+                finally:
+                    self.restarts += supervisor.restarts
+                self.restarts += 1
+        return self.report()
+
+    def _recovery(self, fault):
+        """
+        Seconds from a fault first firing until what it broke works again.
+
+        That is the first success, after the failures that followed the
+        fault, of the call or file operation it hit; a clock jump is judged
+        by searches, and a crash by the call it cut off. None if it never
+        recovered, 0 if nothing failed.
+        """
+        log = self.disk_log if fault.point in DISK_POINTS else self.twitter.calls
+        point = "search" if fault.kind == "clock_jump" else fault.point
+        disrupted = fault.kind in CRASHES
+        for when, called, succeeded in log:
+            if called != point or when < fault.first_fired:
+                continue
+            if not succeeded:
+                disrupted = True
+            elif disrupted:
+                return when - fault.first_fired
+        return None if disrupted else 0.0
+
+    def report(self):
+        fired = [fault for fault in self.faults if fault.fired]
+        recoveries = [self._recovery(fault) for fault in fired]
+        posts = self.twitter.posts
+        quoted = set(posts)
+        expected = expected_targets(self.traffic)
+        failed = sum(1 for _, _, succeeded in self.twitter.calls if not succeeded)
+        duplicates = len(posts) - len(quoted)
+        repeated_lookups = len(self.twitter.lookups) - len(set(self.twitter.lookups))
+        return Report(
+            self.name,
+            None if None in recoveries else max(recoveries, default=0.0),
+            len(posts),
+            len(expected - quoted),
+            duplicates,
+            len(quoted - expected),
+            len(self.twitter.calls),
+            failed,
+            failed + duplicates + repeated_lookups,
+            self.restarts,
+            self.stopped
+        )
+
+def run_scenarios(scenarios, hours=HOURS, rate=RATE, seed=0):
+    """
+    Run scenarios against the same traffic.
+
+    Args:
+        scenarios (dict): Name -> list of fault specs.
+        hours (float): Simulated run length.
+        rate (float): Mentions per hour.
+        seed (int): Seed for the traffic and the bot's jitter.
+
+    Yields:
+        Report: One per scenario, in order.
+    """
+    traffic = make_traffic(hours, rate, seed=seed)
+    for name, specs in scenarios.items():
+        yield FaultRun(name, [Fault.parse(spec) for spec in specs], traffic, hours, seed).run()
+
+def _duration(seconds):
+    if seconds is None:
+        return "never"
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.faults",
+        description="Run the bot against a simulated API with injected faults and report what each costs."
+    )
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO",
+                        help=f"Built-in scenarios to run (default: all): {', '.join(SCENARIOS)}")
+    parser.add_argument("--fault", action="append", default=[], metavar="SPEC",
+                        help="Run a custom scenario with this fault, KIND[=ARG]@POINT[:AT][xCOUNT][~SECONDS], "
+                             "e.g. 503@search:3x4; repeat to combine faults")
+    parser.add_argument("--hours", type=float, default=HOURS, help=f"Simulated hours per run (default: {HOURS})")
+    parser.add_argument("--rate", type=float, default=RATE, help=f"Mentions per hour (default: {RATE:g})")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for traffic and jitter (default: 0)")
+    parser.add_argument("--json", action="store_true", help="Print reports as JSON lines")
+    parser.add_argument("--log-level", default="CRITICAL", help="Log level of the bot during runs (default: CRITICAL)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s: %(message)s", stream=sys.stderr)
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+    scenarios = OrderedDict([("baseline", [])])
+    if args.fault:
+        try:
+            [Fault.parse(spec) for spec in args.fault]
+        except ValueError as e:
+            parser.error(str(e))
+        scenarios["custom"] = args.fault
+    else:
+        scenarios.update((name, SCENARIOS[name]) for name in args.scenarios or SCENARIOS)
+
+    baseline = None
+    if not args.json:
+        print(f"{'scenario':<18} {'recovery':>8} {'posts':>5} {'lost':>4} {'dup':>4} {'unwanted':>8} "
+              f"{'calls':>5} {'failed':>6} {'wasted':>6} {'+calls':>6} {'restarts':>8}")
+    for report in run_scenarios(scenarios, args.hours, args.rate, args.seed):
+        if baseline is None:
+            baseline = report
+        extra = report.calls - baseline.calls
+        if args.json:
+            print(json.dumps({**report._asdict(), "extra_calls": extra}))
+            continue
+        stopped = "  (stopped)" if report.stopped else ""
+        print(f"{report.scenario:<18} {_duration(report.recovery):>8} {report.posts:>5} {report.lost:>4} "
+              f"{report.duplicates:>4} {report.unwanted:>8} {report.calls:>5} {report.failed:>6} "
+              f"{report.wasted:>6} {extra:>+6} {report.restarts:>8}{stopped}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
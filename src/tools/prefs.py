@@ -0,0 +1,191 @@
+import os
+import re
+import sys
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.utils.security import hash_user_id
+from src.storage import create_storage
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 10000      # IDs hashed per worker task
+ACTIONS = ("opt_out", "opt_in")
+HASHED_ID = re.compile(r"^[0-9a-f]{64}$")
+
+def read_ids(paths):
+    """
+    Stream IDs from files, one per line.
+
+    Blank lines and lines starting with "#" are skipped. A line may carry an
+    action after a tab, as written by export, which overrides the default.
+
+    Args:
+        paths (list): File paths; "-" reads stdin.
+
+    Yields:
+        tuple: (id, action or None)
+    """
+    for path in paths:
+        f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                user_id, _, action = line.partition("\t")
+                yield user_id.strip(), action.strip() or None
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _hash_chunk(chunk):
+    """Hash one chunk of raw IDs (runs in a worker process)."""
+    return [(hash_user_id(user_id), action) for user_id, action in chunk]
+
+def _check_chunk(chunk):
+    """Validate one chunk of pre-hashed IDs."""
+    valid = []
+    for hashed_id, action in chunk:
+        hashed_id = hashed_id.lower()
+        if HASHED_ID.match(hashed_id):
+            valid.append((hashed_id, action))
+        else:
+            logger.warning("Skipping malformed hashed ID: %s", hashed_id[:16])
+    return valid
+
+def hashed_pairs(entries, default_action, prehashed=False, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Turn a stream of (id, action) entries into (hashed_id, action) pairs.
+
+    Raw IDs are hashed in a process pool. Only a few chunks are in flight
+    at a time, so memory stays bounded however long the input is, and
+    output keeps input order so later entries still win.
+
+    Args:
+        entries (iterable): (id, action or None) tuples, e.g. from read_ids.
+        default_action (str): Action for entries without one.
+        prehashed (bool): IDs are already SHA-256 hex digests.
+        workers (int, optional): Hashing processes. Defaults to the CPU count.
+        chunk_size (int): IDs per hashing task.
+
+    Yields:
+        tuple: (hashed_id, action)
+    """
+    def resolve(chunk):
+        for hashed_id, action in chunk:
+            action = action or default_action
+            if action not in ACTIONS:
+                logger.warning("Skipping entry with unknown action %s", action)
+                continue
+            yield hashed_id, action
+
+    if prehashed:
+        for chunk in _chunks(entries, chunk_size):
+            yield from resolve(_check_chunk(chunk))
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in _chunks(entries, chunk_size):
+            in_flight.append(pool.submit(_hash_chunk, chunk))
+            if len(in_flight) >= workers * 2:
+                yield from resolve(in_flight.popleft().result())
+        while in_flight:
+            yield from resolve(in_flight.popleft().result())
+
+def import_prefs(storage, paths, action="opt_out", prehashed=False, workers=None):
+    """
+    Merge IDs from files into the preference store in one pass.
+
+    Args:
+        storage (StorageBackend): Preference store.
+        paths (list): Input files; "-" reads stdin.
+        action (str): Action for lines without one.
+        prehashed (bool): Inputs are already hashed.
+        workers (int, optional): Hashing processes.
+
+    Returns:
+        int: Number of entries applied, before deduplication.
+    """
+    pairs = hashed_pairs(read_ids(paths), action, prehashed=prehashed, workers=workers)
+    return storage.merge_prefs(pairs)
+
+def export_prefs(storage, out, action=None):
+    """
+    Stream the preference store as tab-separated "hashed_id<TAB>action" lines.
+
+    Args:
+        storage (StorageBackend): Preference store.
+        out (file): Writable text file.
+        action (str, optional): Only export this action.
+
+    Returns:
+        int: Number of lines written.
+    """
+    written = 0
+    for hashed_id, pref in storage.iter_prefs():
+        if action is None or pref == action:
+            out.write(f"{hashed_id}\t{pref}\n")
+            written += 1
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.prefs",
+        description="Bulk import, export and compact user opt-in/out preferences. "
+                    "Stop the bot first when using the JSON store."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Merge IDs into the store")
+    import_parser.add_argument("files", nargs="+", help="Files with one ID per line; - for stdin")
+    import_parser.add_argument("--action", choices=ACTIONS, default="opt_out",
+                               help="Action for lines without one (default: opt_out)")
+    import_parser.add_argument("--hashed", action="store_true", help="IDs are already hashed")
+    import_parser.add_argument("--workers", type=int, help="Hashing processes (default: CPU count)")
+
+    export_parser = subparsers.add_parser("export", help="Write the store as hashed_id<TAB>action lines")
+    export_parser.add_argument("--output", default="-", help="Output file (default: stdout)")
+    export_parser.add_argument("--action", choices=ACTIONS, help="Only export this action")
+
+    subparsers.add_parser("compact", help="Rewrite the store without duplicates")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s", stream=sys.stderr)
+
+    storage = create_storage()
+    try:
+        if args.command == "import":
+            applied = import_prefs(storage, args.files, args.action, args.hashed, args.workers)
+            counts = storage.pref_counts()
+            logger.info("Applied %d entries; store has %d opt-outs, %d opt-ins",
+                        applied, counts["opt_out"], counts["opt_in"])
+        elif args.command == "export":
+            if args.output == "-":
+                written = export_prefs(storage, sys.stdout, args.action)
+            else:
+                with open(args.output, "w", encoding="utf-8") as out:
+                    written = export_prefs(storage, out, args.action)
+            logger.info("Exported %d entries", written)
+        else:
+            counts = storage.compact()
+            logger.info("Compacted store: %d opt-outs, %d opt-ins", counts["opt_out"], counts["opt_in"])
+    finally:
+        storage.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import sys
+import json
+import time
+import queue
+import random
+import logging
+import argparse
+import itertools
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.api.stream import FilteredStream, STREAM_ROUTE, RULES_ROUTE, HEARTBEAT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+PORT = 8089
+RATE = 6.0                  # Matched tweets per minute
+HEARTBEAT = 20              # Seconds between keep-alives, as Twitter sends them
+TEXT = "@HoundTheCult look at this"
+
+class StandInStream:
+    """
+    Behaviour and state of the stand-in: its rules, the tweets it makes up,
+    and the failures it plays.
+
+    Every stream connection gets keep-alives every `heartbeat` seconds and
+    made-up matching tweets at `rate` per minute. The first `fail_first`
+    connections are refused with `fail_status`. Later connections are cut
+    after `drop_after` seconds, or go silent, keep-alives included, after
+    `stall_after` seconds, so a client's reconnects and stall detection
+    can be watched.
+    """
+    def __init__(self, rate=RATE, heartbeat=HEARTBEAT, drop_after=None, stall_after=None,
+                 fail_first=0, fail_status=503, text=TEXT, seed=None):
+        self.rate = rate
+        self.heartbeat = heartbeat
+        self.drop_after = drop_after
+        self.stall_after = stall_after
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.text = text
+        self.rng = random.Random(seed)
+        self.rules = {}
+        self.connections = 0
+        self.stopping = threading.Event()
+        self._ids = itertools.count(int(time.time() * 1000) << 22)
+        self._lock = threading.Lock()
+
+    def next_id(self):
+        with self._lock:
+            return str(next(self._ids))
+
+    def tweet(self):
+        """Make up a matched mention replying to a tweet that comes in the includes."""
+        target = {"id": self.next_id(), "text": "something to quote", "author_id": "7"}
+        data = {
+            "id": self.next_id(), "text": self.text, "author_id": str(100 + self.rng.randrange(40)),
+            "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "conversation_id": target["id"],
+            "referenced_tweets": [{"type": "replied_to", "id": target["id"]}]
+        }
+        rules = [{"id": rule["id"], "tag": rule["tag"]} for rule in self.rules.values()][:1]
+        return {"data": data, "includes": {"tweets": [target]}, "matching_rules": rules}
+
+class StreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # Chunked responses need it
+
+    @property
+    def stand_in(self):
+        return self.server.stand_in
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+    def _json(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        route = urlparse(self.path).path
+        if route == RULES_ROUTE:
+            rules = list(self.stand_in.rules.values())
+            self._json(200, {"data": rules, "meta": {"result_count": len(rules)}} if rules else {"meta": {"result_count": 0}})
+        elif route == STREAM_ROUTE:
+            self._stream()
+        else:
+            self._json(404, {"title": "Not Found Error", "detail": f"No route {route}"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != RULES_ROUTE:
+            self._json(404, {"title": "Not Found Error"})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        added = []
+        for rule in body.get("add", []):
+            rule = {"id": self.stand_in.next_id(), "value": rule["value"], "tag": rule.get("tag")}
+            self.stand_in.rules[rule["id"]] = rule
+            added.append(rule)
+        deleted = [i for i in body.get("delete", {}).get("ids", []) if self.stand_in.rules.pop(i, None)]
+        logger.info("Rules: %d added, %d deleted", len(added), len(deleted))
+        self._json(201 if added else 200, {
+            "data": added,
+            "meta": {"summary": {"created": len(added), "deleted": len(deleted)}}
+        })
+
+    def _stream(self):
+        stand_in = self.stand_in
+        stand_in.connections += 1
+        if stand_in.connections <= stand_in.fail_first:
+            logger.info("Refusing connection %d with %d", stand_in.connections, stand_in.fail_status)
+            headers = {"x-rate-limit-reset": str(int(time.time()) + 60)} if stand_in.fail_status == 429 else None
+            self._json(stand_in.fail_status, {"title": "Stand-in failure", "detail": "Refused on purpose"}, headers)
+            return
+
+        logger.info("Stream connection %d opened", stand_in.connections)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        opened = time.monotonic()
+        next_beat = opened + stand_in.heartbeat
+        next_tweet = opened + stand_in.rng.expovariate(stand_in.rate / 60) if stand_in.rate else float("inf")
+        try:
+            while not stand_in.stopping.is_set():
+                now = time.monotonic()
+                if stand_in.drop_after is not None and now - opened >= stand_in.drop_after:
+                    logger.info("Dropping stream connection")
+                    self.close_connection = True
+                    return
+                if stand_in.stall_after is not None and now - opened >= stand_in.stall_after:
+                    # Silent but open, as a stalled stream looks to the client
+                    stand_in.stopping.wait(1)
+                    continue
+                if now >= next_tweet:
+                    self._chunk(json.dumps(stand_in.tweet()).encode() + b"\r\n")
+                    next_tweet = now + stand_in.rng.expovariate(stand_in.rate / 60)
+                if now >= next_beat:
+                    self._chunk(b"\r\n")
+                    next_beat = now + stand_in.heartbeat
+                stand_in.stopping.wait(min(next_tweet, next_beat) - now)
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Client went away")
+            self.close_connection = True
+
+def serve(stand_in, port=PORT, host="127.0.0.1"):
+    """
+    Start the stand-in server on a background thread.
+
+    Returns:
+        ThreadingHTTPServer: The running server; shut it down with
+        stand_in.stopping.set() and server.shutdown().
+    """
+    server = ThreadingHTTPServer((host, port), StreamHandler)
+    server.daemon_threads = True
+    server.stand_in = stand_in
+    threading.Thread(target=server.serve_forever, name="stand-in", daemon=True).start()
+    return server
+
+def tail(host, rules, heartbeat_timeout, duration=None):
+    """Read a stream with the bot's client and print what it sees."""
+    stream = FilteredStream("stand-in", rules, host=host, heartbeat_timeout=heartbeat_timeout, catch_up_after=1)
+    stream.sync_rules()
+    stream.start()
+    ends_at = time.monotonic() + duration if duration else None
+    try:
+        while ends_at is None or time.monotonic() < ends_at:
+            try:
+                kind, value = stream.events.get(timeout=1)
+            except queue.Empty:
+                continue
+            if kind == "tweet":
+                tags = ",".join(rule.get("tag") or "" for rule in value.get("matching_rules", []))
+                print(f"tweet {value['data']['id']} [{tags}] {value['data']['text']}")
+            elif kind == "gap":
+                print(f"gap of {value:.1f}s: a catch-up search would run")
+            else:
+                print(f"fatal: {value!r}")
+                return 1
+    finally:
+        stream.close()
+    print(f"{stream.connects} connections")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.stream_server",
+        description="Serve a local stand-in for the filtered stream and its rules endpoints."
+    )
+    parser.add_argument("--port", type=int, default=PORT, help=f"Port to listen on (default: {PORT})")
+    parser.add_argument("--rate", type=float, default=RATE, help=f"Matched tweets per minute (default: {RATE:g})")
+    parser.add_argument("--heartbeat", type=float, default=HEARTBEAT,
+                        help=f"Seconds between keep-alives (default: {HEARTBEAT})")
+    parser.add_argument("--drop-after", type=float, metavar="SECONDS", help="Cut each connection after SECONDS")
+    parser.add_argument("--stall-after", type=float, metavar="SECONDS",
+                        help="Go silent, keep-alives included, SECONDS into each connection")
+    parser.add_argument("--fail-first", type=int, default=0, metavar="N", help="Refuse the first N connections")
+    parser.add_argument("--fail-status", type=int, default=503, help="Status to refuse them with (default: 503)")
+    parser.add_argument("--text", default=TEXT, help="Text of the made-up mentions")
+    parser.add_argument("--seed", type=int, help="Seed for made-up tweets")
+    parser.add_argument("--tail", action="store_true",
+                        help="Also read the stream with the bot's client and print what arrives")
+    parser.add_argument("--duration", type=float, help="With --tail, stop after this many seconds")
+    parser.add_argument("--heartbeat-timeout", type=float, default=HEARTBEAT_TIMEOUT,
+                        help=f"With --tail, the client's stall timeout (default: {HEARTBEAT_TIMEOUT})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s", stream=sys.stderr)
+    stand_in = StandInStream(args.rate, args.heartbeat, args.drop_after, args.stall_after,
+                             args.fail_first, args.fail_status, args.text, args.seed)
+    server = serve(stand_in, args.port)
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    logger.info("Stand-in stream at %s (set stream.host to use it)", host)
+    try:
+        if args.tail:
+            return tail(host, {"0": f"{args.text.split()[0]} -is:retweet"}, args.heartbeat_timeout, args.duration)
+        stand_in.stopping.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stand_in.stopping.set()
+        server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
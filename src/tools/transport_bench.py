@@ -0,0 +1,107 @@
+import io
+import sys
+import json
+import time
+import argparse
+
+import requests
+import tweepy
+from requests.adapters import BaseAdapter
+
+from src.api.models import Mention, TweetRef, payload_of
+from src.api.transport import DirectClient
+
+CREDENTIALS = {
+    "bearer_token": "bench", "consumer_key": "bench", "consumer_secret": "bench",
+    "access_token": "bench", "access_token_secret": "bench"
+}
+
+def _search_body(page_size):
+    tweets = [{
+        "id": str(1000 + i), "text": f"@HoundTheCult look at this {i}", "author_id": str(50 + i % 17),
+        "created_at": "2026-10-19T10:00:00.000Z", "conversation_id": str(900 + i % 7),
+        "referenced_tweets": [{"type": "replied_to", "id": str(900 + i % 7)}],
+        "edit_history_tweet_ids": [str(1000 + i)]
+    } for i in range(page_size)]
+    included = [{"id": str(900 + j), "text": "original", "author_id": "7", "edit_history_tweet_ids": [str(900 + j)]}
+                for j in range(7)]
+    return {"data": tweets, "includes": {"tweets": included}, "meta": {"result_count": page_size}}
+
+class StubAdapter(BaseAdapter):
+    """Answers every request from memory, so only client-side overhead is measured."""
+    def __init__(self, page_size):
+        super().__init__()
+        self.bodies = {
+            "search": json.dumps(_search_body(page_size)).encode(),
+            "lookup": json.dumps({"data": {"id": "900", "text": "original", "author_id": "7",
+                                            "edit_history_tweet_ids": ["900"]}}).encode(),
+            "post": json.dumps({"data": {"id": "5000", "text": "Found one!", "edit_history_tweet_ids": ["5000"]}}).encode()
+        }
+
+    def send(self, request, **kwargs):
+        if "/search/" in request.url:
+            body = self.bodies["search"]
+        elif request.method == "POST":
+            body = self.bodies["post"]
+        else:
+            body = self.bodies["lookup"]
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["content-type"] = "application/json"
+        response.headers["x-rate-limit-remaining"] = "100"
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+def _cycle(client):
+    """One search, lookup and post, with mention extraction as in the bot."""
+    response = client.search_recent_tweets(
+        query="@HoundTheCult -is:retweet", max_results=100,
+        expansions=["referenced_tweets.id", "referenced_tweets.id.author_id", "author_id"],
+        tweet_fields=["created_at", "author_id", "conversation_id"], user_auth=True
+    )
+    included = {}
+    for tweet in response.includes["tweets"]:
+        payload = payload_of(tweet)
+        included[int(payload["id"])] = payload
+    mentions = [Mention.from_payload(payload_of(tweet), included) for tweet in response.data]
+    lookup = client.get_tweet(900, expansions=["author_id"], tweet_fields=["created_at", "author_id", "text"])
+    TweetRef.from_payload(payload_of(lookup.data))
+    client.create_tweet(text="Found one!", quote_tweet_id=900)
+    return mentions
+
+def bench(client, iterations):
+    _cycle(client)  # Warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        _cycle(client)
+    return (time.perf_counter() - start) / (iterations * 3)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.transport_bench",
+        description="Compare per-call client overhead of tweepy and the direct transport against a stub server."
+    )
+    parser.add_argument("--iterations", type=int, default=300, help="Search/lookup/post cycles per client")
+    parser.add_argument("--page-size", type=int, default=100, help="Mentions per search page")
+    args = parser.parse_args(argv)
+
+    results = {}
+    tweepy_client = tweepy.Client(**CREDENTIALS)
+    tweepy_client.session.mount("https://", StubAdapter(args.page_size))
+    results["tweepy"] = bench(tweepy_client, args.iterations)
+
+    direct_session = requests.Session()
+    direct_session.mount("https://", StubAdapter(args.page_size))
+    results["direct"] = bench(DirectClient(session=direct_session, **CREDENTIALS), args.iterations)
+
+    for name, per_call in results.items():
+        print(f"{name:>7}: {per_call * 1e6:8.1f} µs/call")
+    print(f"speedup: {results['tweepy'] / results['direct']:.2f}x")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+import io
+import os
+import sys
+import time
+import json
+import queue
+import pstats
+import signal
+import cProfile
+import logging
+import threading
+import traceback
+import tracemalloc
+from contextlib import contextmanager
+
+from config import get_config_section
+
+logger = logging.getLogger(__name__)
+
+PROFILE_CYCLES = 3      # Cycles profiled per SIGUSR1
+TOP_ENTRIES = 30        # Rows in profile and memory reports
+TRACE_FRAMES = 10       # Frames kept per tracemalloc allocation
+
+class Diagnostics:
+    """
+    On-demand profiling and state dumps for a running bot.
+
+    SIGUSR1 profiles the next `profile_cycles` bot cycles with cProfile.
+    SIGUSR2 takes a tracemalloc snapshot and diffs it against the previous
+    one (the first starts tracing). Both also dump every thread's stack and
+    the current limiter, usage, quota and breaker state. Reports go to
+    `path` as timestamped files.
+
+    Signal handlers only queue a request; reports are written by a
+    background thread, and profiling starts at the next cycle boundary, so
+    the bot loop never stops for them.
+    """
+    def __init__(self, state_provider, path="logs", profile_cycles=PROFILE_CYCLES, top=TOP_ENTRIES):
+        """
+        Args:
+            state_provider (callable): Returns the current BotState, or None.
+            path (str): Directory for reports.
+            profile_cycles (int): Cycles profiled per SIGUSR1.
+            top (int): Rows in profile and memory reports.
+        """
+        self.state_provider = state_provider
+        self.path = path
+        self.profile_cycles = profile_cycles
+        self.top = top
+        self._requests = queue.SimpleQueue()   # put() is safe from signal handlers
+        self._profile_requested = threading.Event()   # Set by the report thread
+        self._profile_pending = 0                     # Only touched by the bot thread
+        self._profiler = None
+        self._profiled = 0
+        self._baseline = None
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, state_provider, options=None):
+        """
+        Create diagnostics from the "diagnostics" config section.
+
+        Args:
+            state_provider (callable): Returns the current BotState, or None.
+            options (dict, optional): Overrides the config section.
+
+        Returns:
+            Diagnostics: The configured instance.
+        """
+        if options is None:
+            options = get_config_section("diagnostics")
+        return cls(
+            state_provider,
+            path=options.get("path", "logs"),
+            profile_cycles=options.get("profile_cycles", PROFILE_CYCLES),
+            top=options.get("top", TOP_ENTRIES)
+        )
+
+    def install(self):
+        """
+        Install the signal handlers and start the report thread.
+
+        Returns:
+            bool: False where SIGUSR1/SIGUSR2 are unavailable.
+        """
+        if not hasattr(signal, "SIGUSR1"):
+            logger.warning("Diagnostics signals are not supported on this platform")
+            return False
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self._requests.put("profile"))
+        signal.signal(signal.SIGUSR2, lambda signum, frame: self._requests.put("memory"))
+        self._thread = threading.Thread(target=self._run, name="diagnostics", daemon=True)
+        self._thread.start()
+        logger.info("🩺 Diagnostics ready: kill -USR1 %d to profile, -USR2 for a memory snapshot", os.getpid())
+        return True
+
+    def _run(self):
+        """Write reports for queued signal requests."""
+        while True:
+            request = self._requests.get()
+            try:
+                if request == "profile":
+                    self._profile_requested.set()
+                    logger.info("🩺 Profiling the next %d cycles", self.profile_cycles)
+                    self.dump_state("profile")
+                elif request == "memory":
+                    self.snapshot_memory()
+                    self.dump_state("memory")
+            except Exception as e:
+                logger.error("Diagnostics %s failed: %s", request, e)
+
+    def _report_path(self, kind, suffix="txt"):
+        os.makedirs(self.path, exist_ok=True)
+        now = time.time()
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now * 1000) % 1000:03d}"
+        return os.path.join(self.path, f"{kind}-{stamp}-{os.getpid()}.{suffix}")
+
+    @contextmanager
+    def cycle(self):
+        """
+        Wrap one bot cycle; profiles it while a SIGUSR1 request is pending.
+        """
+        if self._profile_requested.is_set():
+            self._profile_requested.clear()
+            self._profile_pending = self.profile_cycles
+        if self._profiler is None and self._profile_pending > 0:
+            self._profiler = cProfile.Profile()
+            self._profiled = 0
+            self._profiler.enable()
+        try:
+            yield
+        finally:
+            if self._profiler is not None:
+                self._profiled += 1
+                self._profile_pending -= 1
+                if self._profile_pending <= 0:
+                    self._finish_profile()
+
+    def _finish_profile(self):
+        """Stop the profiler and write raw stats plus a text summary."""
+        profiler, self._profiler = self._profiler, None
+        profiler.disable()
+        stats_file = self._report_path("profile", "pstats")
+        profiler.dump_stats(stats_file)
+        text = io.StringIO()
+        stats = pstats.Stats(profiler, stream=text)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        with open(stats_file[:-len(".pstats")] + ".txt", "w") as f:
+            f.write(f"{self._profiled} cycles profiled\n")
+            f.write(text.getvalue())
+        logger.info("🩺 Profile of %d cycles written to %s", self._profiled, stats_file)
+
+    def snapshot_memory(self):
+        """
+        Take a tracemalloc snapshot and write its diff against the previous one.
+
+        The first call starts tracing and only records the baseline.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self._baseline = tracemalloc.take_snapshot()
+            logger.info("🩺 Memory tracing started; signal again for a diff")
+            return
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        report = self._report_path("memory")
+        with open(report, "w") as f:
+            f.write(f"traced: {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n\n")
+            if self._baseline is not None:
+                f.write(f"Top {self.top} changes since the previous snapshot:\n")
+                for stat in snapshot.compare_to(self._baseline, "lineno")[:self.top]:
+                    f.write(f"{stat}\n")
+                f.write("\n")
+            f.write(f"Top {self.top} allocations:\n")
+            for stat in snapshot.statistics("lineno")[:self.top]:
+                f.write(f"{stat}\n")
+        self._baseline = snapshot
+        logger.info("🩺 Memory snapshot written to %s", report)
+
+    def state_summary(self):
+        """
+        Collect limiter, usage, quota and breaker state.
+
+        Returns:
+            dict: JSON-serializable state, empty if no bot state is running.
+        """
+        bot_state = self.state_provider()
+        if bot_state is None:
+            return {}
+        # Runs beside the bot thread: read copies only, never prune or reload
+        limiter = bot_state.rate_limiter
+        now = limiter.clock()
+        windows = {endpoint: limiter.snapshot(endpoint) for endpoint in ("search", "lookup", "post")}
+        return {
+            "rate_limiter": {
+                endpoint: {
+                    "in_window": len(timestamps),
+                    "oldest_age": round(now - min(timestamps, default=now), 1)
+                }
+                for endpoint, timestamps in windows.items()
+            },
+            "backoff_tiers": limiter.tiers,
+            "usage": {
+                "counters": dict(bot_state.usage.counters),
+                "last_check_time": bot_state.usage.last_check_time
+            },
+            "quota": bot_state.quota.status(),
+            "scheduler": {
+                endpoint: round(bot_state.scheduler.available_in(endpoint), 1)
+                for endpoint in ("search", "lookup", "post")
+            },
+            "retry_queue": len(bot_state.retry_queue),
+            "breakers": bot_state.breakers.stats()
+        }
+
+    def dump_state(self, reason):
+        """
+        Write every thread's stack and the current bot state.
+
+        Args:
+            reason (str): Label for the report header.
+
+        Returns:
+            str: Report path.
+        """
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        report = self._report_path("threads")
+        with open(report, "w") as f:
+            f.write(f"Diagnostics dump ({reason}) at {time.strftime('%Y-%m-%d %H:%M:%S')}, pid {os.getpid()}\n\n")
+            for ident, frame in sys._current_frames().items():
+                f.write(f"Thread {names.get(ident, '?')} ({ident}):\n")
+                f.write("".join(traceback.format_stack(frame)))
+                f.write("\n")
+            try:
+                state = self.state_summary()
+            except Exception as e:  # State may be mid-update on the bot thread
+                state = {"error": str(e)}
+            f.write("State:\n")
+            f.write(json.dumps(state, indent=2, default=str))
+            f.write("\n")
+        logger.info("🩺 Thread stacks and state written to %s", report)
+        return report
@@ -1,25 +1,147 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
 
-def setup_logging(log_file="logs/houndthecult.log"):
+from config import get_config_section
+
+DEFAULT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Rotation defaults: 10 MB per file or one file per day, 7 backups kept
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 7
+DEFAULT_ROTATE_WHEN = "midnight"
+
+_listener = None
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Render each log record as a single JSON object per line.
+    """
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves message formatting to the listener thread.
+
+    The stock QueueHandler merges args into the message on the calling thread
+    so records can be pickled. Our queue never leaves the process, so records
+    are passed through untouched and all formatting happens in the background.
+    """
+    def prepare(self, record):
+        return record
+
+def _build_file_handler(log_file, options):
+    """
+    Create the file handler described by the logging options.
+
+    Args:
+        log_file (str): Path to the log file.
+        options (dict): Logging configuration section.
+
+    Returns:
+        logging.Handler: Configured file handler.
+    """
+    rotation = options.get("rotation", "size")
+    backup_count = int(options.get("backup_count", DEFAULT_BACKUP_COUNT))
+
+    if rotation == "size":
+        return logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(options.get("max_bytes", DEFAULT_MAX_BYTES)),
+            backupCount=backup_count,
+            encoding="utf-8"
+        )
+    if rotation == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file,
+            when=options.get("when", DEFAULT_ROTATE_WHEN),
+            backupCount=backup_count,
+            encoding="utf-8"
+        )
+    return logging.FileHandler(log_file, encoding="utf-8")
+
+def setup_logging(log_file="logs/houndthecult.log", options=None):
     """
-    Set up logging configuration.
-    
+    Set up non-blocking logging configuration.
+
+    Records are pushed onto an in-memory queue by the calling thread and
+    formatted and written by a background listener, so hot paths only pay
+    for an enqueue.
+
     Args:
         log_file (str): Path to the log file.
-    
+        options (dict, optional): Logging settings. Defaults to the "logging"
+            section of the config file. Supported keys are "level",
+            "format" ("text" or "json"), "rotation" ("size", "time" or
+            "none"), "max_bytes", "when", "backup_count" and "levels"
+            (a mapping of logger name to level).
+
     Returns:
-        None
+        logging.handlers.QueueListener: The running background listener.
     """
+    global _listener
+
+    if options is None:
+        options = get_config_section("logging")
+
     # Ensure the logs directory exists
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
+
+    if options.get("format", "text") == "json":
+        file_formatter = JsonLinesFormatter()
+    else:
+        file_formatter = logging.Formatter(DEFAULT_FORMAT)
+
+    file_handler = _build_file_handler(log_file, options)
+    file_handler.setFormatter(file_formatter)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+
+    # Replace any previous pipeline so repeated calls don't stack handlers
+    if _listener is not None:
+        _listener.stop()
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
     )
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(options.get("level", "INFO"))
+
+    # Per-module overrides, e.g. {"src.rate_limiting": "WARNING"}
+    for name, level in options.get("levels", {}).items():
+        logging.getLogger(name).setLevel(level)
+
+    return _listener
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the background listener.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
@@ -1,5 +1,13 @@
+import os
+import json
 import time
 import random
+import logging
+from collections import deque
+
+from config import get_config_section
+
+logger = logging.getLogger(__name__)
 
 def human_delay(min_sec: float, max_sec: float):
     """
@@ -14,3 +22,175 @@ def human_delay(min_sec: float, max_sec: float):
     """
     delay = random.uniform(min_sec, max_sec)
     time.sleep(delay)
+
+# Latency SLO defaults
+LATENCY_BUDGET = 90.0   # Target seconds from finding a mention to quoting it
+DELAY_FLOOR = 2.0       # Shortest humanizing delay once the budget is spent
+LATENCY_SAMPLES = 500   # Achieved latencies kept for reporting
+
+class LatencyBudget:
+    """
+    Time budget for handling one mention.
+
+    Delay points draw their jitter from whatever budget is left instead of
+    stacking independent waits, so handling stays human-paced while the
+    total stays bounded. A disabled budget only measures elapsed time and
+    delays keep their full ranges.
+    """
+    def __init__(self, budget: float, started_at: float = None, enabled: bool = True,
+                 floor: float = DELAY_FLOOR, clock=time.time):
+        """
+        Args:
+            budget (float): Seconds allowed from started_at to the reply.
+            started_at (float, optional): When the clock started, in epoch
+                seconds. Defaults to now.
+            enabled (bool): Whether delays are capped by the budget.
+            floor (float): Minimum delay once the budget is exhausted.
+            clock (callable): Returns the current time in seconds.
+        """
+        self.budget = budget
+        self.clock = clock
+        self.started_at = started_at if started_at is not None else clock()
+        self.enabled = enabled
+        self.floor = floor
+
+    def elapsed(self) -> float:
+        """Seconds since the clock started."""
+        return self.clock() - self.started_at
+
+    def remaining(self) -> float:
+        """Seconds left in the budget, never negative."""
+        return max(0.0, self.budget - self.elapsed())
+
+    def delay(self, min_sec: float, max_sec: float, reserve: float = 0.0):
+        """
+        Randomized delay drawn from the remaining budget.
+
+        Args:
+            min_sec (float): Minimum delay in seconds when there is time.
+            max_sec (float): Maximum delay in seconds.
+            reserve (float): Seconds to keep for later steps.
+        """
+        if not self.enabled:
+            human_delay(min_sec, max_sec)
+            return
+        available = self.remaining() - reserve
+        high = min(max_sec, available)
+        if high <= self.floor:
+            human_delay(min(self.floor, min_sec), min(self.floor, max_sec))
+        else:
+            human_delay(min(min_sec, high), high)
+
+    def sleep(self, seconds: float, reserve: float = 0.0):
+        """
+        Fixed wait (e.g. a backoff delay), cut short to fit the budget.
+
+        Args:
+            seconds (float): Requested wait in seconds.
+            reserve (float): Seconds to keep for later steps.
+        """
+        if self.enabled:
+            seconds = min(seconds, max(0.0, self.remaining() - reserve))
+        if seconds > 0:
+            time.sleep(seconds)
+
+class LatencySLO:
+    """
+    Hands out per-mention latency budgets and reports achieved latency.
+    """
+    def __init__(self, budget: float = LATENCY_BUDGET, enabled: bool = False,
+                 floor: float = DELAY_FLOOR, samples: int = LATENCY_SAMPLES,
+                 stats_file: str = "data/latency_slo.json", clock=time.time):
+        """
+        Args:
+            budget (float): Target seconds from finding a mention to quoting it.
+            enabled (bool): Cap delays by the budget. When off, latency is
+                still measured against the budget for reporting.
+            floor (float): Minimum delay once a budget is exhausted.
+            samples (int): Number of recent latencies kept for percentiles.
+            stats_file (str): Where export() writes the report.
+            clock (callable): Returns the current time in seconds; handed
+                to every budget.
+        """
+        self.budget = budget
+        self.enabled = enabled
+        self.floor = floor
+        self.stats_file = stats_file
+        self.clock = clock
+        self._latencies = deque(maxlen=samples)
+
+    @classmethod
+    def from_config(cls, options=None):
+        """
+        Create from the "latency_slo" config section.
+
+        Args:
+            options (dict, optional): Overrides the config section.
+
+        Returns:
+            LatencySLO: The configured tracker.
+        """
+        if options is None:
+            options = get_config_section("latency_slo")
+        return cls(
+            budget=float(options.get("budget", LATENCY_BUDGET)),
+            enabled=bool(options.get("enabled", False)),
+            floor=float(options.get("floor", DELAY_FLOOR)),
+            samples=int(options.get("samples", LATENCY_SAMPLES))
+        )
+
+    def budget_for(self, mention) -> LatencyBudget:
+        """
+        Start (or resume) the budget of a mention.
+
+        The clock starts when the mention was found, so mentions waiting
+        behind others in the same batch have correspondingly less left.
+
+        Args:
+            mention (Mention): The mention; its found_at starts the clock.
+
+        Returns:
+            LatencyBudget: The mention's budget.
+        """
+        return LatencyBudget(self.budget, mention.found_at, self.enabled, self.floor, self.clock)
+
+    def record(self, latency: float):
+        """Record the achieved latency of a quoted mention."""
+        self._latencies.append(latency)
+
+    def stats(self) -> dict:
+        """
+        Get achieved latency against the budget.
+
+        Returns:
+            dict: Sample count, p50/p95/p99/max in seconds, and the share of
+            mentions quoted within budget.
+        """
+        ordered = sorted(self._latencies)
+        if not ordered:
+            return {"budget": self.budget, "enabled": self.enabled, "samples": 0}
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+        return {
+            "budget": self.budget,
+            "enabled": self.enabled,
+            "samples": len(ordered),
+            "p50": pct(0.5),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+            "max": round(ordered[-1], 2),
+            "within_budget": round(sum(1 for l in ordered if l <= self.budget) / len(ordered), 4)
+        }
+
+    def export(self):
+        """Write stats to the stats file for monitoring."""
+        try:
+            os.makedirs(os.path.dirname(self.stats_file) or ".", exist_ok=True)
+            tmp_file = f"{self.stats_file}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(self.stats(), f, indent=2)
+            os.replace(tmp_file, self.stats_file)
+        except Exception as e:
+            logger.warning("Failed to export latency stats: %s", e)
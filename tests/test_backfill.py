@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+
+from src.api.backfill import Backfill, time_slices
+from src.rate_limiting.circuit_breaker import CircuitBreakerRegistry
+
+def test_time_slices_cover_the_interval_in_order():
+    start = datetime(2026, 3, 15, 12, 0)
+    slices = time_slices(start, start + timedelta(hours=2), 4)
+    assert len(slices) == 4
+    assert slices[0][0] == start
+    assert slices[-1][1] == start + timedelta(hours=2)
+    assert all(a[1] == b[0] for a, b in zip(slices, slices[1:]))
+    assert time_slices(start, start + timedelta(hours=1), 0) == [(start, start + timedelta(hours=1))]
+
+def make_backfill(remaining=(5, 40), available=True, max_requests=12):
+    bot_state = mock.MagicMock()
+    bot_state.scheduler.is_available.return_value = available
+    bot_state.breakers = CircuitBreakerRegistry(options={"min_calls": 1, "open_seconds": 0})
+    bot_state.quota.status.return_value = {
+        "search": [{"layer": f"layer {i}", "used": 0, "limit": limit} for i, limit in enumerate(remaining)]
+    }
+    watchlist = mock.MagicMock()
+    return Backfill(mock.MagicMock(), bot_state, watchlist, max_requests=max_requests)
+
+def test_budget_is_what_every_layer_and_the_cap_allow():
+    assert make_backfill(remaining=(5, 40))._budget() == 5
+    assert make_backfill(remaining=(50, 40))._budget() == 12
+    assert make_backfill(available=False)._budget() == 0
+
+def test_budget_does_not_take_a_half_open_probe():
+    backfill = make_backfill()
+    breakers = backfill.bot_state.breakers
+    breakers.record_failure("search")
+    assert backfill._budget() == 5
+    assert not breakers["search"].probe_in_flight
+    # The first real request takes the probe; the next waits for its outcome
+    backfill.budget = 5
+    assert backfill._reserve()
+    assert not backfill._reserve()
+    assert backfill.spent == 1
+
+def test_reserve_stops_at_the_budget():
+    backfill = make_backfill()
+    backfill.budget = 2
+    assert backfill._reserve() and backfill._reserve()
+    assert not backfill._reserve()
+    assert backfill.spent == 2
+
+def test_unknown_order_is_rejected():
+    with pytest.raises(ValueError):
+        Backfill(None, None, None, order="random")
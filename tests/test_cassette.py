@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from src.api import cassette as cassette_module
+from src.api.cassette import ReplayClient
+
+def write_cassette(path, calls):
+    with open(path, "w") as f:
+        f.write(json.dumps({"type": "header", "version": 1, "started_at": 0}) + "\n")
+        for call in calls:
+            entry = {"type": "call", "status": 200, "headers": {}, "response": None, "latency": 0.0}
+            entry.update(call)
+            f.write(json.dumps(entry) + "\n")
+
+class FakeTime:
+    """Monotonic clock that sleep() advances, recording each sleep."""
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(cassette_module.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(cassette_module.time, "sleep", fake.sleep)
+    return fake
+
+def test_replay_keeps_recorded_pacing(tmp_path, fake_time):
+    path = tmp_path / "traffic.jsonl"
+    write_cassette(path, [
+        {"method": "get_me", "t": 1.0, "latency": 0.5, "kwargs": {}},
+        {"method": "search_recent_tweets", "t": 61.0, "latency": 0.25, "kwargs": {}},
+        {"method": "get_tweet", "t": 61.5, "latency": 0.2, "kwargs": {}}
+    ])
+    client = ReplayClient(str(path), speed=2.0)
+    client.get_me()
+    assert fake_time.now == pytest.approx(100.5)
+    client.search_recent_tweets()
+    assert fake_time.now == pytest.approx(130.5)
+    fake_time.now += 10   # The caller was slower than the recording
+    client.get_tweet()
+    # Behind schedule, a call still takes its recorded latency
+    assert fake_time.sleeps[-1] == pytest.approx(0.1)
+
+def test_speed_zero_never_sleeps(tmp_path, fake_time):
+    path = tmp_path / "traffic.jsonl"
+    write_cassette(path, [{"method": "get_me", "t": 30.0, "latency": 1.0, "kwargs": {}}])
+    ReplayClient(str(path), speed=0).get_me()
+    assert fake_time.sleeps == []
+
+def test_strict_replay_ignores_time_arguments(tmp_path, fake_time):
+    path = tmp_path / "traffic.jsonl"
+    write_cassette(path, [
+        {"method": "search_recent_tweets", "t": 0, "kwargs": {
+            "query": "@HoundTheCult", "start_time": "2026-03-15T12:00:00Z", "user_auth": True
+        }},
+        {"method": "search_recent_tweets", "t": 0, "kwargs": {"query": "@HoundTheCult", "user_auth": True}},
+        {"method": "get_tweet", "t": 0, "kwargs": {"_args": [42], "user_auth": True}}
+    ])
+    client = ReplayClient(str(path), speed=0, strict=True)
+    client.search_recent_tweets(query="@HoundTheCult", start_time="2026-10-19T08:00:00Z", user_auth=True)
+    with pytest.raises(AssertionError):
+        # A time argument the recording didn't pass is still a difference
+        client.search_recent_tweets(query="@HoundTheCult", start_time="2026-10-19T08:00:00Z", user_auth=True)
+    with pytest.raises(AssertionError):
+        client.get_tweet(43, user_auth=True)
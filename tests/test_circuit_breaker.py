@@ -0,0 +1,126 @@
+from src.rate_limiting.circuit_breaker import (
+    CircuitBreaker, CircuitBreakerRegistry, CLOSED, OPEN, HALF_OPEN
+)
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def make_breaker(clock):
+    return CircuitBreaker("search", window=600, min_calls=4, failure_threshold=0.5,
+                          open_seconds=60, max_open_seconds=200, clock=clock)
+
+def trip(breaker):
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record_failure()
+
+def test_stays_closed_below_min_calls_and_threshold():
+    breaker = make_breaker(FakeClock())
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()   # 4 of 8 fail: at the threshold
+    assert breaker.state == OPEN
+
+def test_opens_at_threshold_and_fails_fast():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    trip(breaker)
+    assert breaker.state == OPEN
+    assert breaker.is_open()
+    assert not breaker.allow()
+    assert breaker.rejected_calls == 1
+    assert breaker.retry_in() == 60
+
+def test_half_open_lets_one_probe_through():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now += 60
+    assert not breaker.is_open()
+    assert breaker.state == OPEN   # is_open is read-only and takes no probe
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert breaker.probe_in_flight
+    assert not breaker.allow()
+
+def test_successful_probe_closes():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now += 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert not breaker.probe_in_flight
+    assert breaker.error_rate() == 0.0
+    assert breaker.allow() and breaker.allow()
+
+def test_failed_probe_reopens_for_twice_as_long():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    trip(breaker)
+    for expected in (120, 200, 200):   # Doubles up to max_open_seconds
+        clock.now += breaker.retry_in()
+        assert breaker.allow()
+        breaker.record_timeout()
+        assert breaker.state == OPEN
+        assert not breaker.probe_in_flight
+        assert breaker.retry_in() == expected
+    assert breaker.total_timeouts == 3
+
+def test_probe_is_released_by_either_outcome():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now += 60
+    assert breaker.allow()
+    breaker.record_failure()
+    clock.now += breaker.retry_in()
+    # A new cool-down gives a fresh probe rather than a stuck one
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+def test_success_after_reclose_resets_cool_down():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now += 60
+    breaker.allow()
+    breaker.record_failure()
+    clock.now += breaker.retry_in()
+    breaker.allow()
+    breaker.record_success()
+    clock.now += 1
+    while breaker.state == CLOSED:
+        breaker.record_failure()
+    assert breaker.retry_in() == 60
+
+def test_stats_leave_the_window_untouched():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    breaker.record_failure()
+    clock.now += 601
+    stats = breaker.stats()
+    assert stats["window_calls"] == 0
+    assert len(breaker.outcomes) == 1
+
+def test_registry_is_open_takes_no_probe():
+    registry = CircuitBreakerRegistry(options={"min_calls": 1, "open_seconds": 0})
+    registry.record_failure("search")
+    assert registry["search"].state == OPEN
+    assert not registry.is_open("search")
+    assert registry["search"].state == OPEN
+    assert registry.allow("search")
+    assert not registry.allow("search")
+    assert registry.allow("lookup")
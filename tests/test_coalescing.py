@@ -0,0 +1,67 @@
+from src.api.coalescing import coalesce_mentions, fair_order
+from src.api.models import Mention
+from src.rate_limiting.fairshare import FairShareScheduler
+
+class FakeQuotedTargets:
+    def __init__(self, quoted=()):
+        self.quoted = set(quoted)
+
+    def recently_quoted(self, tweet_id):
+        return str(tweet_id) in self.quoted
+
+class FakeBotState:
+    def __init__(self, burst=1, quoted=()):
+        self.fair_share = FairShareScheduler(burst=burst, per_day=0, clock=lambda: 0.0)
+        self.quoted_targets = FakeQuotedTargets(quoted)
+        self.handled = set()
+
+    def is_opted_out(self, author_id):
+        return False
+
+    def mark_handled(self, mention_id):
+        self.handled.add(mention_id)
+
+def mention(id, author_id, target=None, text="@HoundTheCult look"):
+    return Mention(id, text=text, author_id=author_id, referenced_tweet_id=target)
+
+def test_coalesces_mentions_of_one_tweet_behind_a_leader():
+    bot_state = FakeBotState()
+    first, second, other = mention(1, 10, 500), mention(2, 20, 500), mention(3, 30, 600)
+    assert coalesce_mentions([first, second, other], bot_state) == [first, other]
+    assert first.followers == [second]
+    assert not bot_state.handled
+
+def test_recently_quoted_targets_are_handled_outright():
+    bot_state = FakeBotState(quoted={"500"})
+    assert coalesce_mentions([mention(1, 10, 500), mention(2, 20, 500)], bot_state) == []
+    assert bot_state.handled == {1, 2}
+
+def test_fair_order_drops_authors_over_their_cap():
+    bot_state = FakeBotState(burst=1)
+    first, second = mention(1, 10, 500), mention(2, 10, 600)
+    assert fair_order([first, second], bot_state) == [first]
+    assert bot_state.handled == {2}
+
+def test_dropped_leader_hands_over_to_a_follower_under_cap():
+    bot_state = FakeBotState(burst=1)
+    earlier = mention(1, 10, 400)
+    leader, same_author, other_author, last = (
+        mention(2, 10, 500), mention(3, 10, 500), mention(4, 20, 500), mention(5, 30, 500)
+    )
+    batch = coalesce_mentions([earlier, leader, same_author, other_author, last], bot_state)
+    assert batch == [earlier, leader]
+
+    ordered = fair_order(batch, bot_state)
+    # Author 10's token is held by the earlier mention; the leader and its
+    # same-author follower are dropped and author 20 leads the rest
+    assert ordered == [earlier, other_author]
+    assert other_author.followers == [last]
+    assert bot_state.handled == {2, 3}
+    assert leader.followers == [] and same_author.followers == []
+
+def test_commands_are_exempt_and_go_first():
+    bot_state = FakeBotState(burst=1)
+    quote = mention(1, 10, 500)
+    command = mention(2, 10, text="@HoundTheCult !optout")
+    assert command.command is not None
+    assert fair_order([quote, command], bot_state) == [command, quote]
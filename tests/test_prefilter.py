@@ -0,0 +1,63 @@
+from src.api.models import Mention
+from src.api.prefilter import Prefilter, self_user_id
+
+class FakeBotState:
+    def __init__(self, opted_out=(), handled=()):
+        self.opted_out = set(opted_out)
+        self.handled = set(handled)
+        self.lookups = []
+
+    def is_handled(self, mention_id):
+        return mention_id in self.handled
+
+    def mark_handled(self, mention_id):
+        self.handled.add(mention_id)
+
+    def is_opted_out(self, author_id):
+        self.lookups.append(author_id)
+        return author_id in self.opted_out
+
+def mention(id, author_id, text="@HoundTheCult look"):
+    return Mention(id, text=text, author_id=author_id, referenced_tweet_id=500)
+
+def test_self_user_id_comes_from_the_access_token():
+    assert self_user_id("1234-secret") == 1234
+    assert self_user_id("not-a-token") is None
+    assert self_user_id(None) is None
+
+def test_drops_handled_own_and_opted_out_mentions():
+    bot_state = FakeBotState(opted_out={"20"}, handled={1})
+    prefilter = Prefilter(self_id=99)
+    kept = prefilter.apply(
+        [mention(1, 10), mention(2, 99), mention(3, 20), mention(4, 20), mention(5, 10)], bot_state
+    )
+    assert [m.id for m in kept] == [5]
+    assert bot_state.handled == {1, 2, 3, 4}
+    # One preference lookup per author and page
+    assert sorted(bot_state.lookups) == ["10", "20"]
+
+def test_commands_always_pass():
+    bot_state = FakeBotState(opted_out={"20"})
+    kept = Prefilter().apply([mention(1, 20, "@HoundTheCult !optin")], bot_state)
+    assert [m.id for m in kept] == [1]
+
+def test_heavy_authors_are_excluded_until_the_ttl_lapses():
+    now = [1000.0]
+    bot_state = FakeBotState(opted_out={"20"})
+    prefilter = Prefilter(exclude_heavy=True, min_count=2, exclusion_ttl=60, clock=lambda: now[0])
+    prefilter.apply([mention(1, 20)], bot_state)
+    assert prefilter.exclusions() == []
+    prefilter.apply([mention(2, 20)], bot_state)
+    assert prefilter.exclusions() == [20]
+    assert prefilter.narrow("@HoundTheCult", 30) == "@HoundTheCult -from:20"
+    assert prefilter.narrow("@HoundTheCult", 15) == "@HoundTheCult"
+    now[0] += 60
+    assert prefilter.exclusions() == []
+
+def test_opt_in_lifts_an_exclusion():
+    bot_state = FakeBotState(opted_out={"20"})
+    prefilter = Prefilter(exclude_heavy=True, min_count=1)
+    prefilter.apply([mention(1, 20)], bot_state)
+    assert prefilter.exclusions() == [20]
+    prefilter.apply([mention(2, 20, "@HoundTheCult !optin")], bot_state)
+    assert prefilter.exclusions() == []
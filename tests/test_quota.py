@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+
+from src.rate_limiting.limiter import RateLimiter
+from src.rate_limiting.quota import QuotaEngine
+from src.state.usage import UsageTracker
+
+QUOTAS = {
+    "search": [
+        {"period": "window", "limit": 2, "seconds": 60},
+        {"period": "day", "limit": 3, "counter": "reads"},
+        {"period": "month", "limit": 5, "counter": "reads"}
+    ],
+    "lookup": [
+        {"period": "month", "limit": 5, "counter": "reads"}
+    ]
+}
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def epoch(self):
+        return self.now.timestamp()
+
+def make_engine(now=datetime(2026, 3, 30, 12, 0)):
+    clock = FakeClock(now)
+    limiter = RateLimiter(clock=clock.epoch)
+    usage = UsageTracker(clock=clock)
+    return QuotaEngine(limiter, usage, quotas=QUOTAS, clock=clock), clock
+
+def test_admits_until_window_layer_fills():
+    engine, clock = make_engine()
+    assert engine.admit("search").allowed
+    engine.record("search")
+    clock.now += timedelta(seconds=10)
+    engine.record("search")
+
+    admission = engine.admit("search")
+    assert not admission.allowed
+    assert admission.binding.period == "window"
+    # The oldest call leaves the 60s window 50s from now
+    assert admission.wait_seconds == 50
+
+    clock.now += timedelta(seconds=51)
+    assert engine.admit("search").allowed
+
+def test_daily_layer_binds_until_midnight():
+    engine, clock = make_engine()
+    for _ in range(3):
+        engine.record("search")
+        clock.now += timedelta(seconds=61)
+
+    admission = engine.admit("search")
+    assert not admission.allowed
+    assert admission.binding.period == "day"
+    midnight = datetime(2026, 3, 31)
+    assert admission.wait_seconds == (midnight - clock.now).total_seconds()
+
+    clock.now = midnight
+    assert engine.admit("search").allowed
+
+def test_monthly_layer_binds_until_next_month():
+    engine, clock = make_engine()
+    for _ in range(3):
+        engine.record("search")
+        clock.now += timedelta(seconds=61)
+    clock.now = datetime(2026, 3, 31, 9, 0)
+    engine.record("search")
+    clock.now += timedelta(seconds=61)
+    engine.record("search")
+    clock.now += timedelta(seconds=61)
+
+    admission = engine.admit("search")
+    assert not admission.allowed
+    assert admission.binding.period == "month"
+    assert admission.wait_seconds == (datetime(2026, 4, 1) - clock.now).total_seconds()
+
+    clock.now = datetime(2026, 4, 1)
+    assert engine.admit("search").allowed
+
+def test_binding_layer_is_the_one_that_frees_up_last():
+    engine, clock = make_engine()
+    for _ in range(3):
+        engine.record("search")
+        clock.now += timedelta(seconds=30)
+    # Window (2 in the last 60s) and day (3 today) are both exhausted
+    admission = engine.admit("search")
+    assert not admission.allowed
+    assert admission.binding.period == "day"
+
+def test_layers_sharing_a_counter_share_usage():
+    engine, clock = make_engine()
+    for _ in range(5):
+        engine.record("lookup")
+    admission = engine.admit("search")
+    assert not admission.allowed
+    assert admission.binding.period == "month"
+    assert not engine.admit("lookup").allowed
+
+def test_admit_reserves_nothing():
+    engine, clock = make_engine()
+    for _ in range(10):
+        assert engine.admit("search").allowed
+    status = {layer["layer"]: layer["used"] for layer in engine.status()["search"]}
+    assert set(status.values()) == {0}
+
+def test_unlisted_endpoints_keep_defaults():
+    engine, clock = make_engine()
+    assert [layer.period for layer in engine.layers["post"]] == ["window", "month"]
+
+def test_zero_limit_window_waits_for_its_newest_call():
+    clock = FakeClock(datetime(2026, 3, 30, 12, 0))
+    limiter = RateLimiter(clock=clock.epoch)
+    engine = QuotaEngine(limiter, UsageTracker(clock=clock), clock=clock,
+                         quotas={"post": [{"period": "window", "limit": 0, "seconds": 60}]})
+    admission = engine.admit("post")
+    assert not admission.allowed
+    assert admission.wait_seconds == 60
+
+    limiter.record("post")
+    clock.now += timedelta(seconds=20)
+    limiter.record("post")
+    admission = engine.admit("post")
+    assert not admission.allowed
+    assert admission.wait_seconds == 60
+
+def test_backoff_measures_usage_against_configured_windows():
+    engine, clock = make_engine()
+    limiter = engine.rate_limiter
+    assert limiter.get_search_usage_ratio() == 0
+    engine.record("search")
+    # One of the 2 calls the 60s search window allows
+    assert limiter.get_search_usage_ratio() == 0.5
+    clock.now += timedelta(seconds=61)
+    assert limiter.get_search_usage_ratio() == 0
+    # Lookup has no window layer configured and keeps Twitter's limit
+    engine.record("lookup")
+    assert limiter.get_lookup_usage_ratio() == 1 / 300
+
+def test_zero_limit_window_backs_off_fully():
+    clock = FakeClock(datetime(2026, 3, 30, 12, 0))
+    limiter = RateLimiter(clock=clock.epoch)
+    QuotaEngine(limiter, UsageTracker(clock=clock), clock=clock,
+                quotas={"post": [{"period": "window", "limit": 0}]})
+    assert limiter.get_post_usage_ratio() == 1.0
+    assert not limiter.can_post_tweet()
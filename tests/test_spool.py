@@ -0,0 +1,49 @@
+import os
+
+from src.api.models import Mention
+from src.cluster.leader import LeaderLock
+from src.cluster.spool import Spool, partition_for
+
+def test_partitions_are_stable_and_in_range():
+    assert partition_for(12345, 4) == partition_for("12345", 4)
+    assert {partition_for(author, 3) for author in range(100)} == {0, 1, 2}
+
+def test_dispatched_mentions_wait_until_acked(tmp_path):
+    spool = Spool(root=str(tmp_path), workers=2)
+    leader = Mention(1, text="@HoundTheCult look", author_id=10, referenced_tweet_id=500)
+    leader.followers = [Mention(2, text="@HoundTheCult me too", author_id=20, referenced_tweet_id=500)]
+    worker = spool.dispatch(leader)
+    second = Mention(3, text="@HoundTheCult again", author_id=10, referenced_tweet_id=600)
+    assert spool.dispatch(second) == worker
+
+    pending = list(spool.pending(worker))
+    assert [mention.id for _, mention in pending] == [1, 3]
+    assert [f.id for f in pending[0][1].followers] == [2]
+    assert spool.depth()[worker] == 2
+
+    spool.ack(pending[0][0])
+    # Unacked work is still there for a restarted worker
+    assert [mention.id for _, mention in spool.pending(worker)] == [3]
+
+def test_unreadable_messages_are_dropped(tmp_path):
+    spool = Spool(root=str(tmp_path), workers=1)
+    with open(os.path.join(spool._dir(0), "0-broken.json"), "w") as f:
+        f.write("{")
+    assert list(spool.pending(0)) == []
+    assert spool.depth() == {0: 0}
+
+def test_quote_reports_are_read_once(tmp_path):
+    spool = Spool(root=str(tmp_path), workers=1)
+    spool.report_quote(500)
+    spool.report_quote(600)
+    assert spool.quoted() == ["500", "600"]
+    assert spool.quoted() == []
+
+def test_only_one_leader_at_a_time(tmp_path):
+    path = str(tmp_path / "leader.lock")
+    first, second = LeaderLock(path), LeaderLock(path)
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    first.release()
+    assert second.try_acquire()
+    second.release()
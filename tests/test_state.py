@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+from src.rate_limiting.limiter import RateLimiter
+from src.rate_limiting.quota import QuotaEngine
+from src.state import BotState
+from src.state.usage import UsageTracker
+from src.storage import JsonStorage
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    # BotState's components write under data/ in the working directory
+    monkeypatch.chdir(tmp_path)
+    return JsonStorage(str(tmp_path / "data/bot_state.json"), str(tmp_path / "data/user_prefs.json"))
+
+def test_own_quota_engine_charges_the_state_tracker(storage):
+    bot_state = BotState(storage=storage)
+    assert bot_state.quota.usage is bot_state.usage
+    bot_state.quota.record("post")
+    assert bot_state.posts_this_month == 1
+    bot_state.close()
+
+def test_given_quota_engine_shares_its_tracker(storage):
+    quota = QuotaEngine(RateLimiter(), UsageTracker(), quotas={})
+    quota.usage.counters = {"reads": {"month": [datetime.now().strftime("%Y-%m"), 7]}}
+    storage.save_usage({"counters": {}, "last_check_time": "2026-03-15T12:00:00"})
+
+    bot_state = BotState(storage=storage, quota=quota)
+    assert bot_state.usage is quota.usage
+    # Counters stay the engine's; only the check time is loaded
+    assert bot_state.reads_this_month == 7
+    assert bot_state.last_check_time == "2026-03-15T12:00:00"
+
+    quota.record("search")
+    assert bot_state.reads_this_month == 8
+    bot_state.update_check_time(datetime(2026, 3, 16, 9, 30))
+    assert storage.load_usage()["counters"]["reads"]["month"][1] == 8
+    assert storage.load_usage()["last_check_time"] == "2026-03-16T09:30:00"
+    bot_state.close()
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from src.storage import JsonStorage, SqliteStorage
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request, tmp_path):
+    if request.param == "json":
+        backend = JsonStorage(str(tmp_path / "bot_state.json"), str(tmp_path / "user_prefs.json"))
+    else:
+        backend = SqliteStorage(str(tmp_path / "houndthecult.db"))
+    yield backend
+    backend.close()
+
+def reopen(storage):
+    """Open a second backend on the same files, so only committed data is seen."""
+    if isinstance(storage, JsonStorage):
+        return JsonStorage(storage.state_file, storage.opt_file)
+    return SqliteStorage(storage.db_file)
+
+def test_transaction_commits_once_on_exit(storage):
+    with storage.transaction():
+        storage.save_state({"search_timestamps": [100.0, 200.0]})
+        storage.save_usage({"counters": {"reads": {"month": ["2026-03", 2]}}})
+        storage.set_pref("abc", "opt_out")
+        # Nothing reaches disk until the outermost transaction exits
+        other = reopen(storage)
+        assert other.load_state().get("search_timestamps", []) == []
+        assert other.get_pref("abc") is None
+        other.close()
+        # Pending writes are visible through the same backend
+        assert storage.get_pref("abc") == "opt_out"
+
+    other = reopen(storage)
+    assert other.load_state()["search_timestamps"] == [100.0, 200.0]
+    assert other.load_usage()["counters"] == {"reads": {"month": ["2026-03", 2]}}
+    assert other.get_pref("abc") == "opt_out"
+    other.close()
+
+def test_nested_transaction_commits_with_outermost(storage):
+    with storage.transaction():
+        with storage.transaction():
+            storage.set_pref("abc", "opt_in")
+        other = reopen(storage)
+        assert other.get_pref("abc") is None
+        other.close()
+
+    other = reopen(storage)
+    assert other.get_pref("abc") == "opt_in"
+    other.close()
+
+def test_transaction_commits_when_block_raises(storage):
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.save_state({"post_tweet_timestamps": [300.0]})
+            raise RuntimeError("cycle failed")
+
+    other = reopen(storage)
+    assert other.load_state()["post_tweet_timestamps"] == [300.0]
+    other.close()
+
+def test_json_failed_write_keeps_previous_file_and_retries(tmp_path, monkeypatch):
+    storage = JsonStorage(str(tmp_path / "bot_state.json"), str(tmp_path / "user_prefs.json"))
+    storage.save_state({"search_timestamps": [100.0]})
+    with open(storage.state_file) as f:
+        committed = json.load(f)
+
+    def fail(path, data, indent=None):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(storage, "_atomic_dump", fail)
+    with storage.transaction():
+        storage.save_state({"search_timestamps": [100.0, 200.0]})
+        storage.set_pref("abc", "opt_out")
+
+    # The old state file is restored from its backup
+    with open(storage.state_file) as f:
+        assert json.load(f) == committed
+    assert storage._pending_prefs == {"abc": "opt_out"}
+
+    monkeypatch.undo()
+    storage.flush()
+    other = reopen(storage)
+    assert other.load_state()["search_timestamps"] == [100.0, 200.0]
+    assert other.get_pref("abc") == "opt_out"
+    other.close()
+
+def test_sqlite_failed_write_rolls_back_and_retries(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "houndthecult.db"))
+    storage.save_state({"search_timestamps": [100.0], "version": 1})
+
+    with storage.transaction():
+        storage.save_state({"search_timestamps": [100.0, 200.0], "version": 2})
+        storage.save_usage({"last_check_time": "2026-03-15T12:00:00"})
+        # Prefs are written last; a value SQLite cannot bind fails the commit
+        storage.set_pref("abc", object())
+
+    other = reopen(storage)
+    state = other.load_state()
+    assert state["search_timestamps"] == [100.0]
+    assert state["version"] == 1
+    assert other.load_usage() == {}
+    assert other.get_pref("abc") is None
+    other.close()
+
+    # The writes are kept; correcting the bad one lets the next flush land them all
+    storage.set_pref("abc", "opt_out")
+    other = reopen(storage)
+    state = other.load_state()
+    assert state["search_timestamps"] == [100.0, 200.0]
+    assert state["version"] == 2
+    assert other.load_usage() == {"last_check_time": "2026-03-15T12:00:00"}
+    assert other.get_pref("abc") == "opt_out"
+    other.close()
+    storage.close()
+
+def test_sqlite_iter_prefs_pages_around_concurrent_writes(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "houndthecult.db"))
+    storage.merge_prefs((f"{i:04d}", "opt_out") for i in range(25))
+    seen = []
+    for hashed_id, action in storage.iter_prefs(page_size=10):
+        if hashed_id == "0005":
+            # Writes between pages neither block nor disturb the iteration
+            storage.set_pref("0020", "opt_in")
+            storage.set_pref("9999", "opt_in")
+        seen.append((hashed_id, action))
+    assert [hashed_id for hashed_id, _ in seen] == [f"{i:04d}" for i in range(25)] + ["9999"]
+    assert ("0020", "opt_in") in seen
+    storage.close()
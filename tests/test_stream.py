@@ -0,0 +1,118 @@
+import queue
+from collections import OrderedDict
+from datetime import datetime
+from unittest import mock
+
+import pytest
+
+from src.api import stream as stream_module
+from src.api.stream import MentionStream, MIN_WAIT
+from src.utils.diagnostics import Diagnostics
+
+class StopLoop(Exception):
+    pass
+
+class ScriptedEvents:
+    """Event queue that never blocks: records each get's timeout and plays a script."""
+    def __init__(self, script):
+        self.script = list(script)
+        self.timeouts = []
+
+    def get(self, timeout=None):
+        self.timeouts.append(timeout)
+        if not self.script:
+            return ("error", StopLoop())
+        event = self.script.pop(0)
+        if event is None:
+            raise queue.Empty
+        return event
+
+    def get_nowait(self):
+        raise queue.Empty
+
+class FakeStream:
+    def __init__(self, events, connected=False):
+        self.events = events
+        self.connected = connected
+
+    def sync_rules(self):
+        pass
+
+    def start(self):
+        pass
+
+    def close(self):
+        pass
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def make_stream(events, connected=False, clock=None):
+    bot_state = mock.MagicMock()
+    bot_state.retry_queue.next_due_in.return_value = None
+    watchlist = mock.MagicMock()
+    watchlist.queries = [("@HoundTheCult", [])]
+    watchlist.search.return_value = OrderedDict()
+    return MentionStream(mock.MagicMock(), bot_state, watchlist, FakeStream(events, connected),
+                         check_interval=300, clock=clock or FakeClock())
+
+def test_disconnected_wait_blocks_after_check_interval():
+    clock = FakeClock()
+    mention_stream = make_stream(ScriptedEvents([]), clock=clock)
+    clock.now += 10_000
+    assert mention_stream._wait_time() == 300
+
+def test_wait_follows_the_next_due_retry_but_never_drops_to_zero():
+    clock = FakeClock()
+    mention_stream = make_stream(ScriptedEvents([]), connected=True, clock=clock)
+    mention_stream.bot_state.retry_queue.next_due_in.return_value = 12
+    assert mention_stream._wait_time() == 12
+    mention_stream.bot_state.retry_queue.next_due_in.return_value = 0
+    assert mention_stream._wait_time() == MIN_WAIT
+    clock.now += 10_000
+    mention_stream.bot_state.retry_queue.next_due_in.return_value = None
+    assert mention_stream._wait_time() == MIN_WAIT
+
+def test_run_blocks_while_disconnected(monkeypatch):
+    monkeypatch.setattr(stream_module, "process_due_retries", lambda client, bot_state: None)
+    events = ScriptedEvents([None] * 5)
+    clock = FakeClock()
+    mention_stream = make_stream(events, clock=clock)
+    clock.now += 10_000
+
+    with pytest.raises(StopLoop):
+        mention_stream.run()
+    assert len(events.timeouts) == 6
+    assert all(timeout >= MIN_WAIT for timeout in events.timeouts)
+    # No idle check-time update while disconnected, only the start-up catch-up
+    assert mention_stream.bot_state.update_check_time.call_count == 1
+
+def test_streamed_batch_is_stamped_when_received(monkeypatch):
+    monkeypatch.setattr(stream_module, "process_due_retries", lambda client, bot_state: None)
+    mention_stream = make_stream(ScriptedEvents([("tweet", {"data": {"id": "1"}})]), connected=True)
+    mention_stream.route = lambda payloads: OrderedDict([("target", ["mention"])])
+    dispatched_at = []
+    mention_stream.watchlist.dispatch.side_effect = lambda *args: dispatched_at.append(datetime.now())
+
+    with pytest.raises(StopLoop):
+        mention_stream.run()
+    (checked_at,), _ = mention_stream.bot_state.update_check_time.call_args
+    assert checked_at is not None
+    assert checked_at <= dispatched_at[0]
+
+def test_dispatch_runs_inside_a_diagnostics_cycle(monkeypatch, tmp_path):
+    monkeypatch.setattr(stream_module, "process_due_retries", lambda client, bot_state: None)
+    diagnostics = Diagnostics(lambda: None, path=str(tmp_path), profile_cycles=1)
+    diagnostics._profile_requested.set()
+    mention_stream = make_stream(ScriptedEvents([]))
+    mention_stream.diagnostics = diagnostics
+
+    with pytest.raises(StopLoop):
+        mention_stream.run()
+    # The start-up catch-up was profiled as one cycle
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".pstats", ".txt"]
+    assert not diagnostics._profile_requested.is_set()
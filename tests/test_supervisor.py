@@ -0,0 +1,36 @@
+import sqlite3
+
+import pytest
+import requests
+import tweepy
+
+from src.api.cassette import ReplayHTTPResponse
+from src.supervisor import (
+    classify, SUSPENDED, FORBIDDEN, RATE_LIMITED, UNAUTHORIZED, SERVER, API, NETWORK, STORAGE, UNEXPECTED
+)
+
+def http_error(error_class, status, title="Error"):
+    response = ReplayHTTPResponse(status, {}, {"title": title})
+    return error_class(response, response_json={"title": title})
+
+@pytest.mark.parametrize("error, expected", [
+    (http_error(tweepy.errors.Forbidden, 403, "Your account is suspended"), SUSPENDED),
+    (http_error(tweepy.errors.Forbidden, 403, "Duplicate content"), FORBIDDEN),
+    (http_error(tweepy.errors.TooManyRequests, 429), RATE_LIMITED),
+    (http_error(tweepy.errors.Unauthorized, 401), UNAUTHORIZED),
+    (http_error(tweepy.errors.TwitterServerError, 503), SERVER),
+    (http_error(tweepy.errors.BadRequest, 400), API),
+    (requests.exceptions.ConnectionError("reset"), NETWORK),
+    (TimeoutError("timed out"), NETWORK),
+    (tweepy.errors.TweepyException("Failed to send request"), NETWORK),
+    (sqlite3.OperationalError("database is locked"), STORAGE),
+    (OSError("disk full"), STORAGE),
+    (ValueError("bug"), UNEXPECTED)
+])
+def test_classify(error, expected):
+    assert classify(error) is expected
+
+def test_recovery_plans():
+    assert SUSPENDED.fatal
+    assert NETWORK.rebuild == ("client",) and NETWORK.rebuild_after == 3
+    assert STORAGE.rebuild == ("state",)